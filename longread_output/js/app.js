@@ -4,6 +4,7 @@ import { ChartManager } from './chart.js';
 import { ControlsManager } from './controls.js';
 import { MunicipalityDetailManager } from './municipality-detail.js';
 import { ProvincialManager } from './provincial.js';
+import { loadMatrix } from './utils.js';
 
 class App {
     constructor() {
@@ -15,8 +16,15 @@ class App {
         
         this.municipalitiesData = null;
         this.averagesData = null;
-        this.cpiData = null;
+        this.seriesData = null;
         this.beleidsdomeinData = null;
+        this.rankingsData = null;
+        this.classificationData = null;
+        this.extentsData = null;
+        this.provincesData = null;
+        this.tileJson = null;
+        this.matrix = null;
+        this.liveReloadConnected = false;
     }
 
     async init() {
@@ -29,6 +37,7 @@ class App {
             
             console.log('Setting up interactions...');
             this.setupInteractions();
+            this.setupLiveReload();
             
             console.log('✓ Application initialized successfully');
         } catch (error) {
@@ -37,49 +46,53 @@ class App {
     }
 
     async loadData() {
-        const [geoResponse, avgResponse, cpiResponse, beleidsdomeinResponse] = await Promise.all([
+        const [geoResponse, avgResponse, seriesResponse, beleidsdomeinResponse, rankingsResponse, classificationResponse, extentsResponse, provincesResponse, matrix] = await Promise.all([
             fetch('municipalities_enriched.geojson'),
             fetch('averages.json'),
-            fetch('cpi.json'),
-            fetch('beleidsdomein_totals.json')
+            fetch('inflatie_series.json'),
+            fetch('beleidsdomein_totals.json'),
+            fetch('rankings.json'),
+            fetch('classificatie.json'),
+            fetch('extents.json'),
+            fetch('provincies.geojson'),
+            loadMatrix('matrix.json')
         ]);
         
         if (!geoResponse.ok) throw new Error(`Failed to fetch municipalities_enriched.geojson: ${geoResponse.status}`);
         if (!avgResponse.ok) throw new Error(`Failed to fetch averages.json: ${avgResponse.status}`);
-        if (!cpiResponse.ok) throw new Error(`Failed to fetch cpi.json: ${cpiResponse.status}`);
+        if (!seriesResponse.ok) throw new Error(`Failed to fetch inflatie_series.json: ${seriesResponse.status}`);
         if (!beleidsdomeinResponse.ok) throw new Error(`Failed to fetch beleidsdomein_totals.json: ${beleidsdomeinResponse.status}`);
+        if (!rankingsResponse.ok) throw new Error(`Failed to fetch rankings.json: ${rankingsResponse.status}`);
+        if (!classificationResponse.ok) throw new Error(`Failed to fetch classificatie.json: ${classificationResponse.status}`);
+        if (!extentsResponse.ok) throw new Error(`Failed to fetch extents.json: ${extentsResponse.status}`);
+        if (!provincesResponse.ok) throw new Error(`Failed to fetch provincies.geojson: ${provincesResponse.status}`);
         
         this.municipalitiesData = await geoResponse.json();
         this.averagesData = await avgResponse.json();
-        this.cpiData = await cpiResponse.json();
+        // Nominal and inflation-adjusted series are precomputed by build.py
+        this.seriesData = await seriesResponse.json();
         this.beleidsdomeinData = await beleidsdomeinResponse.json();
-        
-        // Process CPI data
-        this.processCPIData();
-    }
-
-    processCPIData() {
-        if (!this.cpiData || !this.cpiData.facts) return;
-        
-        const cpiMap = {};
-        this.cpiData.facts.forEach(fact => {
-            const year = parseInt(fact.Jaar);
-            if (!cpiMap[year]) {
-                cpiMap[year] = fact.Consumptieprijsindex;
-            }
-        });
-        this.cpiData.map = cpiMap;
-        this.cpiData.referenceYear = 2014;
-        this.cpiData.referenceCPI = cpiMap[2014] || 100.34;
+        this.rankingsData = await rankingsResponse.json();
+        // Class breaks per year/mode are precomputed, the map only looks them up
+        this.classificationData = await classificationResponse.json();
+        this.extentsData = await extentsResponse.json();
+        this.provincesData = await provincesResponse.json();
+        // Municipality × year values (nominal and real) as typed arrays
+        this.matrix = matrix;
+        this.tileJson = await this.fetchTileJson();
     }
 
     initializeModules() {
         // Initialize map
         this.mapManager = new MapManager();
         this.mapManager.initMap();
+        this.mapManager.setRankings(this.rankingsData);
+        this.mapManager.setClassifications(this.classificationData);
+        this.mapManager.setExtents(this.extentsData);
         this.mapManager.setupMap(this.municipalitiesData, (properties) => {
             this.handleFeatureClick(properties);
-        });
+        }, this.tileJson);
+        this.mapManager.setupProvinceOutlines(this.provincesData);
 
         // Initialize chart
         this.chartManager = new ChartManager();
@@ -88,14 +101,16 @@ class App {
             this.municipalitiesData,
             this.averagesData,
             this.beleidsdomeinData,
-            this.cpiData
+            this.seriesData
         );
+        this.chartManager.setMatrix(this.matrix);
 
         // Initialize controls
-        this.controlsManager = new ControlsManager(this.chartManager);
+        this.controlsManager = new ControlsManager(this.chartManager, this.mapManager);
         this.controlsManager.setupControls(this.municipalitiesData, this.averagesData);
         this.controlsManager.setupInflationToggle();
         this.controlsManager.setupStackedToggle();
+        this.controlsManager.setupMapMethodSelect();
 
         // Initialize detail manager
         this.detailManager = new MunicipalityDetailManager();
@@ -115,6 +130,98 @@ class App {
         // Additional cross-module interactions can be added here
     }
 
+    // During development (serve.py --livereload + build.py --watch) re-fetch only the files that changed
+    setupLiveReload() {
+        if (!['localhost', '127.0.0.1'].includes(window.location.hostname) || !window.EventSource) return;
+
+        const source = new EventSource('/__livereload');
+        source.addEventListener('change', (event) => {
+            const { bestanden } = JSON.parse(event.data);
+            // matrix.bin is read through its header, load the pair once
+            const files = new Set(bestanden.map(file => (file === 'matrix.bin' ? 'matrix.json' : file)));
+            files.forEach(file => this.reloadAsset(file).catch(error => {
+                console.error(`Live reload of ${file} failed:`, error);
+            }));
+        });
+        // Plain static servers have no /__livereload: stop retrying
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED || !this.liveReloadConnected) source.close();
+        };
+        source.onopen = () => { this.liveReloadConnected = true; };
+    }
+
+    async fetchJson(file) {
+        const response = await fetch(file, { cache: 'no-store' });
+        if (!response.ok) throw new Error(`Failed to fetch ${file}: ${response.status}`);
+        return response.json();
+    }
+
+    // Tile URL with the current build version; only serve.py has /tiles.json, static hosting draws the GeoJSON
+    async fetchTileJson() {
+        try {
+            const response = await fetch('/tiles.json', { cache: 'no-store' });
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            return null;
+        }
+    }
+
+    // Apply one changed output file without reloading the page
+    async reloadAsset(file) {
+        const refreshCharts = () => {
+            this.chartManager.setData(this.municipalitiesData, this.averagesData, this.beleidsdomeinData, this.seriesData);
+            this.controlsManager.updateDashboard();
+        };
+
+        switch (file) {
+            case 'averages.json':
+                this.averagesData = await this.fetchJson(file);
+                refreshCharts();
+                break;
+            case 'inflatie_series.json':
+                this.seriesData = await this.fetchJson(file);
+                refreshCharts();
+                break;
+            case 'beleidsdomein_totals.json':
+                this.beleidsdomeinData = await this.fetchJson(file);
+                refreshCharts();
+                break;
+            case 'matrix.json':
+                this.matrix = await loadMatrix(file, { cache: 'no-store' });
+                this.chartManager.setMatrix(this.matrix);
+                this.controlsManager.updateDashboard();
+                break;
+            case 'rankings.json':
+                this.mapManager.setRankings(await this.fetchJson(file));
+                break;
+            case 'classificatie.json':
+                this.mapManager.setClassifications(await this.fetchJson(file));
+                this.mapManager.setView({});
+                break;
+            case 'extents.json':
+                this.mapManager.setExtents(await this.fetchJson(file));
+                break;
+            case 'tiles.mbtiles':
+                this.tileJson = await this.fetchTileJson();
+                if (this.tileJson) this.mapManager.setTileJson(this.tileJson);
+                break;
+            case 'provincies.geojson':
+                this.mapManager.provinceLayer?.remove();
+                this.mapManager.setupProvinceOutlines(await this.fetchJson(file));
+                break;
+            default:
+                if (file.startsWith('rekeningen/')) {
+                    this.detailManager.clearBreakdowns();
+                    break;
+                }
+                // Geometry, code, styles and the provincial section: start over
+                if (/\.(html|js|css|geojson)$/.test(file) || file.startsWith('provincie_')) {
+                    window.location.reload();
+                }
+        }
+        console.log(`↻ ${file}`);
+    }
+
     handleFeatureClick(properties) {
         // Show detail panel
         this.detailManager.show(properties);
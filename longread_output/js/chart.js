@@ -8,7 +8,8 @@ export class ChartManager {
         this.municipalitiesData = null;
         this.averagesData = null;
         this.beleidsdomeinData = null;
-        this.cpiData = null;
+        this.seriesData = null;
+        this.matrix = null;
         this.selectedRegions = new Set(['vlaanderen']);
         this.showNominal = true;
         this.showAdjusted = false;
@@ -59,11 +60,16 @@ export class ChartManager {
     }
 
     // Set data references
-    setData(municipalitiesData, averagesData, beleidsdomeinData, cpiData) {
+    setData(municipalitiesData, averagesData, beleidsdomeinData, seriesData) {
         this.municipalitiesData = municipalitiesData;
         this.averagesData = averagesData;
         this.beleidsdomeinData = beleidsdomeinData;
-        this.cpiData = cpiData;
+        this.seriesData = seriesData;
+    }
+
+    // Municipality × year matrix from matrix.bin (see loadMatrix in utils.js)
+    setMatrix(matrix) {
+        this.matrix = matrix;
     }
 
     // Set selected regions
@@ -78,14 +84,19 @@ export class ChartManager {
         this.showStacked = showStacked;
     }
 
-    // Adjust value for inflation
-    adjustForInflation(value, year) {
-        if (!this.cpiData || !this.cpiData.map) return value;
+    // Get a precomputed series ({nominaal, reeel}) aligned with the given years
+    getSeries(group, name, years, missingValue = null) {
+        const series = group ? group[name] : null;
+        if (!series) return { nominaal: years.map(() => missingValue), reeel: years.map(() => missingValue) };
         
-        const yearCPI = this.cpiData.map[year];
-        if (!yearCPI) return value;
-        
-        return value * (this.cpiData.referenceCPI / yearCPI);
+        const indices = years.map(year => this.seriesData.jaren.indexOf(year));
+        const pick = (values) => indices.map(idx => (idx === -1 ? null : values[idx]) ?? missingValue);
+        return { nominaal: pick(series.nominaal), reeel: pick(series.reeel) };
+    }
+
+    // Series of one municipality, read from the binary matrix
+    getMunicipalitySeries(name, years) {
+        return this.matrix?.series(name, years) ?? this.getSeries(null, name, years);
     }
 
     // Update dashboard based on current selections
@@ -168,9 +179,7 @@ export class ChartManager {
         const showBoth = this.showNominal && this.showAdjusted;
         
         topDomains.forEach((subdomein, idx) => {
-            const nominalData = years.map(year => {
-                return this.beleidsdomeinData[subdomein][year] || 0;
-            });
+            const series = this.getSeries(this.seriesData.beleidsdomeinen, subdomein, years, 0);
             
             const shortLabel = subdomein.length > 30 ? subdomein.substring(0, 27) + '...' : subdomein;
             const baseColor = colorPalette.domains[idx % colorPalette.domains.length];
@@ -178,7 +187,7 @@ export class ChartManager {
             if (this.showNominal) {
                 datasets.push({
                     label: shortLabel,
-                    data: nominalData,
+                    data: series.nominaal,
                     backgroundColor: baseColor,
                     borderColor: baseColor,
                     borderWidth: 1,
@@ -189,13 +198,9 @@ export class ChartManager {
             }
             
             if (this.showAdjusted) {
-                const adjustedData = nominalData.map((val, yearIdx) => 
-                    this.adjustForInflation(val, years[yearIdx])
-                );
-                
                 datasets.push({
                     label: shortLabel,
-                    data: adjustedData,
+                    data: series.reeel,
                     backgroundColor: baseColor + 'AA',
                     borderColor: baseColor,
                     borderWidth: 1,
@@ -280,14 +285,14 @@ export class ChartManager {
         let provinceIndex = 0;
         let municipalityIndex = 0;
         
-        const createRegionData = (name, nominalData, color, index) => {
+        const createRegionData = (name, series, color, index) => {
             const datasets = [];
             const showBoth = this.showNominal && this.showAdjusted;
             
             if (this.showNominal) {
                 datasets.push({
                     label: showBoth ? 'Nominaal' : name,
-                    data: nominalData,
+                    data: series.nominaal,
                     backgroundColor: color,
                     borderColor: color,
                     borderWidth: 2,
@@ -296,10 +301,9 @@ export class ChartManager {
             }
             
             if (this.showAdjusted) {
-                const adjustedData = nominalData.map((val, idx) => this.adjustForInflation(val, years[idx]));
                 datasets.push({
                     label: showBoth ? '2014 €' : name,
-                    data: adjustedData,
+                    data: series.reeel,
                     backgroundColor: color + '99',
                     borderColor: color,
                     borderWidth: 2,
@@ -312,10 +316,9 @@ export class ChartManager {
         };
         
         if (this.selectedRegions.has('vlaanderen')) {
-            const nominalData = years.map(y => this.averagesData.Vlaanderen[y]);
             regions.push(createRegionData(
                 'Vlaanderen (gemiddelde)',
-                nominalData,
+                this.getSeries(this.seriesData, 'vlaanderen', years),
                 getColorForRegion('vlaanderen', 0, ''),
                 0
             ));
@@ -324,10 +327,9 @@ export class ChartManager {
         this.selectedRegions.forEach(val => {
             if (val.startsWith('prov:')) {
                 const provName = val.split(':')[1];
-                const nominalData = years.map(y => this.averagesData.Provincies[provName][y]);
                 regions.push(createRegionData(
                     provName,
-                    nominalData,
+                    this.getSeries(this.seriesData.provincies, provName, years),
                     getColorForRegion('province', provinceIndex++, provName),
                     regions.length
                 ));
@@ -339,10 +341,9 @@ export class ChartManager {
                 const munName = val.split(':')[1];
                 const feature = this.municipalitiesData.features.find(f => f.properties.municipality === munName);
                 if (feature) {
-                    const nominalData = years.map(y => feature.properties[String(y)]);
                     regions.push(createRegionData(
                         munName,
-                        nominalData,
+                        this.getMunicipalitySeries(munName, years),
                         getColorForRegion('municipality', municipalityIndex++, munName),
                         regions.length
                     ));
@@ -427,7 +428,7 @@ export class ChartManager {
             if (val.startsWith('mun:')) {
                 const munName = val.split(':')[1];
                 const feature = this.municipalitiesData.features.find(f => f.properties.municipality === munName);
-                if (!feature || !feature.properties.beleidsdomein_2024) return;
+                if (!feature || !feature.properties.beleidsdomein) return;
                 
                 const datasets = [];
                 
@@ -435,15 +436,14 @@ export class ChartManager {
                     const baseColor = colorPalette.domains[idx % colorPalette.domains.length];
                     const shortLabel = subdomein.length > 30 ? subdomein.substring(0, 27) + '...' : subdomein;
                     
-                    const yearData = this.beleidsdomeinData[subdomein];
-                    if (!yearData) return;
+                    if (!this.seriesData.beleidsdomeinen[subdomein]) return;
                     
-                    const nominalData = years.map(year => yearData[String(year)] || 0);
+                    const series = this.getSeries(this.seriesData.beleidsdomeinen, subdomein, years, 0);
                     
                     if (this.showNominal) {
                         datasets.push({
                             label: shortLabel,
-                            data: nominalData,
+                            data: series.nominaal,
                             backgroundColor: baseColor,
                             borderColor: baseColor,
                             borderWidth: 1,
@@ -454,13 +454,9 @@ export class ChartManager {
                     }
                     
                     if (this.showAdjusted) {
-                        const adjustedData = nominalData.map((val, yearIdx) => 
-                            this.adjustForInflation(val, years[yearIdx])
-                        );
-                        
                         datasets.push({
                             label: shortLabel,
-                            data: adjustedData,
+                            data: series.reeel,
                             backgroundColor: baseColor + 'AA',
                             borderColor: baseColor,
                             borderWidth: 1,
@@ -1,8 +1,9 @@
 // Controls and UI management module
 
 export class ControlsManager {
-    constructor(chartManager) {
+    constructor(chartManager, mapManager = null) {
         this.chartManager = chartManager;
+        this.mapManager = mapManager;
         this.selectedRegions = new Set(['vlaanderen']);
     }
 
@@ -102,6 +103,7 @@ export class ControlsManager {
                 const value = e.target.value;
                 if (e.target.checked) {
                     this.selectedRegions.add(value);
+                    if (this.mapManager) this.mapManager.zoomToProvince(provName);
                 } else {
                     this.selectedRegions.delete(value);
                 }
@@ -244,6 +246,7 @@ export class ControlsManager {
             }
             
             this.chartManager.setDisplayOptions(showNominal, showAdjusted, this.chartManager.showStacked);
+            this.updateMapMode(showNominal, showAdjusted);
             this.updateDashboard();
         });
         
@@ -257,10 +260,27 @@ export class ControlsManager {
             }
             
             this.chartManager.setDisplayOptions(showNominal, showAdjusted, this.chartManager.showStacked);
+            this.updateMapMode(showNominal, showAdjusted);
             this.updateDashboard();
         });
     }
 
+    // Color the map with the inflation-adjusted classes when only those are shown
+    updateMapMode(showNominal, showAdjusted) {
+        if (!this.mapManager) return;
+        this.mapManager.setView({ mode: showAdjusted && !showNominal ? 'reeel' : 'nominaal' });
+    }
+
+    // Switch the map between the precomputed classification methods
+    setupMapMethodSelect() {
+        const select = document.getElementById('map-method');
+        if (!select || !this.mapManager) return;
+        
+        select.addEventListener('change', () => {
+            this.mapManager.setView({ method: select.value });
+        });
+    }
+
     // Setup stacked toggle
     setupStackedToggle() {
         const stackedCheckbox = document.getElementById('toggle-stacked');
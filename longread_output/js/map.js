@@ -1,12 +1,100 @@
 // Map management module
-import { getColorScale } from './utils.js';
+import { classColors, decodeClasses } from './utils.js';
 
 export class MapManager {
     constructor() {
         this.map = null;
         this.geojsonLayer = null;
-        this.mapMinValue = null;
-        this.mapMaxValue = null;
+        this.tileLayer = null;
+        this.propertiesByName = new Map();
+        this.tooltip = null;
+        this.classifications = null;
+        this.classCache = new Map();
+        this.featureIndex = new Map();
+        this.view = { year: 2024, mode: 'nominaal', method: 'gelijk', scope: 'vlaanderen' };
+        this.classes = null;
+        this.rankings = null;
+        this.rankingIndex = new Map();
+        this.extents = null;
+        this.provinceLayer = null;
+    }
+
+    // Set precomputed rankings (arrays aligned with the feature order)
+    setRankings(rankings) {
+        this.rankings = rankings;
+        this.rankingIndex = new Map(rankings.gemeenten.map((name, idx) => [name, idx]));
+    }
+
+    // Look up rank, province rank and percentile for a municipality
+    getRanking(name, year, metric = 'totaal') {
+        const data = this.rankings?.metrieken?.[metric];
+        const idx = this.rankingIndex.get(name);
+        if (!data || idx === undefined) return null;
+
+        const yearIdx = data.jaren.indexOf(year);
+        if (yearIdx === -1 || !data.rang[yearIdx][idx]) return null;
+
+        const provIdx = this.rankings.provincie_index[idx];
+        return {
+            rang: data.rang[yearIdx][idx],
+            aantal: data.aantal[yearIdx],
+            provincieRang: data.provincie_rang[yearIdx][idx],
+            aantalProvincie: data.aantal_provincie[yearIdx][provIdx],
+            percentiel: data.percentiel[yearIdx][idx]
+        };
+    }
+
+    // Set precomputed extents (bbox, centroid, label point) for Vlaanderen and provinces
+    setExtents(extents) {
+        this.extents = extents;
+    }
+
+    // Fit the map to a precomputed [minLon, minLat, maxLon, maxLat] bbox
+    fitExtent(bbox) {
+        const [minLon, minLat, maxLon, maxLat] = bbox;
+        this.map.fitBounds([[minLat, minLon], [maxLat, maxLon]]);
+    }
+
+    // Zoom to a province without traversing its geometry
+    zoomToProvince(province) {
+        const extent = this.extents?.Provincies?.[province];
+        if (extent) this.fitExtent(extent.bbox);
+    }
+
+    // Set precomputed class breaks and class indices (see classificatie.json)
+    setClassifications(classifications) {
+        this.classifications = classifications;
+        this.featureIndex = new Map(classifications.gemeenten.map((name, idx) => [name, idx]));
+        this.classCache.clear();
+    }
+
+    // Get the configuration for the current view
+    getConfiguration() {
+        const { year, mode, method, scope } = this.view;
+        return this.classifications?.configuraties?.[year]?.[mode]?.[method]?.[scope] ?? null;
+    }
+
+    // Class indices for the current view, decoded once per configuration
+    getClasses() {
+        const { year, mode, method, scope } = this.view;
+        const key = `${year}|${mode}|${method}|${scope}`;
+        if (!this.classCache.has(key)) {
+            const config = this.getConfiguration();
+            this.classCache.set(key, config ? decodeClasses(config.klassen) : null);
+        }
+        return this.classCache.get(key);
+    }
+
+    // Switch year, mode, method or scope and restyle with a table lookup
+    setView(options) {
+        this.view = { ...this.view, ...options };
+        this.classes = this.getClasses();
+        if (this.tileLayer) {
+            this.tileLayer.redraw();
+        } else if (this.geojsonLayer) {
+            this.geojsonLayer.setStyle((feature) => this.getFeatureStyle(feature));
+        }
+        this.updateLegend();
     }
 
     // Initialize the map
@@ -38,15 +126,10 @@ export class MapManager {
             div.style.borderRadius = '5px';
             div.style.minWidth = '200px';
             
-            div.innerHTML = '<strong>Investeringen 2024</strong><br>' +
+            div.innerHTML = '<strong id="legend-title">Investeringen 2024</strong><br>' +
                             '<small>(€ per inwoner)</small><br>' +
-                            '<div style="margin-top: 8px; font-size: 12px; color: #666;">Kleuren gebaseerd op percentielen van het maximum</div>' +
-                            '<i style="background:#d73027; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.7; margin-top: 4px;"></i> <span id="legend-top90">> 90% (hoog)</span><br>' +
-                            '<i style="background:#f46d43; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.7; margin-top: 4px;"></i> <span id="legend-70-90">70-90%</span><br>' +
-                            '<i style="background:#fdae61; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.7; margin-top: 4px;"></i> <span id="legend-50-70">50-70%</span><br>' +
-                            '<i style="background:#abd9e9; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.7; margin-top: 4px;"></i> <span id="legend-30-50">30-50%</span><br>' +
-                            '<i style="background:#74add1; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.7; margin-top: 4px;"></i> <span id="legend-10-30">10-30%</span><br>' +
-                            '<i style="background:#4575b4; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.7; margin-top: 4px;"></i> <span id="legend-low10">&lt; 10% (laag)</span><br>' +
+                            '<div id="legend-method" style="margin-top: 8px; font-size: 12px; color: #666;"></div>' +
+                            '<div id="legend-classes"></div>' +
                             '<div style="margin-top: 8px; padding-top: 8px; border-top: 1px solid #ddd;"></div>' +
                             '<i style="background:#999999; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.5; margin-top: 4px; border: 2px dashed #666;"></i> <span style="font-size: 12px;">Onbetrouwbare data</span>';
             return div;
@@ -54,27 +137,101 @@ export class MapManager {
         legend.addTo(this.map);
     }
 
-    // Setup map with geojson data
-    setupMap(data, onFeatureClick) {
-        const values2024 = data.features
-            .map(f => f.properties['2024'])
-            .filter(v => v !== null && !isNaN(v));
-        
-        this.mapMaxValue = Math.max(...values2024);
-        this.mapMinValue = Math.min(...values2024);
-
-        this.geojsonLayer = L.geoJSON(data, {
-            style: (feature) => this.getFeatureStyle(feature),
-            onEachFeature: (feature, layer) => this.onEachFeature(feature, layer, onFeatureClick)
+    // Draw the precomputed province outlines on top of the municipalities
+    setupProvinceOutlines(provinces) {
+        this.provinceLayer = L.geoJSON(provinces, {
+            style: { fill: false, weight: 2, color: '#444', opacity: 0.8 },
+            interactive: false
         }).addTo(this.map);
+    }
+
+    // Setup map: vector tiles when serve.py offers them (tileJson), else the full GeoJSON
+    setupMap(data, onFeatureClick, tileJson = null) {
+        this.classes = this.getClasses();
+        // Full properties (detail, beleidsdomein, bbox) stay in the GeoJSON, the tiles carry the names
+        this.propertiesByName = new Map(data.features.map((feature) => [feature.properties.municipality, feature.properties]));
 
-        this.map.fitBounds(this.geojsonLayer.getBounds());
+        if (tileJson && L.vectorGrid) {
+            this.setupTileLayer(tileJson, onFeatureClick);
+        } else {
+            this.geojsonLayer = L.geoJSON(data, {
+                style: (feature) => this.getFeatureStyle(feature),
+                onEachFeature: (feature, layer) => this.onEachFeature(feature, layer, onFeatureClick)
+            }).addTo(this.map);
+        }
+
+        if (this.extents?.Vlaanderen) {
+            this.fitExtent(this.extents.Vlaanderen.bbox);
+        } else if (this.geojsonLayer) {
+            this.map.fitBounds(this.geojsonLayer.getBounds());
+        }
         this.updateLegend();
     }
 
+    // Draw the municipalities from the precomputed vector tiles (see tiles.mbtiles)
+    setupTileLayer(tileJson, onFeatureClick) {
+        const layerName = tileJson.vector_layers[0].id;
+        // VectorGrid 1.3 still calls this Leaflet 1.7 helper on click
+        L.DomEvent.fakeStop ??= () => true;
+        this.tooltip = L.tooltip({ sticky: true });
+        this.tileLayer = L.vectorGrid.protobuf(tileJson.tiles[0], {
+            vectorTileLayerStyles: {
+                [layerName]: (properties) => this.getFeatureStyle({ properties })
+            },
+            interactive: true,
+            getFeatureId: (feature) => feature.properties.municipality,
+            maxNativeZoom: tileJson.maxzoom
+        }).addTo(this.map);
+
+        this.tileLayer.on({
+            mouseover: (e) => {
+                const name = e.layer.properties.municipality;
+                const style = this.getFeatureStyle({ properties: e.layer.properties });
+                this.tileLayer.setFeatureStyle(name, { ...style, fill: true, weight: 3, color: '#666', dashArray: '', fillOpacity: 0.9 });
+                this.tooltip.setLatLng(e.latlng).setContent(this.getTooltipContent(name));
+                this.map.openTooltip(this.tooltip);
+            },
+            mousemove: (e) => {
+                this.tooltip.setLatLng(e.latlng);
+            },
+            mouseout: (e) => {
+                this.tileLayer.resetFeatureStyle(e.layer.properties.municipality);
+                this.map.closeTooltip(this.tooltip);
+            },
+            dblclick: (e) => {
+                // Zoom to the municipality using its precomputed bbox
+                const bbox = this.propertiesByName.get(e.layer.properties.municipality)?.bbox;
+                if (bbox) {
+                    L.DomEvent.stop(e);
+                    this.fitExtent(bbox);
+                }
+            },
+            click: (e) => {
+                const properties = this.propertiesByName.get(e.layer.properties.municipality);
+                if (onFeatureClick && properties) {
+                    onFeatureClick(properties);
+                }
+            }
+        });
+    }
+
+    // Point the tile layer at a rebuilt tile set (new version in the URL)
+    setTileJson(tileJson) {
+        if (this.tileLayer) this.tileLayer.setUrl(tileJson.tiles[0]);
+    }
+
+    // Tooltip with the 2024 value and the ranking of a municipality
+    getTooltipContent(name) {
+        const val2024 = this.propertiesByName.get(name)?.['2024'];
+        const ranking = this.getRanking(name, 2024);
+        const rankText = ranking
+            ? `<br>Rang ${ranking.rang} van ${ranking.aantal} in Vlaanderen, ${ranking.provincieRang} van ${ranking.aantalProvincie} in de provincie`
+            : '';
+        return `<strong>${name}</strong><br>2024: €${val2024 ? val2024.toFixed(2) : '-'}${rankText}`;
+    }
+
     // Get style for a feature
     getFeatureStyle(feature) {
-        const val = feature.properties['2024'];
         const municipalityName = feature.properties.municipality;
         
         // Special styling for Kaprijke due to unreliable data
@@ -89,8 +246,11 @@ export class MapManager {
             };
         }
         
+        const idx = this.featureIndex.get(municipalityName);
+        const classIndex = idx !== undefined ? this.classes?.[idx] : undefined;
+        
         return {
-            fillColor: getColorScale(val, this.mapMinValue, this.mapMaxValue),
+            fillColor: classColors[classIndex] ?? '#cccccc',
             weight: 1,
             opacity: 1,
             color: 'white',
@@ -106,10 +266,18 @@ export class MapManager {
                 const layer = e.target;
                 layer.setStyle({ weight: 3, color: '#666', dashArray: '', fillOpacity: 0.9 });
                 layer.bringToFront();
+                if (this.provinceLayer) this.provinceLayer.bringToFront();
             },
             mouseout: (e) => {
                 this.geojsonLayer.resetStyle(e.target);
             },
+            dblclick: (e) => {
+                // Zoom to the municipality using its precomputed bbox
+                if (feature.properties.bbox) {
+                    L.DomEvent.stop(e);
+                    this.fitExtent(feature.properties.bbox);
+                }
+            },
             click: (e) => {
                 if (onFeatureClick) {
                     onFeatureClick(feature.properties);
@@ -117,37 +285,35 @@ export class MapManager {
             }
         });
         
-        const name = feature.properties.municipality;
-        const val2024 = feature.properties['2024'];
-        layer.bindTooltip(`<strong>${name}</strong><br>2024: €${val2024 ? val2024.toFixed(2) : '-'}`);
+        layer.bindTooltip(this.getTooltipContent(feature.properties.municipality));
     }
 
-    // Update legend with actual values
+    // Update legend from the precomputed class breaks
     updateLegend() {
-        if (this.mapMinValue === null || this.mapMaxValue === null) return;
-        
-        const legend = document.getElementById('map-legend');
-        if (!legend) return;
+        const container = document.getElementById('legend-classes');
+        const config = this.getConfiguration();
+        if (!container || !config) return;
         
-        const top90 = this.mapMaxValue * 0.9;
-        const top70 = this.mapMaxValue * 0.7;
-        const top50 = this.mapMaxValue * 0.5;
-        const top30 = this.mapMaxValue * 0.3;
-        const top10 = this.mapMaxValue * 0.1;
-        
-        const legendTop90 = document.getElementById('legend-top90');
-        const legend70_90 = document.getElementById('legend-70-90');
-        const legend50_70 = document.getElementById('legend-50-70');
-        const legend30_50 = document.getElementById('legend-30-50');
-        const legend10_30 = document.getElementById('legend-10-30');
-        const legendLow10 = document.getElementById('legend-low10');
+        const methodLabels = {
+            kwantiel: 'Klassen met evenveel gemeenten',
+            gelijk: 'Klassen van gelijke breedte',
+            jenks: 'Natuurlijke klassen (Jenks)'
+        };
+        const title = document.getElementById('legend-title');
+        const method = document.getElementById('legend-method');
+        if (title) title.textContent = `Investeringen ${this.view.year}${this.view.mode === 'reeel' ? ' (reëel)' : ''}`;
+        if (method) method.textContent = methodLabels[this.view.method] ?? '';
         
-        if (legendTop90) legendTop90.innerHTML = `> 90% (≥ €${top90.toFixed(0)})`;
-        if (legend70_90) legend70_90.innerHTML = `70-90% (€${top70.toFixed(0)}-${top90.toFixed(0)})`;
-        if (legend50_70) legend50_70.innerHTML = `50-70% (€${top50.toFixed(0)}-${top70.toFixed(0)})`;
-        if (legend30_50) legend30_50.innerHTML = `30-50% (€${top30.toFixed(0)}-${top50.toFixed(0)})`;
-        if (legend10_30) legend10_30.innerHTML = `10-30% (€${top10.toFixed(0)}-${top30.toFixed(0)})`;
-        if (legendLow10) legendLow10.innerHTML = `< 10% (< €${top10.toFixed(0)})`;
+        // Province scope has breaks per province, so only the classes are listed
+        const breaks = Array.isArray(config.grenzen) ? config.grenzen : null;
+        const count = breaks ? breaks.length - 1 : classColors.length;
+        const rows = classColors.slice(0, count).map((color, i) => {
+            const label = breaks
+                ? `€${breaks[i].toFixed(0)} - €${breaks[i + 1].toFixed(0)}`
+                : `Klasse ${i + 1}${i === 0 ? ' (laag)' : i === count - 1 ? ' (hoog)' : ''}`;
+            return `<i style="background:${color}; width: 18px; height: 18px; float: left; margin-right: 8px; opacity: 0.7; margin-top: 4px;"></i> <span>${label}</span><br>`;
+        });
+        container.innerHTML = rows.reverse().join('');
     }
 
     getMap() {
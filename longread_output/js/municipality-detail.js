@@ -1,9 +1,20 @@
 // Municipality detail panel management
+import { getYearEntry, escapeHtml } from './utils.js';
+
+// Boekjaar shown in the detail panel
+const DETAIL_YEAR = 2024;
+
+// Top of the chart-of-accounts breakdown (scripts/modules/hierarchy.py)
+const ROOT_BREAKDOWN = 'rekeningen/0.json';
 
 export class MunicipalityDetailManager {
     constructor() {
         this.currentDetailView = 'beleidsveld';
         this.currentMunicipalityProperties = null;
+        // Breakdown files are fetched on demand, one per level the user opens
+        this.breakdowns = new Map();
+        this.breakdownPath = [ROOT_BREAKDOWN];
+        this.renderToken = 0;
         this.setupEventListeners();
     }
 
@@ -42,9 +53,18 @@ export class MunicipalityDetailManager {
         }
     }
 
+    // Get the detail and beleidsdomein entries for the panel year
+    getYearData(properties) {
+        return {
+            detail: getYearEntry(properties.detail, DETAIL_YEAR),
+            beleidsdomein: getYearEntry(properties.beleidsdomein, DETAIL_YEAR)
+        };
+    }
+
     // Show municipality detail panel
     show(properties) {
         this.currentMunicipalityProperties = properties;
+        const { detail, beleidsdomein } = this.getYearData(properties);
         
         const detailPanel = document.getElementById('municipality-detail');
         const detailName = document.getElementById('detail-municipality-name');
@@ -65,14 +85,14 @@ export class MunicipalityDetailManager {
         
         detailProvince.textContent = properties.province || 'Provincie onbekend';
         
-        const total2024 = properties['2024'];
+        const total2024 = properties[String(DETAIL_YEAR)];
         detailTotal2024.textContent = total2024 ? `€ ${total2024.toFixed(2)}` : '€ -';
         
         // Fill beleidsdomein sum
-        if (properties.beleidsdomein_2024 && properties.beleidsdomein_2024.totaal_beleidsdomein !== null) {
-            const totaalBeleidsdomein = properties.beleidsdomein_2024.totaal_beleidsdomein;
+        if (beleidsdomein && beleidsdomein.totaal_beleidsdomein !== null) {
+            const totaalBeleidsdomein = beleidsdomein.totaal_beleidsdomein;
             detailSumBeleidsdomein.textContent = `€ ${totaalBeleidsdomein.toFixed(2)}`;
-            const diffBeleidsdomein = properties.beleidsdomein_2024.verschil_met_totaal;
+            const diffBeleidsdomein = beleidsdomein.verschil_met_totaal;
             detailDifferenceBeleidsdomein.textContent = `verschil: € ${diffBeleidsdomein.toFixed(2)}`;
         } else {
             detailSumBeleidsdomein.textContent = '€ -';
@@ -80,10 +100,10 @@ export class MunicipalityDetailManager {
         }
         
         // Fill rekeningen sum
-        if (properties.detail_2024 && properties.detail_2024.totaal_details !== null) {
-            const totaalRekeningen = properties.detail_2024.totaal_details;
+        if (detail && detail.totaal_details !== null) {
+            const totaalRekeningen = detail.totaal_details;
             detailSumRekeningen.textContent = `€ ${totaalRekeningen.toFixed(2)}`;
-            const diffRekeningen = properties.detail_2024.verschil_met_totaal;
+            const diffRekeningen = detail.verschil_met_totaal;
             detailDifferenceRekeningen.textContent = `verschil: € ${diffRekeningen.toFixed(2)}`;
         } else {
             detailSumRekeningen.textContent = '€ -';
@@ -104,14 +124,38 @@ export class MunicipalityDetailManager {
         detailPanel.classList.remove('active');
     }
 
+    // Fetch (once) the breakdown of one node of the account tree
+    loadBreakdown(file) {
+        if (!this.breakdowns.has(file)) {
+            const request = fetch(file).then(response => {
+                if (!response.ok) throw new Error(`Failed to fetch ${file}: ${response.status}`);
+                return response.json();
+            });
+            request.catch(() => this.breakdowns.delete(file));
+            this.breakdowns.set(file, request);
+        }
+        return this.breakdowns.get(file);
+    }
+
+    // Forget cached breakdowns (after a rebuild) and redraw
+    clearBreakdowns() {
+        this.breakdowns.clear();
+        this.breakdownPath = [ROOT_BREAKDOWN];
+        if (this.currentMunicipalityProperties) {
+            this.renderDetailTable(this.currentMunicipalityProperties, this.currentDetailView);
+        }
+    }
+
     // Render detail table
     renderDetailTable(properties, viewType) {
+        // Invalidates breakdowns that are still loading for a previous render
+        this.renderToken++;
         const detailWarning = document.getElementById('detail-warning');
         const detailTableBody = document.getElementById('detail-rekeningen-tbody');
         const detailTableTitle = document.getElementById('detail-table-title');
         const detailTableHeaderCol = document.getElementById('detail-table-header-col');
         
-        const total2024 = properties['2024'];
+        const total2024 = properties[String(DETAIL_YEAR)];
         
         if (viewType === 'uitgavenpost') {
             this.renderUitgavenpostView(properties, total2024, detailTableTitle, detailTableHeaderCol, detailTableBody, detailWarning);
@@ -122,19 +166,21 @@ export class MunicipalityDetailManager {
 
     // Render uitgavenpost view
     renderUitgavenpostView(properties, total2024, detailTableTitle, detailTableHeaderCol, detailTableBody, detailWarning) {
-        detailTableTitle.textContent = 'Top 10 per uitgavenpost';
+        const { detail, beleidsdomein } = this.getYearData(properties);
+        const topCount = detail?.top_rekeningen?.length || 10;
+        detailTableTitle.textContent = `Top ${topCount} per uitgavenpost`;
         detailTableHeaderCol.textContent = 'Rekening';
         
-        if (properties.detail_2024 && properties.detail_2024.totaal_details !== null) {
-            const detail2024 = properties.detail_2024;
+        if (detail && detail.totaal_details !== null) {
+            const detail2024 = detail;
             
             const diffRekeningen = detail2024.verschil_met_totaal;
             const diffRekeningenPercent = Math.abs(diffRekeningen / total2024 * 100);
             
             let showWarning = diffRekeningenPercent > 1;
             
-            if (properties.beleidsdomein_2024 && properties.beleidsdomein_2024.totaal_beleidsdomein !== null) {
-                const diffBeleidsdomein = properties.beleidsdomein_2024.verschil_met_totaal;
+            if (beleidsdomein && beleidsdomein.totaal_beleidsdomein !== null) {
+                const diffBeleidsdomein = beleidsdomein.verschil_met_totaal;
                 const diffBeleidsdoeinPercent = Math.abs(diffBeleidsdomein / total2024 * 100);
                 if (diffBeleidsdoeinPercent > 1) showWarning = true;
             }
@@ -148,50 +194,120 @@ export class MunicipalityDetailManager {
                 detailWarning.style.display = showWarning ? 'flex' : 'none';
             }
             
-            detailTableBody.innerHTML = '';
-            if (detail2024.top_rekeningen && detail2024.top_rekeningen.length > 0) {
-                detail2024.top_rekeningen.forEach(rek => {
-                    const row = document.createElement('tr');
-                    let displayName = rek.naam;
-                    if (displayName.startsWith(rek.code)) {
-                        displayName = displayName.substring(rek.code.length).trim();
-                        if (displayName.startsWith('-')) {
-                            displayName = displayName.substring(1).trim();
-                        }
-                    }
-                    row.innerHTML = `
-                        <td class="code-col">${rek.code}</td>
-                        <td>${displayName}</td>
-                        <td class="bedrag-col">€ ${rek.bedrag.toFixed(2)}</td>
-                    `;
-                    detailTableBody.appendChild(row);
+            this.renderBreakdown(properties, detail2024, detailTableTitle, detailTableBody);
+        } else {
+            detailWarning.style.display = 'none';
+            detailTableBody.innerHTML = '<tr><td colspan="3" class="text-center text-muted">Geen gedetailleerde data beschikbaar voor deze gemeente</td></tr>';
+        }
+    }
+
+    // Drill-down through the account tree; falls back to the top rekeningen
+    // when the breakdown files are not available
+    async renderBreakdown(properties, detail, detailTableTitle, detailTableBody) {
+        const token = this.renderToken;
+        let breakdown;
+        try {
+            breakdown = await this.loadBreakdown(this.breakdownPath[this.breakdownPath.length - 1]);
+        } catch (error) {
+            if (token === this.renderToken) this.renderTopRekeningen(detail, detailTableBody);
+            return;
+        }
+        // Another municipality or view was opened in the meantime
+        if (token !== this.renderToken) return;
+
+        detailTableTitle.innerHTML = breakdown.pad.map((node, depth) => {
+            const name = escapeHtml(node.naam);
+            return depth < breakdown.pad.length - 1
+                ? `<a href="#" class="breakdown-crumb" data-depth="${depth}">${name}</a>`
+                : name;
+        }).join(' › ');
+        detailTableTitle.querySelectorAll('.breakdown-crumb').forEach(link => {
+            link.addEventListener('click', event => {
+                event.preventDefault();
+                this.breakdownPath = this.breakdownPath.slice(0, Number(link.dataset.depth) + 1);
+                this.renderDetailTable(properties, 'uitgavenpost');
+            });
+        });
+
+        const yearIndex = breakdown.jaren.indexOf(DETAIL_YEAR);
+        const values = breakdown.gemeenten[properties.municipality]?.[yearIndex];
+        const children = values
+            ? breakdown.kinderen
+                .map((child, i) => ({ ...child, bedrag: values[i] }))
+                .filter(child => child.bedrag !== 0)
+                .sort((a, b) => Math.abs(b.bedrag) - Math.abs(a.bedrag))
+            : [];
+
+        detailTableBody.innerHTML = '';
+        if (children.length === 0) {
+            detailTableBody.innerHTML = '<tr><td colspan="3" class="text-center text-muted">Geen rekeningen op dit niveau voor deze gemeente</td></tr>';
+            return;
+        }
+        children.forEach(child => {
+            const row = document.createElement('tr');
+            const name = escapeHtml(child.code && child.naam.startsWith(child.code)
+                ? child.naam.substring(child.code.length).replace(/^\s*-?\s*/, '')
+                : child.naam);
+            row.innerHTML = `
+                <td class="code-col">${escapeHtml(child.code || '')}</td>
+                <td>${child.bestand ? `${name} ▸` : name}</td>
+                <td class="bedrag-col">€ ${child.bedrag.toFixed(2)}</td>
+            `;
+            if (child.bestand) {
+                row.style.cursor = 'pointer';
+                row.addEventListener('click', () => {
+                    this.breakdownPath.push(child.bestand);
+                    this.renderDetailTable(properties, 'uitgavenpost');
                 });
-            } else {
+            }
+            detailTableBody.appendChild(row);
+        });
+    }
+
+    // Flat list of the largest rekeningen (from the enriched GeoJSON)
+    renderTopRekeningen(detail2024, detailTableBody) {
+        detailTableBody.innerHTML = '';
+        if (detail2024.top_rekeningen && detail2024.top_rekeningen.length > 0) {
+            detail2024.top_rekeningen.forEach(rek => {
                 const row = document.createElement('tr');
-                row.innerHTML = '<td colspan="3" class="text-center text-muted">Geen gedetailleerde rekeningen beschikbaar</td>';
+                let displayName = rek.naam;
+                if (displayName.startsWith(rek.code)) {
+                    displayName = displayName.substring(rek.code.length).trim();
+                    if (displayName.startsWith('-')) {
+                        displayName = displayName.substring(1).trim();
+                    }
+                }
+                row.innerHTML = `
+                    <td class="code-col">${rek.code}</td>
+                    <td>${displayName}</td>
+                    <td class="bedrag-col">€ ${rek.bedrag.toFixed(2)}</td>
+                `;
                 detailTableBody.appendChild(row);
-            }
+            });
         } else {
-            detailWarning.style.display = 'none';
-            detailTableBody.innerHTML = '<tr><td colspan="3" class="text-center text-muted">Geen gedetailleerde data beschikbaar voor deze gemeente</td></tr>';
+            const row = document.createElement('tr');
+            row.innerHTML = '<td colspan="3" class="text-center text-muted">Geen gedetailleerde rekeningen beschikbaar</td>';
+            detailTableBody.appendChild(row);
         }
     }
 
     // Render beleidsveld view
     renderBeleidsveldView(properties, total2024, detailTableTitle, detailTableHeaderCol, detailTableBody, detailWarning) {
-        detailTableTitle.textContent = 'Top 10 per beleidsveld';
+        const { detail, beleidsdomein } = this.getYearData(properties);
+        const topCount = beleidsdomein?.top_beleidsvelden?.length || 10;
+        detailTableTitle.textContent = `Top ${topCount} per beleidsveld`;
         detailTableHeaderCol.textContent = 'Beleidsveld';
         
-        if (properties.beleidsdomein_2024 && properties.beleidsdomein_2024.totaal_beleidsdomein !== null) {
-            const beleidsdomein2024 = properties.beleidsdomein_2024;
+        if (beleidsdomein && beleidsdomein.totaal_beleidsdomein !== null) {
+            const beleidsdomein2024 = beleidsdomein;
             
             const diffBeleidsdomein = beleidsdomein2024.verschil_met_totaal;
             const diffBeleidsdoeinPercent = Math.abs(diffBeleidsdomein / total2024 * 100);
             
             let showWarning = diffBeleidsdoeinPercent > 1;
             
-            if (properties.detail_2024 && properties.detail_2024.totaal_details !== null) {
-                const diffRekeningen = properties.detail_2024.verschil_met_totaal;
+            if (detail && detail.totaal_details !== null) {
+                const diffRekeningen = detail.verschil_met_totaal;
                 const diffRekeningenPercent = Math.abs(diffRekeningen / total2024 * 100);
                 if (diffRekeningenPercent > 1) showWarning = true;
             }
@@ -6,7 +6,8 @@ export class ProvincialManager {
         this.provincialData = null;
         this.provincialDetailedData = null;
         this.provincialRekeningenData = null;
-        this.cpiData = null;
+        this.seriesData = null;
+        this.periodFactors = {};
         this.showNominal = true;
         this.showAdjusted = false;
         this.showStacked = false;
@@ -24,20 +25,20 @@ export class ProvincialManager {
     // Initialize provincial visualization
     async init() {
         try {
-            const [totalsResponse, detailedResponse, rekeningenResponse, cpiResponse] = await Promise.all([
+            const [totalsResponse, detailedResponse, rekeningenResponse, seriesResponse] = await Promise.all([
                 fetch('provincie_totals.json'),
                 fetch('provincie_detailed.json'),
                 fetch('provincie_rekeningen_detailed.json'),
-                fetch('cpi.json')
+                fetch('inflatie_series.json')
             ]);
             
             this.provincialData = await totalsResponse.json();
             this.provincialDetailedData = await detailedResponse.json();
             this.provincialRekeningenData = await rekeningenResponse.json();
-            this.cpiData = await cpiResponse.json();
+            this.seriesData = await seriesResponse.json();
             
-            // Process CPI data
-            this.processCPIData();
+            // Map precomputed period factors by meerjarenplan
+            this.processSeriesData();
             
             this.initChart();
             this.renderTable();
@@ -49,40 +50,29 @@ export class ProvincialManager {
         }
     }
 
-    // Process CPI data into usable format
-    processCPIData() {
-        this.cpiIndex = {};
-        if (this.cpiData && this.cpiData.facts) {
-            this.cpiData.facts.forEach(fact => {
-                const year = parseInt(fact.Jaar);
-                if (!this.cpiIndex[year]) {
-                    this.cpiIndex[year] = fact.Consumptieprijsindex;
-                }
-            });
-        }
-        // Use 2014 as base year
-        this.baseYearCPI = this.cpiIndex[2014] || 100;
-    }
-
-    // Calculate period-averaged CPI for adjustment
-    getPeriodCPI(periodLabel) {
-        const [startYear, endYear] = periodLabel.split('-').map(y => parseInt(y));
-        let sum = 0;
-        let count = 0;
-        for (let year = startYear; year <= endYear; year++) {
-            if (this.cpiIndex[year]) {
-                sum += this.cpiIndex[year];
-                count++;
-            }
-        }
-        return count > 0 ? sum / count : this.baseYearCPI;
+    // Map precomputed inflation factors by meerjarenplan
+    processSeriesData() {
+        this.periodFactors = {};
+        const periods = this.seriesData?.meerjarenplannen || [];
+        periods.forEach((period, idx) => {
+            this.periodFactors[period] = this.seriesData.periode_factoren[idx];
+        });
     }
 
-    // Adjust value for inflation to 2014 prices
+    // Adjust value for inflation to 2014 prices (factor precomputed by build.py)
     adjustForInflation(value, periodLabel) {
         if (!value || value === 0) return 0;
-        const periodCPI = this.getPeriodCPI(periodLabel);
-        return value * (this.baseYearCPI / periodCPI);
+        return value * (this.periodFactors[periodLabel] ?? 1);
+    }
+
+    // Get the precomputed real total for a province and period
+    getRealTotal(province, periodLabel) {
+        const series = this.seriesData?.provincie_totalen?.[province];
+        const idx = this.seriesData?.meerjarenplannen?.indexOf(periodLabel) ?? -1;
+        if (!series || idx === -1) {
+            return this.adjustForInflation(this.provincialData[province][periodLabel] || 0, periodLabel);
+        }
+        return series.reeel[idx] || 0;
     }
 
     // Initialize provincial chart
@@ -299,10 +289,7 @@ export class ProvincialManager {
             if (this.showAdjusted) {
                 datasets.push({
                     label: showBoth ? 'Reëel (2014)' : province,
-                    data: periods.map(period => {
-                        const value = this.provincialData[province][period] || 0;
-                        return this.adjustForInflation(value, period);
-                    }),
+                    data: periods.map(period => this.getRealTotal(province, period)),
                     backgroundColor: color + 'AA',
                     borderColor: color,
                     borderWidth: 1,
@@ -78,6 +78,81 @@ export function getColorScale(d, min, max) {
     return '#4575b4';                    // Bottom 10% - Dark blue (low)
 }
 
+// Choropleth colours per precomputed class (low to high)
+export const classColors = ['#4575b4', '#74add1', '#abd9e9', '#fdae61', '#f46d43', '#d73027'];
+
+// Decode a base64 string of uint8 class indices
+export function decodeClasses(encoded) {
+    return Uint8Array.from(atob(encoded), c => c.charCodeAt(0));
+}
+
+// Typed array constructors for the integer codings in matrix.json
+const integerArrays = { int8: Int8Array, int16: Int16Array, int32: Int32Array };
+
+// Decode one block of matrix.bin into a Float32Array (one column per year, NaN = missing)
+function decodeMatrixBlock(buffer, block, rows) {
+    if (block.codering === 'float32') {
+        return new Float32Array(buffer, block.offset, block.lengte);
+    }
+
+    const data = new integerArrays[block.type](buffer, block.offset, block.lengte);
+    const values = new Float32Array(block.lengte);
+    if (block.codering === 'delta') {
+        // Difference with the previous year, per municipality
+        const sums = new Float64Array(rows);
+        for (let i = 0; i < block.lengte; i++) {
+            sums[i % rows] += data[i];
+            values[i] = sums[i % rows] * block.schaal;
+        }
+    } else {
+        for (let i = 0; i < block.lengte; i++) {
+            values[i] = data[i] === block.ontbrekend ? NaN : data[i] * block.schaal;
+        }
+    }
+    return values;
+}
+
+// Load the municipality × year matrix (matrix.json header + matrix.bin)
+export async function loadMatrix(headerUrl, fetchOptions = {}) {
+    const headerResponse = await fetch(headerUrl, fetchOptions);
+    if (!headerResponse.ok) throw new Error(`Failed to fetch ${headerUrl}: ${headerResponse.status}`);
+    const header = await headerResponse.json();
+
+    const binUrl = new URL(header.bestand, new URL(headerUrl, window.location.href));
+    const binResponse = await fetch(binUrl, fetchOptions);
+    if (!binResponse.ok) throw new Error(`Failed to fetch ${header.bestand}: ${binResponse.status}`);
+    const buffer = await binResponse.arrayBuffer();
+
+    const rows = header.gemeenten.length;
+    const blocks = {};
+    Object.entries(header.blokken).forEach(([name, block]) => {
+        blocks[name] = decodeMatrixBlock(buffer, block, rows);
+    });
+
+    const index = new Map(header.gemeenten.map((name, idx) => [name, idx]));
+    return {
+        gemeenten: header.gemeenten,
+        jaren: header.jaren,
+        blocks,
+        // Value for one municipality and year, or null
+        value(block, name, year) {
+            const row = index.get(name);
+            const col = header.jaren.indexOf(year);
+            if (row === undefined || col === -1 || !blocks[block]) return null;
+            const value = blocks[block][col * rows + row];
+            return Number.isNaN(value) ? null : value;
+        },
+        // Series over the given years, in the {nominaal, reeel} shape of inflatie_series.json
+        series(name, years) {
+            if (!index.has(name)) return null;
+            return {
+                nominaal: years.map(year => this.value('nominaal', name, year)),
+                reeel: years.map(year => this.value('reeel', name, year))
+            };
+        }
+    };
+}
+
 // Escape HTML
 export function escapeHtml(text) {
     const div = document.createElement('div');
@@ -104,3 +179,26 @@ export function formatCurrencyShort(amount) {
     }
     return '€' + amount.toFixed(0);
 }
+
+// Get one year from a year-indexed property block (e.g. properties.detail).
+// Returns null when the block has no data for that year.
+export function getYearEntry(block, year) {
+    if (!block || !block.jaren) return null;
+    
+    const idx = block.jaren.indexOf(year);
+    if (idx === -1) return null;
+    
+    const entry = { jaar: year };
+    for (const [key, values] of Object.entries(block)) {
+        if (key !== 'jaren') entry[key] = values[idx];
+    }
+    
+    const hasData = Object.entries(entry).some(([key, value]) => key !== 'jaar' && value !== null);
+    return hasData ? entry : null;
+}
+
+// Latest year available in a year-indexed property block
+export function getLatestYear(block) {
+    if (!block || !block.jaren || block.jaren.length === 0) return null;
+    return block.jaren[block.jaren.length - 1];
+}
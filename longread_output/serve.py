@@ -1,7 +1,120 @@
 #!/usr/bin/env python3
-"""Simple HTTP server with proper MIME types for GeoJSON"""
+"""Simple HTTP server with proper MIME types for GeoJSON
+
+Also answers /api/locate?lat=..&lon=.. with the record of the municipality
+that contains the point (used by the kiosk) and serves the vector tiles
+from tiles.mbtiles at /tiles/{z}/{x}/{y}.pbf. /tiles.json (TileJSON) gives
+the tile URL with the version of the current build (?v=...); only tiles
+requested with that version are cached as immutable.
+
+Fingerprinted files (name.<hash>.ext, see build.py --fingerprint) are sent
+with a one-year immutable Cache-Control header.
+
+With --livereload the served directory is watched and /__livereload streams
+Server-Sent Events listing the files that changed, so a page opened during
+`build.py --watch` can re-fetch just those files. Usage:
+
+    python serve.py                 # serve the current directory
+    python serve.py ../dist         # serve the fingerprinted build
+    python serve.py --livereload    # development, together with build.py --watch
+"""
+import argparse
+import functools
 import http.server
+import json
+import re
 import socketserver
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from modules.fingerprint import FINGERPRINTED
+from modules.loaders import load_geojson
+from modules.locator import PointLocator
+from modules.tiles import read_metadata, read_tile
+from modules.watcher import watch
+
+GEOJSON_PATH = Path(__file__).resolve().parent / 'municipalities_enriched.geojson'
+MBTILES_PATH = Path(__file__).resolve().parent / 'tiles.mbtiles'
+TILE_PATTERN = re.compile(r'^/tiles/(\d+)/(\d+)/(\d+)\.pbf$')
+
+# Seconds between keep-alive comments on an idle event stream
+HEARTBEAT_SECONDS = 15
+
+class LiveReload:
+    """Watches a directory and wakes up the event streams on every change."""
+
+    def __init__(self, directory, on_change=None):
+        self.directory = Path(directory).resolve()
+        self.on_change = on_change
+        self.condition = threading.Condition()
+        self.version = 0
+        self.history = []  # (version, [relative paths])
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        for changed in watch([self.directory]):
+            files = sorted(path.relative_to(self.directory).as_posix() for path in changed)
+            if self.on_change:
+                self.on_change(files)
+            with self.condition:
+                self.version += 1
+                self.history = (self.history + [(self.version, files)])[-100:]
+                self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Files changed after `version` (empty list on timeout) and the new version."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            files = sorted({name for v, names in self.history if v > version for name in names})
+            return self.version, files
+
+class TileSet:
+    """Metadata of tiles.mbtiles, read again whenever a rebuild replaced the file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.metadata = {}
+
+    def read(self):
+        """Current metadata ({} while there is no tiles.mbtiles)."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_ino)
+        with self.lock:
+            if stamp != self.stamp:
+                self.metadata = read_metadata(self.path)
+                self.stamp = stamp
+            return self.metadata
+
+    def version(self):
+        return self.read().get('version', '')
+
+    def tilejson(self):
+        metadata = self.read()
+        if not metadata:
+            return None
+        version = metadata.get('version', '')
+        return {
+            'tilejson': '3.0.0',
+            'name': metadata.get('name'),
+            'version': version,
+            'tiles': [f'/tiles/{{z}}/{{x}}/{{y}}.pbf?v={version}'],
+            'minzoom': int(metadata.get('minzoom', 0)),
+            'maxzoom': int(metadata.get('maxzoom', 0)),
+            'bounds': [float(v) for v in metadata.get('bounds', '').split(',') if v],
+            **json.loads(metadata.get('json', '{}'))
+        }
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     extensions_map = {
@@ -17,11 +130,172 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         '.geojson': 'application/geo+json',
         '.xml': 'application/xml',
         '.wasm': 'application/wasm',
+        '.pbf': 'application/x-protobuf',
     }
 
+    # Built once at startup (see main)
+    locator = None
+    livereload = None
+    tileset = TileSet(MBTILES_PATH)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        tile = TILE_PATTERN.match(url.path)
+        if url.path == '/api/locate':
+            self.handle_locate(parse_qs(url.query))
+        elif url.path == '/__livereload':
+            self.handle_livereload()
+        elif url.path == '/tiles.json':
+            self.handle_tilejson()
+        elif tile:
+            self.handle_tile(*(int(v) for v in tile.groups()), parse_qs(url.query).get('v', [''])[0])
+        else:
+            super().do_GET()
+
+    def send_response(self, code, message=None):
+        self.status = code
+        super().send_response(code, message)
+
+    def end_headers(self):
+        path = urlparse(self.path).path
+        if self.status == 200 and FINGERPRINTED.search(path):
+            # Content-hashed name: a rebuild produces a new URL, so never revalidate
+            self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        elif path in ('/', '/index.html', '/asset-manifest.json', '/tiles.json'):
+            self.send_header('Cache-Control', 'no-cache')
+        super().end_headers()
+
+    def handle_locate(self, query):
+        try:
+            lat = float(query['lat'][0])
+            lon = float(query['lon'][0])
+        except (KeyError, ValueError):
+            self.send_json(400, {'error': 'Parameters lat en lon zijn verplicht'})
+            return
+
+        feature = self.locator.locate(lon, lat)
+        if feature is None:
+            self.send_json(404, {'error': 'Geen gemeente gevonden op deze locatie'})
+            return
+
+        self.send_json(200, feature['properties'])
+
+    def handle_livereload(self):
+        if self.livereload is None:
+            self.send_error(404, 'Live reload is off (start serve.py with --livereload)')
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        version = self.livereload.version
+        try:
+            while True:
+                version, files = self.livereload.wait(version, HEARTBEAT_SECONDS)
+                if files:
+                    data = json.dumps({'bestanden': files}, ensure_ascii=False)
+                    self.wfile.write(f'event: change\ndata: {data}\n\n'.encode('utf-8'))
+                else:
+                    self.wfile.write(b': ping\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def handle_tilejson(self):
+        try:
+            tilejson = self.tileset.tilejson()
+        except sqlite3.Error as e:
+            self.send_json(503, {'error': f'Tiles niet leesbaar: {e}'})
+            return
+        if tilejson is None:
+            self.send_json(404, {'error': 'Geen tiles.mbtiles (draai build.py)'})
+            return
+        self.send_json(200, tilejson)
+
+    def handle_tile(self, z, x, y, requested_version):
+        try:
+            version = self.tileset.version()
+            data = read_tile(MBTILES_PATH, z, x, y) if version else None
+        except sqlite3.Error as e:
+            # Replaced during a rebuild or not a valid database: let the client retry
+            self.send_response(503)
+            self.send_header('Retry-After', '1')
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.log_error('Tile %s/%s/%s: %s', z, x, y, e)
+            return
+
+        if not version:
+            self.send_error(404, 'No tiles.mbtiles (run build.py)')
+            return
+
+        # A URL with the current build version never changes; anything else revalidates via the ETag
+        etag = f'"{version}"'
+        cache_control = 'public, max-age=31536000, immutable' if requested_version == version else 'no-cache'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            self.end_headers()
+            return
+
+        if data is None:
+            # No municipality in this tile: nothing to draw
+            self.send_response(204)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-protobuf')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
 PORT = 8765
 
-with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-    print(f"Server running at http://localhost:{PORT}/")
-    print("Press Ctrl+C to stop")
-    httpd.serve_forever()
+class ThreadingServer(socketserver.ThreadingTCPServer):
+    # Event streams stay open, so every request gets its own thread
+    daemon_threads = True
+    allow_reuse_address = True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?', default='.', help='Directory to serve')
+    parser.add_argument('--livereload', action='store_true', help='Push file changes to /__livereload')
+    args = parser.parse_args()
+
+    MyHTTPRequestHandler.locator = PointLocator(load_geojson(GEOJSON_PATH))
+
+    if args.livereload:
+        def on_change(files):
+            # The kiosk lookup follows a rebuilt GeoJSON as well
+            if GEOJSON_PATH.name in files and GEOJSON_PATH.exists():
+                MyHTTPRequestHandler.locator = PointLocator(load_geojson(GEOJSON_PATH))
+
+        MyHTTPRequestHandler.livereload = LiveReload(args.directory, on_change)
+        MyHTTPRequestHandler.livereload.start()
+
+    handler = functools.partial(MyHTTPRequestHandler, directory=args.directory)
+
+    with ThreadingServer(("", PORT), handler) as httpd:
+        print(f"Server running at http://localhost:{PORT}/")
+        print("Press Ctrl+C to stop")
+        httpd.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,20 @@
 """
 Script om rekeningen data te aggregeren en valideren tegen beleidsveld totalen.
+
+Bedragen worden als int64 centen gelezen en opgeteld, dus beide totalen
+moeten exact gelijk zijn (geen tolerantie voor afrondingsfouten).
 """
 
 import pandas as pd
 import json
+import sys
 from pathlib import Path
 
+# Add modules to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modules.utils import parse_cents, cents_to_euro
+
 
 def aggregate_rekeningen_and_validate():
     """
@@ -14,11 +23,19 @@ def aggregate_rekeningen_and_validate():
     
     print("Laden van data...")
     
-    # Laad rekeningen data
-    rek_df = pd.read_csv('data/provinciebesturen/provincie_investeringen_per_rekening_cleaned.csv')
+    # Laad rekeningen data (bedrag in centen)
+    rek_df = pd.read_csv(
+        'data/provinciebesturen/provincie_investeringen_per_rekening_cleaned.csv',
+        converters={'bedrag': parse_cents}
+    )
+    rek_df['bedrag'] = rek_df['bedrag'].fillna(0).astype('int64')
     
-    # Laad beleidsveld data voor vergelijking
-    bel_df = pd.read_csv('data/provinciebesturen/provincie_investeringen_per_beleidsveld_cleaned.csv')
+    # Laad beleidsveld data voor vergelijking (provincie kolommen in centen)
+    bel_path = 'data/provinciebesturen/provincie_investeringen_per_beleidsveld_cleaned.csv'
+    bel_columns = [column for column in pd.read_csv(bel_path, nrows=0).columns if column.startswith('Provincie ')]
+    bel_df = pd.read_csv(bel_path, converters={column: parse_cents for column in bel_columns})
+    for column in bel_columns:
+        bel_df[column] = bel_df[column].fillna(0).astype('int64')
     
     # Bereken totalen per provincie per meerjarenplan van rekeningen
     print("\n=== Berekenen rekeningen totalen ===")
@@ -38,23 +55,22 @@ def aggregate_rekeningen_and_validate():
                 (rek_df['meerjarenplan'] == mjp)
             ]
             
-            # Bereken totaal per jaar, dan som over jaren
-            yearly_totals = data.groupby('boekjaar')['bedrag'].sum()
-            totaal = yearly_totals.sum()
-            rek_totals[prov_naam][mjp] = round(totaal, 2)
+            # Totaal in centen (integer som, dus onafhankelijk van de volgorde)
+            totaal = int(data['bedrag'].sum())
+            rek_totals[prov_naam][mjp] = totaal
             
             # Groepeer per rekening (over alle jaren)
-            rek_yearly = data.groupby(['rekening', 'boekjaar'])['bedrag'].sum().groupby('rekening').sum()
+            rek_yearly = data.groupby('rekening')['bedrag'].sum()
             rek_detailed[prov_naam][mjp] = {
-                'totaal': round(totaal, 2),
+                'totaal': cents_to_euro(totaal),
                 'per_rekening': {
-                    rek: round(bedrag, 2) 
+                    rek: cents_to_euro(bedrag)
                     for rek, bedrag in rek_yearly.sort_values(ascending=False).items() 
                     if bedrag > 0
                 }
             }
             
-            print(f"{prov_naam} {mjp}: €{totaal:.2f}")
+            print(f"{prov_naam} {mjp}: €{cents_to_euro(totaal):.2f}")
     
     # Bereken totalen van beleidsveld data voor vergelijking
     print("\n=== Berekenen beleidsveld totalen ===")
@@ -74,12 +90,10 @@ def aggregate_rekeningen_and_validate():
         
         for mjp in ['2014-2019', '2020-2025', '2026-2031']:
             data = bel_df[bel_df['meerjarenplan'] == mjp]
-            # Bereken totaal per jaar, dan som over jaren
-            yearly_totals = data.groupby('boekjaar')[provincie].sum()
-            totaal = yearly_totals.sum()
-            bel_totals[prov_naam][mjp] = round(totaal, 2)
+            totaal = int(data[provincie].sum())
+            bel_totals[prov_naam][mjp] = totaal
             
-            print(f"{prov_naam} {mjp}: €{totaal:.2f}")
+            print(f"{prov_naam} {mjp}: €{cents_to_euro(totaal):.2f}")
     
     # Vergelijk beide totalen
     print("\n=== VALIDATIE: Vergelijking Rekeningen vs Beleidsveld ===")
@@ -91,14 +105,17 @@ def aggregate_rekeningen_and_validate():
     
     for prov in sorted(rek_totals.keys()):
         for mjp in ['2014-2019', '2020-2025', '2026-2031']:
-            rek_val = rek_totals[prov][mjp]
-            bel_val = bel_totals[prov][mjp]
-            verschil = abs(rek_val - bel_val)
+            rek_cents = rek_totals[prov][mjp]
+            bel_cents = bel_totals[prov][mjp]
             
-            # Tolerantie van 0.01 voor afrondingsfouten
-            match = verschil < 0.01
+            # Beide totalen zijn exacte sommen in centen: geen tolerantie nodig
+            match = rek_cents == bel_cents
             match_str = "✓" if match else "✗"
             
+            rek_val = cents_to_euro(rek_cents)
+            bel_val = cents_to_euro(bel_cents)
+            verschil = cents_to_euro(abs(rek_cents - bel_cents))
+            
             if not match and (rek_val > 0 or bel_val > 0):
                 all_match = False
                 mismatches.append({
@@ -125,6 +142,10 @@ def aggregate_rekeningen_and_validate():
     print("\n=== Opslaan output bestanden ===")
     
     output_totals = 'longread_output/provincie_rekeningen_totals.json'
+    rek_totals = {
+        prov: {mjp: cents_to_euro(totaal) for mjp, totaal in per_mjp.items()}
+        for prov, per_mjp in rek_totals.items()
+    }
     with open(output_totals, 'w', encoding='utf-8') as f:
         json.dump(rek_totals, f, indent=2, ensure_ascii=False)
     print(f"✓ {output_totals}")
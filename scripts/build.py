@@ -10,30 +10,82 @@ Dit script:
 
 Gebruik:
     python build.py
+    python build.py --fingerprint   # ook dist/ met gehashte bestandsnamen
+    python build.py --watch         # na de build data/ en scripts/modules/ bewaken
+    python build.py --daemon        # na de build warm blijven en commando's aannemen
+                                    # (zie build_client.py)
 
 Output:
     - longread_output/municipalities_enriched.geojson
     - longread_output/beleidsdomein_totals.json
+    - longread_output/beleidsdomein_tensor.npy + beleidsdomein_tensor.json
+    - longread_output/averages.json
+    - longread_output/inflatie_series.json
+    - longread_output/rankings.json
+    - longread_output/classificatie.json
+    - longread_output/adjacency.json
+    - longread_output/tiles.mbtiles
+    - longread_output/extents.json
+    - longread_output/provincies.geojson
+    - longread_output/matrix.bin + matrix.json
+    - longread_output/rekeningen/ (breakdown per knoop van het rekeningenstelsel)
+    - dist/ (enkel met --fingerprint)
 """
 
+import argparse
+import os
 import sys
+import time
+import traceback
 from pathlib import Path
 
+import numpy as np
+
 # Add modules to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from modules.loaders import (
     load_geojson, 
-    save_geojson, 
+    GeoJSONWriter,
+    load_json,
     save_json,
     load_detail_csv, 
-    load_beleidsdomein_csv
+    load_beleidsdomein_csv,
+    discover_yearly_files,
+    load_yearly
 )
 from modules.processors import (
-    enrich_with_detail_data, 
-    enrich_with_beleidsdomein_data
+    detail_enricher,
+    beleidsdomein_enricher,
+    link_to_features
+)
+from modules.matcher import MunicipalityMatcher
+from modules.sparse import SparseMatrix
+from modules.utils import normalize_municipality_name, cents_to_euro
+from modules.beleidsdomein_totals import beleidsdomein_totals_from_cube
+from modules.cube import build_beleidsdomein_cube
+from modules.tensor import (
+    write_beleidsdomein_tensor,
+    load_beleidsdomein_tensor,
+    TENSOR_NAME,
+    TENSOR_MANIFEST_NAME
 )
-from modules.beleidsdomein_totals import generate_beleidsdomein_totals
+from modules.year_matrix import build_year_matrix, build_block_matrix
+from modules.averages import compute_averages
+from modules.inflation import load_cpi, cpi_factors, build_inflation_series
+from modules.rankings import build_rankings
+from modules.classification import build_classifications
+from modules.adjacency import build_adjacency, build_adjacency_output
+from modules.tiles import generate_tiles, MIN_ZOOM, MAX_ZOOM
+from modules.extents import add_feature_extents, build_extents
+from modules.dissolve import dissolve
+from modules.binary_matrix import write_binary_matrix
+from modules.hierarchy import AccountTree, rollup, write_breakdowns
+from modules.rekening_store import load_rekening_metadata
+from modules.fingerprint import fingerprint_site, MANIFEST_NAME
+from modules.pipeline import Pipeline
+from modules.watcher import watch
+from modules.daemon import BuildDaemon, DaemonError
 from modules.provincie_processors import (
     load_provincie_data,
     aggregate_provincie_totals,
@@ -42,136 +94,437 @@ from modules.provincie_processors import (
 )
 
 
-def main():
-    """Main build pipeline."""
-    
-    print("=" * 80)
-    print("BUILD PIPELINE: Investeringsuitgaven Gemeenten")
-    print("=" * 80)
-    print()
+# Aantal rekeningen/beleidsvelden per gemeente voor het detail paneel
+DETAIL_TOP_N = 25
+
+BASE_DIR = Path(__file__).parent.parent
+
+DEFAULT_SOCKET = BASE_DIR / '.build-daemon.sock'
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build pipeline: Investeringsuitgaven Gemeenten")
+    parser.add_argument(
+        '--fingerprint', action='store_true',
+        help="Kopieer de website naar dist/ met content-hash bestandsnamen en asset-manifest.json"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--watch', action='store_true',
+        help="Blijf data/ en scripts/modules/ bewaken en bouw enkel de getroffen stappen opnieuw"
+    )
+    mode.add_argument(
+        '--daemon', action='store_true',
+        help="Blijf draaien met alle geparste data in het geheugen en neem rebuild/query commando's aan"
+    )
+    parser.add_argument(
+        '--socket', type=Path, default=DEFAULT_SOCKET,
+        help=f"Unix socket van de daemon (standaard: {DEFAULT_SOCKET.name} in de repository)"
+    )
+    return parser.parse_args(argv)
+
+
+def create_pipeline(base_dir: Path = BASE_DIR, fingerprint: bool = False) -> Pipeline:
+    """
+    Definieer alle build stappen met hun input bestanden en afhankelijkheden.
     
-    # Define paths
-    base_dir = Path(__file__).parent.parent
+    Args:
+        base_dir: Root van de repository
+        fingerprint: Ook de gefingerprinte kopie in dist/ maken
+        
+    Returns:
+        Pipeline die met run() (opnieuw) uitgevoerd kan worden
+    """
     data_dir = base_dir / 'data'
     output_dir = base_dir / 'longread_output'
     
     # Input files
     geojson_input = output_dir / 'municipalities.geojson'
-    detail_csv = data_dir / 'detail-alle-2024.csv'
-    beleidsdomein_csv = data_dir / 'investeringsuitgave per beleidsdomein 2024.csv'
     beleidsdomein_all_years_csv = data_dir / 'investeringsuitgave per beleidsdomein.csv'
+    aliases_file = data_dir / 'gemeente_aliassen.json'
+    cpi_input = data_dir / 'cpi.json'
+    population_input = data_dir / 'bevolking.json'
+    provincie_csv = data_dir / 'provinciebesturen' / 'provincie_investeringen_per_beleidsveld_cleaned.csv'
+    hierarchy_input = data_dir / 'opgesplitst_grouped' / 'meta.json'
     
     # Output files
     geojson_output = output_dir / 'municipalities_enriched.geojson'
     beleidsdomein_totals_output = output_dir / 'beleidsdomein_totals.json'
+    tensor_output = output_dir / TENSOR_NAME
+    tensor_manifest_output = output_dir / TENSOR_MANIFEST_NAME
+    provincie_totals_output = output_dir / 'provincie_totals.json'
+    provincie_detailed_output = output_dir / 'provincie_detailed.json'
+    provincie_stats_output = output_dir / 'provincie_stats.json'
+    averages_output = output_dir / 'averages.json'
+    inflation_series_output = output_dir / 'inflatie_series.json'
+    rankings_output = output_dir / 'rankings.json'
+    classification_output = output_dir / 'classificatie.json'
+    adjacency_output = output_dir / 'adjacency.json'
+    tiles_output = output_dir / 'tiles.mbtiles'
+    extents_output = output_dir / 'extents.json'
+    provinces_geojson_output = output_dir / 'provincies.geojson'
+    matrix_output = output_dir / 'matrix.bin'
+    matrix_header_output = output_dir / 'matrix.json'
+    hierarchy_output = output_dir / 'rekeningen'
+    dist_dir = base_dir / 'dist'
     
-    # Step 1: Load base GeoJSON
-    print("📂 Stap 1: Laden van base GeoJSON...")
-    geojson_data = load_geojson(geojson_input)
-    print(f"   ✓ {len(geojson_data['features'])} gemeenten geladen")
-    print()
+    def source(path: Path) -> str:
+        return path.relative_to(base_dir).as_posix()
     
-    # Step 2: Load and process detail CSV
-    print("📂 Stap 2: Verwerken van detail CSV (rekeningen)...")
-    detail_data = load_detail_csv(detail_csv)
-    print(f"   ✓ {len(detail_data)} gemeenten met detail data")
-    print()
+    pipeline = Pipeline(base_dir)
     
-    # Step 3: Load and process beleidsdomein CSV
-    print("📂 Stap 3: Verwerken van beleidsdomein CSV...")
-    beleidsdomein_data = load_beleidsdomein_csv(beleidsdomein_csv)
-    print(f"   ✓ {len(beleidsdomein_data)} gemeenten met beleidsdomein data")
-    print()
+    # Step 1: Load base GeoJSON
+    @pipeline.step(sources=(source(geojson_input),))
+    def geometry():
+        print("📂 Stap 1: Laden van base GeoJSON...")
+        # Geometrie als NumPy buffers; pas bij het wegschrijven terug naar lijsten
+        geojson_data = load_geojson(geojson_input, geometry_array=True)
+        print(f"   ✓ {len(geojson_data['features'])} gemeenten geladen")
+        print()
+        return geojson_data
     
-    # Step 4: Enrich GeoJSON with detail data
-    print("🔗 Stap 4: Verrijken GeoJSON met detail data...")
-    geojson_data, detail_matches = enrich_with_detail_data(geojson_data, detail_data)
-    print(f"   ✓ {detail_matches} gemeenten gekoppeld met detail data")
-    print()
+    @pipeline.step(deps=('geometry',), sources=(source(aliases_file),))
+    def matcher(geometry):
+        return MunicipalityMatcher(
+            (feature['properties']['municipality'] for feature in geometry['features']),
+            alias_path=aliases_file
+        )
     
-    # Step 5: Enrich GeoJSON with beleidsdomein data
-    print("🔗 Stap 5: Verrijken GeoJSON met beleidsdomein data...")
-    geojson_data, beleidsdomein_matches = enrich_with_beleidsdomein_data(geojson_data, beleidsdomein_data)
-    print(f"   ✓ {beleidsdomein_matches} gemeenten gekoppeld met beleidsdomein data")
-    print()
+    # Step 2: Load and process detail CSV
+    @pipeline.step(sources=('data/detail-alle-*.csv',))
+    def detail():
+        print("📂 Stap 2: Verwerken van detail CSV's (rekeningen)...")
+        # Eén bestand per boekjaar, bv. 'detail-alle-2024.csv'
+        detail_by_year = load_yearly(load_detail_csv, discover_yearly_files(data_dir, 'detail-alle-*.csv'))
+        for year, detail_data in detail_by_year.items():
+            print(f"   ✓ {year}: {len(detail_data)} gemeenten met detail data")
+        print()
+        return detail_by_year
     
-    # Step 6: Save enriched GeoJSON
-    print("💾 Stap 6: Opslaan verrijkte GeoJSON...")
-    save_geojson(geojson_data, geojson_output)
-    print(f"   ✓ Opgeslagen: {geojson_output}")
-    print()
+    # Step 3: Load and process beleidsdomein CSV
+    @pipeline.step(sources=('data/investeringsuitgave per beleidsdomein *.csv',))
+    def beleidsdomein():
+        print("📂 Stap 3: Verwerken van beleidsdomein CSV's...")
+        beleidsdomein_by_year = load_yearly(
+            load_beleidsdomein_csv,
+            discover_yearly_files(data_dir, 'investeringsuitgave per beleidsdomein *.csv')
+        )
+        for year, beleidsdomein_data in beleidsdomein_by_year.items():
+            print(f"   ✓ {year}: {len(beleidsdomein_data)} gemeenten met beleidsdomein data")
+        print()
+        return beleidsdomein_by_year
     
-    # Step 7: Generate beleidsdomein totals
-    print("📊 Stap 7: Genereren beleidsdomein totals (alle jaren)...")
-    beleidsdomein_totals = generate_beleidsdomein_totals(beleidsdomein_all_years_csv)
-    print(f"   ✓ {len(beleidsdomein_totals)} beleidsdomeinen verwerkt")
-    years = sorted(set(year for subdomeinen in beleidsdomein_totals.values() for year in subdomeinen.keys()))
-    print(f"   ✓ Jaren: {min(years)} - {max(years)}")
-    print()
+    # Steps 4-6: Link, enrich and save the GeoJSON, one feature at a time
+    @pipeline.step(deps=('geometry', 'matcher', 'detail', 'beleidsdomein'))
+    def enrich(geometry, matcher, detail, beleidsdomein):
+        matcher.unmatched.clear()
+        
+        print("🔗 Stap 4: Koppelen detail data aan gemeenten...")
+        enrich_detail, detail_matches = detail_enricher(detail, matcher, top_n=DETAIL_TOP_N)
+        print(f"   ✓ {len(detail_matches)} jaren")
+        print()
+        
+        print("🔗 Stap 5: Koppelen beleidsdomein data aan gemeenten...")
+        enrich_beleidsdomein, beleidsdomein_matches = beleidsdomein_enricher(
+            beleidsdomein, matcher, top_n=DETAIL_TOP_N
+        )
+        print(f"   ✓ {len(beleidsdomein_matches)} jaren")
+        for name in sorted(set(matcher.unmatched)):
+            print(f"   ⚠ Geen gemeente gevonden voor: {name}")
+        matcher.save()
+        print()
+        
+        print("💾 Stap 6: Verrijken en opslaan GeoJSON (per feature)...")
+        add_feature_extents(geometry)
+        with GeoJSONWriter(geojson_output, geometry) as writer:
+            for feature in geometry['features']:
+                writer.write(enrich_beleidsdomein(enrich_detail(feature)))
+        for year, count in detail_matches.items():
+            print(f"   ✓ {year}: {count} gemeenten gekoppeld met detail data")
+        for year, count in beleidsdomein_matches.items():
+            print(f"   ✓ {year}: {count} gemeenten gekoppeld met beleidsdomein data")
+        print(f"   ✓ Bbox, centroid en labelpunt per gemeente")
+        print(f"   ✓ Opgeslagen: {geojson_output}")
+        print()
+        return geometry
     
-    # Step 8: Save beleidsdomein totals
-    print("💾 Stap 8: Opslaan beleidsdomein totals...")
-    save_json(beleidsdomein_totals, beleidsdomein_totals_output)
-    print(f"   ✓ Opgeslagen: {beleidsdomein_totals_output}")
-    print()
+    # Step 7: Beleidsdomein cube (all levels × years × municipality/province/Vlaanderen)
+    @pipeline.step(deps=('geometry', 'matcher'), sources=(source(beleidsdomein_all_years_csv),))
+    def cube(geometry, matcher):
+        print("📊 Stap 7: Opbouwen beleidsdomein kubus (alle jaren)...")
+        provinces = {
+            normalize_municipality_name(feature['properties']['municipality']): feature['properties'].get('province')
+            for feature in geometry['features']
+        }
+        beleidsdomein_cube = build_beleidsdomein_cube(
+            beleidsdomein_all_years_csv,
+            province_of=lambda name: provinces.get(matcher.match(name))
+        )
+        print(f"   ✓ Niveaus: {' → '.join(beleidsdomein_cube.levels)}")
+        print(f"   ✓ {len(beleidsdomein_cube.regions['gemeente'])} gemeenten, "
+              f"{len(beleidsdomein_cube.regions['provincie'])} provincies, "
+              f"jaren {min(beleidsdomein_cube.years)} - {max(beleidsdomein_cube.years)}")
+        print(f"   ✓ {len(beleidsdomein_cube.sums)} aggregaties ({beleidsdomein_cube.nbytes / 1024:.0f} KB)")
+        manifest = write_beleidsdomein_tensor(beleidsdomein_cube, tensor_output, tensor_manifest_output)
+        print(f"   ✓ Tensor {' × '.join(manifest['assen'])} {tuple(manifest['vorm'])} float32")
+        print(f"   ✓ Opgeslagen: {tensor_output.name} + {tensor_manifest_output.name}")
+        print()
+        return beleidsdomein_cube
     
-    # Step 9: Load and process provinciale data
-    print("📂 Stap 9: Laden provinciale investeringsdata...")
-    provincie_csv = data_dir / 'provinciebesturen' / 'provincie_investeringen_per_beleidsveld_cleaned.csv'
+    # Step 8: Beleidsdomein totals, answered from the cube
+    @pipeline.step(deps=('cube',))
+    def beleidsdomein_totals(cube):
+        print("💾 Stap 8: Genereren en opslaan beleidsdomein totals (uit de kubus)...")
+        totals = beleidsdomein_totals_from_cube(cube)
+        print(f"   ✓ {len(totals)} beleidsdomeinen verwerkt")
+        save_json(totals, beleidsdomein_totals_output)
+        print(f"   ✓ Opgeslagen: {beleidsdomein_totals_output}")
+        print()
+        return totals
     
-    if provincie_csv.exists():
+    # Step 9: Provinciale data (het DataFrame blijft in het geheugen)
+    @pipeline.step(sources=(source(provincie_csv),))
+    def provincie_data():
+        print("📂 Stap 9: Laden provinciale investeringsdata...")
+        if not provincie_csv.exists():
+            print(f"   ⚠ Provinciale data niet gevonden: {provincie_csv}")
+            print(f"   → Run eerst: python scripts/clean_provincie_data.py")
+            print()
+            return None
+        
         provincie_df = load_provincie_data(provincie_csv)
         print(f"   ✓ {len(provincie_df)} rijen provinciale data geladen")
         print()
+        return provincie_df
+    
+    # Steps 10-12
+    @pipeline.step(deps=('provincie_data',))
+    def provincie(provincie_data):
+        if provincie_data is None:
+            return load_json(provincie_totals_output) if provincie_totals_output.exists() else None
         
         # Step 10: Aggregate provincie totals
         print("📊 Stap 10: Aggregeren provinciale totalen...")
-        provincie_totals = aggregate_provincie_totals(provincie_df)
+        provincie_totals = aggregate_provincie_totals(provincie_data)
         print(f"   ✓ {len(provincie_totals)} provincies verwerkt")
         print()
         
-        # Step 11: Create detailed provincie data
-        print("📊 Stap 11: Genereren gedetailleerde provinciale data...")
-        provincie_detailed = create_detailed_provincie_data(provincie_df)
-        print(f"   ✓ Gedetailleerde data gegenereerd")
-        print()
-        
-        # Step 12: Calculate statistics
-        print("📊 Stap 12: Berekenen provinciale statistieken...")
+        # Step 11: Calculate statistics
+        print("📊 Stap 11: Berekenen provinciale statistieken...")
         provincie_stats = calculate_provincie_statistics(provincie_totals)
         print(f"   ✓ Statistieken berekend voor {len(provincie_stats)} meerjarenplannen")
         print()
         
-        # Step 13: Save provincie outputs
-        print("💾 Stap 13: Opslaan provinciale data...")
-        provincie_totals_output = output_dir / 'provincie_totals.json'
-        provincie_detailed_output = output_dir / 'provincie_detailed.json'
-        provincie_stats_output = output_dir / 'provincie_stats.json'
-        
+        # Step 12: Save provincie outputs
+        print("💾 Stap 12: Opslaan provinciale data...")
         save_json(provincie_totals, provincie_totals_output)
-        save_json(provincie_detailed, provincie_detailed_output)
         save_json(provincie_stats, provincie_stats_output)
         
         print(f"   ✓ Opgeslagen: {provincie_totals_output.name}")
-        print(f"   ✓ Opgeslagen: {provincie_detailed_output.name}")
         print(f"   ✓ Opgeslagen: {provincie_stats_output.name}")
         print()
-    else:
-        print(f"   ⚠ Provinciale data niet gevonden: {provincie_csv}")
-        print(f"   → Run eerst: python scripts/clean_provincie_data.py")
+        return provincie_totals
+    
+    # Step 13: Detailed provincie data (kept in memory for the daemon's provincie query)
+    @pipeline.step(deps=('provincie_data',))
+    def provincie_detailed(provincie_data):
+        if provincie_data is None:
+            return load_json(provincie_detailed_output) if provincie_detailed_output.exists() else None
+        
+        print("📊 Stap 13: Genereren gedetailleerde provinciale data...")
+        provincie_detailed = create_detailed_provincie_data(provincie_data)
+        save_json(provincie_detailed, provincie_detailed_output)
+        print(f"   ✓ {len(provincie_detailed)} provincies")
+        print(f"   ✓ Opgeslagen: {provincie_detailed_output.name}")
+        print()
+        return provincie_detailed
+    
+    # De jaarbedragen staan al in de base GeoJSON: los van de detail data
+    @pipeline.step(deps=('geometry',))
+    def year_matrix(geometry):
+        return build_year_matrix(geometry)
+    
+    @pipeline.step(sources=(source(cpi_input),))
+    def cpi():
+        return load_cpi(cpi_input)
+    
+    # Step 14: Averages per region
+    @pipeline.step(deps=('year_matrix',), sources=(source(population_input),))
+    def averages(year_matrix):
+        print("📊 Stap 14: Berekenen gemiddelden per regio...")
+        population = load_json(population_input) if population_input.exists() else None
+        result = compute_averages(year_matrix, population)
+        save_json(result, averages_output)
+        print(f"   ✓ Vlaanderen + {len(result['Provincies'])} provincies, jaren {year_matrix.years[0]} - {year_matrix.years[-1]}")
+        if population is None:
+            print(f"   ⚠ Geen bevolkingsdata ({population_input.name}), enkel ongewogen gemiddelden")
+        print(f"   ✓ Opgeslagen: {averages_output.name}")
+        print()
+        return result
+    
+    # Step 15: Inflation-adjusted series
+    @pipeline.step(deps=('year_matrix', 'averages', 'beleidsdomein_totals', 'cpi', 'provincie'))
+    def inflation(year_matrix, averages, beleidsdomein_totals, cpi, provincie):
+        print("📊 Stap 15: Berekenen reële reeksen (inflatiecorrectie)...")
+        inflation_series = build_inflation_series(
+            year_matrix,
+            averages,
+            beleidsdomein_totals,
+            cpi,
+            provincie
+        )
+        save_json(inflation_series, inflation_series_output)
+        print(f"   ✓ Referentiejaar {inflation_series['referentiejaar']}, {len(inflation_series['provincies'])} provincies")
+        print(f"   ✓ Opgeslagen: {inflation_series_output.name}")
+        print()
+    
+    # Step 16: Rankings and percentiles
+    @pipeline.step(deps=('enrich', 'year_matrix'))
+    def rankings(enrich, year_matrix):
+        print("📊 Stap 16: Berekenen rangschikkingen en percentielen...")
+        result = build_rankings(year_matrix, {
+            'detail': build_block_matrix(enrich, 'detail', 'totaal_details'),
+            'beleidsdomein': build_block_matrix(enrich, 'beleidsdomein', 'totaal_beleidsdomein')
+        })
+        save_json(result, rankings_output, compact=True)
+        print(f"   ✓ Metrieken: {', '.join(result['metrieken'])}")
+        print(f"   ✓ Opgeslagen: {rankings_output.name}")
+        print()
+    
+    # Step 17: Choropleth class breaks
+    @pipeline.step(deps=('year_matrix', 'cpi'))
+    def classification(year_matrix, cpi):
+        print("📊 Stap 17: Berekenen klassegrenzen voor de kaart...")
+        classifications = build_classifications(year_matrix, cpi_factors(year_matrix.years, cpi))
+        save_json(classifications, classification_output, compact=True)
+        print(f"   ✓ {len(classifications['jaren'])} jaren × {len(classifications['modi'])} modi × "
+              f"{len(classifications['methodes'])} methodes × {len(classifications['schalen'])} schalen")
+        print(f"   ✓ Opgeslagen: {classification_output.name}")
+        print()
+    
+    # Step 18: Neighbouring municipalities
+    @pipeline.step(deps=('geometry', 'year_matrix'))
+    def adjacency(geometry, year_matrix):
+        print("📊 Stap 18: Bepalen buurgemeenten en buurgemiddelden...")
+        result = build_adjacency(geometry)
+        save_json(build_adjacency_output(year_matrix, result), adjacency_output, compact=True)
+        print(f"   ✓ {len(result.indices) // 2} buurparen")
+        print(f"   ✓ Opgeslagen: {adjacency_output.name}")
+        print()
+    
+    # Step 19: Vector tiles
+    @pipeline.step(deps=('geometry',))
+    def tiles(geometry):
+        print("📊 Stap 19: Genereren vector tiles...")
+        tile_count = generate_tiles(geometry, tiles_output)
+        print(f"   ✓ {tile_count} tiles (zoom {MIN_ZOOM} - {MAX_ZOOM})")
+        print(f"   ✓ Opgeslagen: {tiles_output.name}")
+        print()
+    
+    # Step 20: Province outlines and extents (labels on the dissolved geometry)
+    @pipeline.step(deps=('geometry',))
+    def provinces(geometry):
+        print("📊 Stap 20: Samenvoegen gemeenten tot provincies...")
+        provinces_geojson = dissolve(geometry, 'province')
+        save_json(provinces_geojson, provinces_geojson_output, compact=True)
+        print(f"   ✓ {len(provinces_geojson['features'])} provincies")
+        print(f"   ✓ Opgeslagen: {provinces_geojson_output.name}")
+        
+        # Labelpunten op de samengevoegde geometrie, niet op de centroid
+        flanders_geojson = dissolve(geometry, lambda properties: 'Vlaanderen')
+        outlines = {
+            feature['properties']['naam']: feature['geometry']
+            for feature in provinces_geojson['features'] + flanders_geojson['features']
+        }
+        extents = build_extents(geometry, outlines)
+        save_json(extents, extents_output)
+        print(f"   ✓ Opgeslagen: {extents_output.name} ({len(extents['Provincies'])} provincies)")
+        print()
+    
+    # Step 21: Binary municipality × year matrix
+    @pipeline.step(deps=('year_matrix', 'cpi'))
+    def matrix(year_matrix, cpi):
+        print("📊 Stap 21: Exporteren gemeenten × jaren matrix (binair)...")
+        matrix_header = write_binary_matrix(year_matrix, {
+            'nominaal': year_matrix.values,
+            'reeel': year_matrix.values * cpi_factors(year_matrix.years, cpi)
+        }, matrix_output, matrix_header_output)
+        for name, block in matrix_header['blokken'].items():
+            print(f"   ✓ {name}: {block['codering']} ({block['type']})")
+        print(f"   ✓ Opgeslagen: {matrix_output.name} + {matrix_header_output.name}")
+        print()
+    
+    # Step 22: Chart-of-accounts tree with subtotals per level
+    @pipeline.step(deps=('geometry', 'matcher', 'detail'), sources=(source(hierarchy_input),))
+    def hierarchy(geometry, matcher, detail):
+        print("📊 Stap 22: Opbouwen rekeningenboom met subtotalen per niveau...")
+        if hierarchy_input.exists():
+            tree = AccountTree.from_rekeningen(load_rekening_metadata(hierarchy_input.parent))
+        else:
+            tree = AccountTree()
+            print(f"   ⚠ Geen niveaus ({hierarchy_input.relative_to(data_dir)}), rekeningen rechtstreeks onder de wortel")
+            print(f"   → Run eerst: python scripts/prepare_data.py")
+        
+        # Eerst alle rekeningen in de boom, zodat elk jaar evenveel knopen heeft
+        for year_matrix_detail in detail.values():
+            tree.leaf_ids(year_matrix_detail)
+        
+        names = [feature['properties']['municipality'] for feature in geometry['features']]
+        years = sorted(detail)
+        subtotals = np.full((len(years), len(tree), len(names)), np.nan)
+        for i, year in enumerate(years):
+            rows = link_to_features(detail[year].row_index, matcher)
+            year_subtotals = rollup(detail[year], tree)
+            for column, name in enumerate(names):
+                row = rows.get(normalize_municipality_name(name))
+                if row is not None:
+                    subtotals[i, :, column] = cents_to_euro(year_subtotals[:, row])
+        
+        count = write_breakdowns(tree, names, years, subtotals, hierarchy_output)
+        print(f"   ✓ {len(tree)} knopen, {len(tree.leaves)} rekeningen, diepte {max(tree.depths)}")
+        print(f"   ✓ Opgeslagen: {hierarchy_output.relative_to(base_dir)}/ ({count} breakdowns)")
         print()
+        return tree
+    
+    # Step 23: Fingerprinted copy of the website
+    if fingerprint:
+        @pipeline.step(
+            deps=('enrich', 'beleidsdomein_totals', 'provincie', 'provincie_detailed', 'averages', 'inflation',
+                  'rankings', 'classification', 'adjacency', 'provinces', 'matrix', 'hierarchy'),
+            sources=('longread_output/index.html', 'longread_output/js/*.js', 'longread_output/css/*.css')
+        )
+        def site(**_):
+            print("📦 Stap 23: Fingerprinten van de website...")
+            manifest = fingerprint_site(output_dir, dist_dir)
+            print(f"   ✓ {len(manifest)} bestanden met content-hash")
+            print(f"   ✓ Opgeslagen: {dist_dir.relative_to(base_dir)}/ + {MANIFEST_NAME}")
+            print()
+    
+    return pipeline
+
+
+def print_summary(base_dir: Path, fingerprint: bool) -> None:
+    output_dir = base_dir / 'longread_output'
     
-    # Summary
     print("=" * 80)
     print("✅ BUILD VOLTOOID")
     print("=" * 80)
     print()
     print("Output bestanden (gemeenten):")
-    print(f"  • {geojson_output.relative_to(base_dir)}")
-    print(f"  • {beleidsdomein_totals_output.relative_to(base_dir)}")
+    for name in ('municipalities_enriched.geojson', 'beleidsdomein_totals.json', 'averages.json',
+                 'inflatie_series.json', 'rankings.json', 'classificatie.json', 'adjacency.json',
+                 'tiles.mbtiles', 'extents.json', 'provincies.geojson', 'matrix.bin', 'matrix.json', 'rekeningen/',
+                 TENSOR_NAME, TENSOR_MANIFEST_NAME):
+        print(f"  • {(output_dir / name).relative_to(base_dir)}")
     print()
     
-    if provincie_csv.exists():
+    if fingerprint:
+        print("Website met gehashte bestandsnamen:")
+        print(f"  • {(base_dir / 'dist' / 'index.html').relative_to(base_dir)}")
+        print(f"  • {(base_dir / 'dist' / MANIFEST_NAME).relative_to(base_dir)}")
+        print()
+    
+    if (base_dir / 'data' / 'provinciebesturen' / 'provincie_investeringen_per_beleidsveld_cleaned.csv').exists():
         print("Output bestanden (provincies):")
         print(f"  • {(output_dir / 'provincie_totals.json').relative_to(base_dir)}")
         print(f"  • {(output_dir / 'provincie_detailed.json').relative_to(base_dir)}")
@@ -180,10 +533,171 @@ def main():
     
     print("Bestaande bestanden (niet gewijzigd):")
     print(f"  • {(output_dir / 'municipalities.geojson').relative_to(base_dir)}")
-    print(f"  • {(output_dir / 'averages.json').relative_to(base_dir)}")
     print(f"  • {(output_dir / 'cpi.json').relative_to(base_dir)}")
     print()
 
 
+def watch_and_rebuild(pipeline: Pipeline, base_dir: Path = BASE_DIR) -> None:
+    """
+    Bouw opnieuw bij elke wijziging in data/ of scripts/modules/.
+    
+    Een gewijzigde data file herberekent enkel de stappen die ervan afhangen
+    (de rest komt uit het geheugen). Een gewijzigde module herstart het
+    proces, zodat alle code opnieuw geïmporteerd wordt.
+    """
+    directories = [base_dir / 'data', base_dir / 'scripts' / 'modules']
+    print(f"👀 Watch mode: {', '.join(str(d.relative_to(base_dir)) for d in directories)} (Ctrl+C om te stoppen)")
+    print()
+    
+    for changed in watch(directories):
+        names = ', '.join(sorted(path.name for path in changed))
+        if any(path.suffix == '.py' for path in changed):
+            print(f"🔁 Code gewijzigd ({names}), herstarten...")
+            print()
+            os.execv(sys.executable, [sys.executable, *sys.argv])
+        
+        print(f"🔁 Gewijzigd: {names}")
+        start = time.perf_counter()
+        try:
+            executed = pipeline.run()
+        except Exception:
+            traceback.print_exc()
+            print("   ⚠ Build mislukt, wacht op de volgende wijziging")
+            print()
+            continue
+        
+        if executed:
+            print(f"   ✓ {len(executed)} stappen opnieuw in {time.perf_counter() - start:.2f}s: {', '.join(executed)}")
+        else:
+            print(f"   ✓ Niets te doen")
+        print()
+
+
+def create_daemon(pipeline: Pipeline, socket_path: Path = DEFAULT_SOCKET) -> BuildDaemon:
+    """
+    Daemon rond de pipeline, met queries op de datasets in het geheugen.
+    
+    Args:
+        pipeline: Pipeline die al een keer gedraaid heeft
+        socket_path: Pad van de Unix socket
+        
+    Returns:
+        BuildDaemon (nog niet gestart)
+    """
+    daemon = BuildDaemon(pipeline, socket_path)
+    
+    def lookup(results: dict, naam: str) -> str:
+        target = results['matcher'].match(naam)
+        if target is None:
+            raise DaemonError(f"Onbekende gemeente: {naam}")
+        return target
+    
+    def matrix_for(results: dict, step: str, jaar: int) -> SparseMatrix:
+        if int(jaar) not in results[step]:
+            raise DaemonError(f"Geen {step} data voor {jaar}")
+        return results[step][int(jaar)]
+    
+    def per_year(results: dict, step: str, naam: str, jaar: int | None) -> dict:
+        target = lookup(results, naam)
+        result = {}
+        for year in ([int(jaar)] if jaar is not None else sorted(results[step])):
+            matrix = matrix_for(results, step, year)
+            row = link_to_features(matrix.row_index, results['matcher']).get(target)
+            result[year] = matrix.row_dict(row) if row is not None else None
+        return result
+    
+    @daemon.query
+    def gemeente(results, naam):
+        # Properties zoals in municipalities_enriched.geojson, zonder geometrie
+        target = lookup(results, naam)
+        for feature in results['enrich']['features']:
+            if normalize_municipality_name(feature['properties']['municipality']) == target:
+                return feature['properties']
+    
+    @daemon.query
+    def detail(results, naam, jaar=None):
+        return per_year(results, 'detail', naam, jaar)
+    
+    @daemon.query
+    def beleidsdomein(results, naam, jaar=None):
+        return per_year(results, 'beleidsdomein', naam, jaar)
+    
+    @daemon.query
+    def provincie_totalen(results, jaar, bron='detail'):
+        # Som per rekening (of beleidsveld) over de gemeenten van elke provincie
+        matrix = matrix_for(results, bron, jaar)
+        linked = link_to_features(matrix.row_index, results['matcher'])
+        groups = [None] * len(matrix)
+        for feature in results['geometry']['features']:
+            row = linked.get(normalize_municipality_name(feature['properties']['municipality']))
+            if row is not None:
+                groups[row] = feature['properties'].get('province')
+        provinces, sums = matrix.group_sums(groups)
+        return {
+            province: {matrix.columns[j]: cents_to_euro(value) for j, value in enumerate(row.tolist()) if value}
+            for province, row in zip(provinces, sums)
+        }
+    
+    @daemon.query
+    def kubus(results, niveau='totaal', geo='vlaanderen', lid=None, jaar=None, regio=None):
+        # Slice uit de beleidsdomein kubus, bv. niveau=domein geo=provincie jaar=2024
+        try:
+            return results['cube'].slice(niveau, geo, lid, jaar, regio).to_dict()
+        except KeyError as e:
+            raise DaemonError(e.args[0]) from None
+    
+    @daemon.query
+    def beleidsdomein_reeks(results, naam):
+        # Tijdreeks per subdomein uit de tensor op schijf (memmap, geen parse van de CSV)
+        tensor = load_beleidsdomein_tensor(pipeline.base_dir / 'longread_output' / TENSOR_MANIFEST_NAME)
+        try:
+            return {'jaren': tensor.jaren, tensor.level: tensor.series(naam)}
+        except KeyError as e:
+            raise DaemonError(e.args[0]) from None
+    
+    @daemon.query
+    def provincie(results, naam=None, meerjarenplan=None):
+        if naam is None:
+            return results['provincie']
+        detailed = results['provincie_detailed']
+        if detailed is None:
+            raise DaemonError("Geen provinciale data geladen")
+        result = detailed.get(naam.replace('Provincie ', ''))
+        if result is None:
+            raise DaemonError(f"Onbekende provincie: {naam}")
+        if meerjarenplan is None:
+            return result
+        if meerjarenplan not in result:
+            raise DaemonError(f"Onbekend meerjarenplan: {meerjarenplan} (kies uit {', '.join(result)})")
+        return result[meerjarenplan]
+    
+    return daemon
+
+
+def main(argv: list[str] | None = None):
+    """Main build pipeline."""
+    args = parse_args(argv)
+    
+    print("=" * 80)
+    print("BUILD PIPELINE: Investeringsuitgaven Gemeenten")
+    print("=" * 80)
+    print()
+    
+    pipeline = create_pipeline(BASE_DIR, fingerprint=args.fingerprint)
+    pipeline.run()
+    print_summary(BASE_DIR, args.fingerprint)
+    
+    if args.watch:
+        watch_and_rebuild(pipeline)
+    elif args.daemon:
+        daemon = create_daemon(pipeline, args.socket)
+        print(f"🔌 Build daemon luistert op {args.socket} (stop met build_client.py stop of Ctrl+C)")
+        print()
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
 if __name__ == '__main__':
     main()
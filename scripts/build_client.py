@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Client voor de build daemon (python scripts/build.py --daemon).
+
+Gebruik:
+    python build_client.py rebuild                      # alles wat gewijzigd is
+    python build_client.py rebuild averages rankings    # enkel deze outputs
+    python build_client.py rebuild averages --forceer   # ook zonder gewijzigde input
+    python build_client.py status
+    python build_client.py query gemeente naam=Gent
+    python build_client.py query detail naam=Gent jaar=2024
+    python build_client.py query provincie_totalen jaar=2024 bron=beleidsdomein
+    python build_client.py query kubus niveau=domein geo=provincie jaar=2024
+    python build_client.py query beleidsdomein_reeks naam=Gent
+    python build_client.py query provincie naam=Limburg meerjarenplan=2020-2025
+    python build_client.py stop
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add modules to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modules.daemon import send_request
+
+
+# Zelfde standaard als build.py (dat hier niet geïmporteerd wordt: te traag)
+DEFAULT_SOCKET = Path(__file__).parent.parent / '.build-daemon.sock'
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stuur een commando naar de build daemon")
+    parser.add_argument('--socket', type=Path, default=DEFAULT_SOCKET, help="Unix socket van de daemon")
+    commands = parser.add_subparsers(dest='opdracht', required=True)
+
+    rebuild = commands.add_parser('rebuild', help="Bouw opnieuw wat gewijzigd is")
+    rebuild.add_argument('stappen', nargs='*', help="Enkel deze stappen (standaard: alles)")
+    rebuild.add_argument('--forceer', action='store_true', help="Ook zonder gewijzigde input")
+
+    commands.add_parser('status', help="Toon de stappen en of ze in het geheugen zitten")
+
+    query = commands.add_parser('query', help="Vraag data op uit het geheugen van de daemon")
+    query.add_argument('naam', help="Naam van de query, bv. gemeente, detail, beleidsdomein, kubus, provincie")
+    query.add_argument('argumenten', nargs='*', metavar='sleutel=waarde')
+
+    commands.add_parser('stop', help="Stop de daemon")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    request = {'opdracht': args.opdracht}
+    if args.opdracht == 'rebuild':
+        request.update(stappen=args.stappen or None, forceer=args.forceer)
+    elif args.opdracht == 'query':
+        arguments = dict(argument.partition('=')[::2] for argument in args.argumenten)
+        request.update(naam=args.naam, argumenten=arguments)
+
+    try:
+        response = send_request(args.socket, request)
+    except ConnectionError as e:
+        print(f"❌ {e} (start met: python scripts/build.py --daemon)", file=sys.stderr)
+        return 1
+
+    if not response['ok']:
+        print(f"❌ {response['fout']}", file=sys.stderr)
+        return 1
+
+    if args.opdracht == 'rebuild':
+        if response['uitgevoerd']:
+            for name in response['uitgevoerd']:
+                print(f"   ✓ {name}: {response['duur'][name] * 1000:.1f} ms")
+        else:
+            print("   ✓ Niets te doen")
+        print(f"   ✓ Totaal: {response['totaal'] * 1000:.1f} ms")
+    elif args.opdracht == 'status':
+        print(f"Daemon (pid {response['pid']}), {response['sinds']:.0f}s actief")
+        for name, step in response['stappen'].items():
+            state = 'vuil' if step['vuil'] else ('geladen' if step['geladen'] else '-')
+            duration = f"{step['duur'] * 1000:.1f} ms" if step['duur'] is not None else ''
+            print(f"  • {name:<22} {state:<8} {duration}")
+        print(f"Queries: {', '.join(response['queries'])}")
+    elif args.opdracht == 'query':
+        print(json.dumps(response['resultaat'], indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Buurgemeenten op basis van gedeelde grenzen.
+
+Kandidaatparen komen uit een uniform grid over de bounding boxes, zodat
+niet alle paren gemeenten vergeleken worden. Een kandidaatpaar is buur als
+de gemeenten minstens één grenszijde delen ('rook') of, optioneel, minstens
+één grenspunt ('queen'). Het resultaat is een CSR adjacency lijst.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from .geometry import bounding_box, edge_keys, rings, vertex_keys
+from .year_matrix import YearMatrix, to_json_list
+
+
+class Adjacency(NamedTuple):
+    """
+    Buren in CSR formaat: de buren van gemeente i zijn
+    indices[indptr[i]:indptr[i + 1]] (gesorteerd, in feature volgorde).
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    def neighbours(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+
+class GridIndex:
+    """
+    Uniform grid over bounding boxes voor het zoeken van kandidaatparen.
+
+    Elke bounding box wordt geregistreerd in alle cellen die ze overlapt.
+    Enkel boxes die een cel delen én overlappen worden vergeleken.
+    """
+
+    def __init__(self, boxes: np.ndarray, cells_per_axis: int | None = None):
+        """
+        Args:
+            boxes: (n, 4) array met min_x, min_y, max_x, max_y (NaN = leeg)
+            cells_per_axis: Aantal cellen per as (standaard ~sqrt(n))
+        """
+        self.boxes = boxes
+        valid = ~np.isnan(boxes).any(axis=1)
+        n = int(valid.sum())
+        self.cells_per_axis = cells_per_axis or max(1, int(np.sqrt(n)))
+
+        self.origin = np.array([np.nanmin(boxes[:, 0]), np.nanmin(boxes[:, 1])])
+        extent = np.array([np.nanmax(boxes[:, 2]), np.nanmax(boxes[:, 3])]) - self.origin
+        self.cell_size = np.where(extent > 0, extent / self.cells_per_axis, 1.0)
+
+        self.cells = {}
+        for idx in np.flatnonzero(valid):
+            for cell in self._cells_for(boxes[idx]):
+                self.cells.setdefault(cell, []).append(int(idx))
+
+    def _cell_range(self, box: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        low = np.floor((box[:2] - self.origin) / self.cell_size).astype(int)
+        high = np.floor((box[2:] - self.origin) / self.cell_size).astype(int)
+        last = self.cells_per_axis - 1
+        return np.clip(low, 0, last), np.clip(high, 0, last)
+
+    def _cells_for(self, box: np.ndarray):
+        (x0, y0), (x1, y1) = self._cell_range(box)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def query(self, box: np.ndarray) -> set[int]:
+        """
+        Zoek de boxes die een gegeven box overlappen.
+
+        Args:
+            box: min_x, min_y, max_x, max_y
+
+        Returns:
+            Set met indices van overlappende boxes
+        """
+        found = set()
+        for cell in self._cells_for(box):
+            for idx in self.cells.get(cell, ()):
+                other = self.boxes[idx]
+                if (other[0] <= box[2] and box[0] <= other[2]
+                        and other[1] <= box[3] and box[1] <= other[3]):
+                    found.add(idx)
+        return found
+
+    def candidate_pairs(self) -> set[tuple[int, int]]:
+        """
+        Alle paren (i < j) waarvan de bounding boxes overlappen.
+        """
+        pairs = set()
+        for members in self.cells.values():
+            for a, i in enumerate(members):
+                box_i = self.boxes[i]
+                for j in members[a + 1:]:
+                    box_j = self.boxes[j]
+                    if (box_i[0] <= box_j[2] and box_j[0] <= box_i[2]
+                            and box_i[1] <= box_j[3] and box_j[1] <= box_i[3]):
+                        pairs.add((min(i, j), max(i, j)))
+        return pairs
+
+
+def feature_boxes(geojson: dict) -> np.ndarray:
+    """
+    Bounding box per feature als (n, 4) array (NaN zonder geometrie).
+    """
+    boxes = [bounding_box(feature.get('geometry')) for feature in geojson['features']]
+    return np.array([box if box else (np.nan,) * 4 for box in boxes], dtype=float)
+
+
+def build_adjacency(geojson: dict, rule: str = 'rook') -> Adjacency:
+    """
+    Bepaal de buren van elke gemeente.
+
+    Args:
+        geojson: GeoJSON met (Multi)Polygon geometrieën
+        rule: 'rook' (gedeelde grenszijde) of 'queen' (gedeeld grenspunt)
+
+    Returns:
+        Adjacency in CSR formaat
+    """
+    if rule not in ('rook', 'queen'):
+        raise ValueError(f"Onbekende regel: {rule}")
+
+    features = geojson['features']
+    n = len(features)
+
+    # Hash sets van grenszijden (of punten) per gemeente
+    shapes = []
+    for feature in features:
+        feature_rings = rings(feature.get('geometry'))
+        if rule == 'rook':
+            keys = (edge_keys(ring) for ring in feature_rings)
+            shapes.append({(int(a), int(b)) for part in keys for a, b in part})
+        else:
+            shapes.append({int(k) for ring in feature_rings for k in vertex_keys(ring)})
+
+    pairs = [
+        (i, j) for i, j in GridIndex(feature_boxes(geojson)).candidate_pairs()
+        if not shapes[i].isdisjoint(shapes[j])
+    ]
+
+    # Symmetrisch maken en naar CSR omzetten
+    edges = np.array(pairs, dtype=np.int32).reshape(-1, 2)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.lexsort((cols, rows))
+
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return Adjacency(indptr=indptr, indices=cols[order].astype(np.int32))
+
+
+def csr_matvec(adjacency: Adjacency, x: np.ndarray) -> np.ndarray:
+    """
+    Bereken A @ x voor de (ongewogen) adjacency matrix A.
+
+    Args:
+        adjacency: Buren in CSR formaat
+        x: Vector (n,) of matrix (n, m)
+
+    Returns:
+        Som van de waarden van de buren per gemeente
+    """
+    n = len(adjacency.indptr) - 1
+    rows = np.repeat(np.arange(n), np.diff(adjacency.indptr))
+    result = np.zeros((n,) + x.shape[1:], dtype=float)
+    np.add.at(result, rows, x[adjacency.indices])
+    return result
+
+
+def neighbour_averages(adjacency: Adjacency, values: np.ndarray) -> np.ndarray:
+    """
+    Gemiddelde van de buren per gemeente en per jaar.
+
+    Buren zonder waarde tellen niet mee. Alle jaren worden in één
+    sparse matrix-product berekend.
+
+    Args:
+        adjacency: Buren in CSR formaat
+        values: Gemeenten × jaren matrix (NaN = geen waarde)
+
+    Returns:
+        Matrix met dezelfde vorm (NaN als geen enkele buur een waarde heeft)
+    """
+    valid = ~np.isnan(values)
+    stacked = np.concatenate([np.where(valid, values, 0.0), valid.astype(float)], axis=1)
+    product = csr_matvec(adjacency, stacked)
+
+    sums, counts = np.split(product, 2, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def build_adjacency_output(matrix: YearMatrix, adjacency: Adjacency, rule: str = 'rook') -> dict:
+    """
+    Bouw de JSON output met de CSR lijst en de buurgemiddelden.
+
+    Args:
+        matrix: Gemeenten × jaren matrix (zelfde volgorde als de features)
+        adjacency: Buren in CSR formaat
+        rule: Gebruikte regel ('rook' of 'queen')
+
+    Returns:
+        Dict met gemeenten, indptr, indices en buurgemiddelden per jaar
+    """
+    return {
+        'regel': rule,
+        'gemeenten': matrix.names,
+        'indptr': adjacency.indptr.tolist(),
+        'indices': adjacency.indices.tolist(),
+        'jaren': matrix.years,
+        'buurgemiddelden': to_json_list(neighbour_averages(adjacency, matrix.values))
+    }
@@ -0,0 +1,81 @@
+"""
+Gemiddelden en verdelingsbanden per jaar voor Vlaanderen en de provincies.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .year_matrix import YearMatrix
+
+
+VLAANDEREN = 'Vlaanderen'
+
+# Percentielen voor de banden in de grafieken
+BAND_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _frame_to_dict(frame: pd.DataFrame) -> dict:
+    """
+    Zet een (regio × jaar) DataFrame om naar {regio: {jaar: waarde}}.
+    """
+    return {
+        region: {year: None if pd.isna(value) else float(value) for year, value in row.items()}
+        for region, row in frame.iterrows()
+    }
+
+
+def _split_regions(frame: pd.DataFrame) -> dict:
+    data = _frame_to_dict(frame)
+    return {VLAANDEREN: data.pop(VLAANDEREN), 'Provincies': data}
+
+
+def compute_averages(matrix: YearMatrix, population: dict | None = None) -> dict:
+    """
+    Bereken gemiddelden, medianen en percentielen per regio per jaar.
+
+    Alle statistieken komen uit één groupby over de gemeenten × jaren
+    matrix, waarin elke gemeente zowel bij haar provincie als bij
+    Vlaanderen hoort. Ontbrekende waarden tellen niet mee.
+
+    Args:
+        matrix: Gemeenten × jaren matrix
+        population: Optionele inwoners {gemeente: {jaar: aantal}} voor het
+            gewogen gemiddelde
+
+    Returns:
+        Dict met 'Vlaanderen' en 'Provincies' (ongewogen gemiddelde, zoals
+        voorheen), 'Mediaan', 'Percentielen' en optioneel 'Gewogen'
+    """
+    columns = [str(year) for year in matrix.years]
+    values = pd.DataFrame(matrix.values, columns=columns)
+
+    # Elke gemeente twee keer: één keer in haar provincie, één keer in Vlaanderen
+    regions = pd.Index(matrix.provinces + [VLAANDEREN] * len(matrix.names), name='regio')
+    stacked = pd.concat([values, values], ignore_index=True).set_index(regions)
+    grouped = stacked.groupby(level='regio', sort=True)
+
+    result = _split_regions(grouped.mean())
+    result['Mediaan'] = _split_regions(grouped.median())
+
+    quantiles = grouped.quantile([p / 100 for p in BAND_PERCENTILES])
+    result['Percentielen'] = {
+        f'p{p}': _split_regions(quantiles.xs(p / 100, level=1))
+        for p in BAND_PERCENTILES
+    }
+
+    if population:
+        weights = np.array(
+            [[population.get(name, {}).get(column, np.nan) for column in columns] for name in matrix.names],
+            dtype=float
+        )
+        weights[np.isnan(matrix.values)] = np.nan
+        weighted = pd.DataFrame(matrix.values * weights, columns=columns)
+        weights = pd.DataFrame(weights, columns=columns)
+
+        sums = pd.concat([weighted, weighted], ignore_index=True).set_index(regions)
+        totals = pd.concat([weights, weights], ignore_index=True).set_index(regions)
+        result['Gewogen'] = _split_regions(
+            sums.groupby(level='regio').sum(min_count=1) / totals.groupby(level='regio').sum(min_count=1)
+        )
+
+    return result
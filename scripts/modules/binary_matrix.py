@@ -0,0 +1,147 @@
+"""
+Binaire export van de gemeenten × jaren matrix voor de frontend.
+
+Eén .bin bestand met per blok (bv. nominaal, reëel) de waarden per jaar
+als aaneengesloten kolom, en een kleine JSON header met de volgorde van de
+gemeenten, de jaren en per blok de codering en offset. De browser leest
+het bestand met arrayBuffer() en maakt er typed arrays van, zonder JSON te
+parsen.
+
+Bedragen worden als gehele centen bewaard wanneer dat past: rechtstreeks
+of als verschil met het vorige jaar, in het kleinste integer type dat alle
+waarden bevat. Anders valt het blok terug op float32.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .year_matrix import YearMatrix
+
+
+# Integer types van klein naar groot; de kleinste waarde is de markering voor NaN
+INTEGER_TYPES = ('int8', 'int16', 'int32')
+
+# Offsets van blokken zijn veelvouden hiervan (vereist voor typed array views)
+ALIGNMENT = 8
+
+
+def _smallest_integer_type(values: np.ndarray) -> str | None:
+    """
+    Kleinste integer type dat alle waarden bevat, met ruimte voor de NaN markering.
+    """
+    if values.size == 0:
+        return INTEGER_TYPES[0]
+    low, high = values.min(), values.max()
+    for name in INTEGER_TYPES:
+        info = np.iinfo(name)
+        if low > info.min and high <= info.max:
+            return name
+    return None
+
+
+def encode_block(values: np.ndarray, decimals: int = 2) -> tuple[np.ndarray, dict]:
+    """
+    Codeer een gemeenten × jaren matrix als kolommen (één per jaar).
+
+    Args:
+        values: Float matrix (NaN = ontbrekend)
+        decimals: Precisie die behouden moet blijven (2 = centen)
+
+    Returns:
+        Tuple van (little-endian array in kolomvolgorde, metadata voor de header)
+    """
+    columns = np.ascontiguousarray(values.T)
+    missing = np.isnan(columns)
+    scale = 10 ** decimals
+
+    with np.errstate(invalid='ignore'):
+        scaled = np.round(columns * scale)
+    finite = scaled[~missing]
+
+    candidates = []
+    if not finite.size or np.abs(finite).max() < 2 ** 53:
+        integers = np.where(missing, 0, scaled).astype(np.int64)
+        dtype = _smallest_integer_type(integers[~missing])
+        if dtype:
+            candidates.append(('centen', dtype, integers))
+
+        # Verschillen tussen opeenvolgende jaren; enkel zonder ontbrekende waarden
+        if not missing.any() and len(integers):
+            deltas = np.diff(integers, axis=0, prepend=0)
+            dtype = _smallest_integer_type(deltas)
+            if dtype:
+                candidates.append(('delta', dtype, deltas))
+
+    if candidates:
+        encoding, dtype, data = min(candidates, key=lambda c: np.dtype(c[1]).itemsize)
+        info = np.iinfo(dtype)
+        if encoding == 'centen':
+            data = np.where(missing, info.min, data)
+        meta = {
+            'codering': encoding,
+            'type': dtype,
+            'schaal': 1 / scale,
+            'ontbrekend': int(info.min) if encoding == 'centen' else None
+        }
+        return data.astype(f'<{np.dtype(dtype).str[1:]}'), meta
+
+    return columns.astype('<f4'), {'codering': 'float32', 'type': 'float32', 'schaal': 1, 'ontbrekend': None}
+
+
+def write_binary_matrix(matrix: YearMatrix, blocks: dict[str, np.ndarray],
+                        bin_path: str | Path, header_path: str | Path) -> dict:
+    """
+    Schrijf de blokken naar één binair bestand met een JSON header.
+
+    Args:
+        matrix: YearMatrix (voor de volgorde van gemeenten en jaren)
+        blocks: Dict {naam: gemeenten × jaren matrix}, bv. {'nominaal': ..., 'reeel': ...}
+        bin_path: Pad voor het .bin bestand
+        header_path: Pad voor de JSON header
+
+    Returns:
+        De header
+    """
+    header = {
+        'bestand': Path(bin_path).name,
+        'gemeenten': matrix.names,
+        'provincies': matrix.provinces,
+        'jaren': matrix.years,
+        'blokken': {}
+    }
+
+    offset = 0
+    with open(bin_path, 'wb') as f:
+        for name, values in blocks.items():
+            data, meta = encode_block(values)
+            padding = -offset % ALIGNMENT
+            f.write(b'\0' * padding)
+            offset += padding
+
+            f.write(data.tobytes())
+            header['blokken'][name] = {**meta, 'offset': offset, 'lengte': int(data.size)}
+            offset += data.nbytes
+
+    with open(header_path, 'w', encoding='utf-8') as f:
+        json.dump(header, f, separators=(',', ':'), ensure_ascii=False)
+
+    return header
+
+
+def decode_block(buffer: bytes, meta: dict, rows: int) -> np.ndarray:
+    """
+    Inverse van encode_block (zelfde stappen als loadMatrix in utils.js).
+
+    Returns:
+        Gemeenten × jaren float64 matrix
+    """
+    data = np.frombuffer(buffer, dtype=f"<{np.dtype(meta['type']).str[1:]}",
+                         count=meta['lengte'], offset=meta['offset'])
+    columns = data.reshape(-1, rows).astype(np.float64)
+    if meta['codering'] == 'delta':
+        columns = np.cumsum(columns, axis=0)
+    if meta['ontbrekend'] is not None:
+        columns[data.reshape(-1, rows) == meta['ontbrekend']] = np.nan
+    return (columns * meta['schaal']).T
@@ -0,0 +1,210 @@
+"""
+Klassegrenzen en klasse-indices voor de choropleth kaart.
+
+Voor elk jaar, elke modus (nominaal/reëel), elke methode en elke schaal
+(Vlaanderen of per provincie) worden de grenzen en de klasse van elke
+gemeente vooraf berekend. De kaart moet bij het wisselen van jaar of
+modus enkel een klasse opzoeken in plaats van opnieuw te classificeren.
+"""
+
+import base64
+
+import numpy as np
+
+from .year_matrix import YearMatrix
+
+
+DEFAULT_CLASSES = 6
+
+# Klasse-index voor gemeenten zonder waarde of buiten de schaal
+NO_CLASS = 255
+
+METHODS = ('kwantiel', 'gelijk', 'jenks')
+
+
+def quantile_breaks(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Grenzen zodat elke klasse ongeveer evenveel gemeenten bevat.
+
+    Args:
+        values: Geldige (niet-NaN) waarden
+        k: Aantal klassen
+
+    Returns:
+        Array van k + 1 grenzen [minimum, bovengrens klasse 0, ..., maximum]
+    """
+    return np.quantile(values, np.linspace(0, 1, k + 1))
+
+
+def equal_interval_breaks(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Grenzen die het bereik in k even brede klassen verdelen.
+
+    Args:
+        values: Geldige (niet-NaN) waarden
+        k: Aantal klassen
+
+    Returns:
+        Array van k + 1 grenzen
+    """
+    return np.linspace(values.min(), values.max(), k + 1)
+
+
+def jenks_breaks(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Natuurlijke grenzen (Jenks) via dynamisch programmeren.
+
+    Minimaliseert de som van de kwadratische afwijkingen binnen de klassen
+    (zoals ckmeans). De optimale splitsing is monotoon in het eindpunt,
+    waardoor elke DP-rij met verdeel-en-heers in O(n log n) berekend
+    wordt: O(k·n log n) in totaal in plaats van O(k·n²).
+
+    Args:
+        values: Geldige (niet-NaN) waarden
+        k: Aantal klassen
+
+    Returns:
+        Array van k + 1 grenzen (minder als er minder unieke waarden zijn)
+    """
+    x = np.sort(values)
+    n = len(x)
+    k = min(k, len(np.unique(x)))
+    if k <= 1:
+        return np.array([x[0], x[-1]])
+
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+
+    def ssq(j, i):
+        # Kwadratische afwijking van x[j..i] (inclusief), j mag een array zijn
+        count = i - j + 1
+        total = s1[i + 1] - s1[j]
+        return s2[i + 1] - s2[j] - total * total / count
+
+    cost = np.full((k, n), np.inf)
+    split = np.zeros((k, n), dtype=np.int64)
+    cost[0] = ssq(np.zeros(n, dtype=np.int64), np.arange(n))
+
+    def fill(q, i_min, i_max, j_min, j_max):
+        if i_min > i_max:
+            return
+        i = (i_min + i_max) // 2
+        j = np.arange(max(q, j_min), min(i, j_max) + 1)
+        candidates = cost[q - 1, j - 1] + ssq(j, i)
+        best = int(np.argmin(candidates))
+        cost[q, i] = candidates[best]
+        split[q, i] = j[best]
+        fill(q, i_min, i - 1, j_min, j[best])
+        fill(q, i + 1, i_max, j[best], j_max)
+
+    for q in range(1, k):
+        fill(q, q, n - 1, q, n - 1)
+
+    # Terugzoeken van de bovengrens van elke klasse
+    uppers = []
+    right = n - 1
+    for q in range(k - 1, -1, -1):
+        uppers.append(x[right])
+        right = split[q, right] - 1
+
+    return np.array([x[0]] + uppers[::-1])
+
+
+BREAK_FUNCTIONS = {
+    'kwantiel': quantile_breaks,
+    'gelijk': equal_interval_breaks,
+    'jenks': jenks_breaks,
+}
+
+
+def classify(values: np.ndarray, breaks: np.ndarray) -> np.ndarray:
+    """
+    Bepaal de klasse van elke waarde (waarde <= bovengrens van de klasse).
+
+    Args:
+        values: Waarden (NaN = geen klasse)
+        breaks: Grenzen zoals teruggegeven door de *_breaks functies
+
+    Returns:
+        uint8 array met klasse-index, NO_CLASS voor ontbrekende waarden
+    """
+    classes = np.searchsorted(breaks[1:-1], values, side='left').astype(np.uint8)
+    classes[np.isnan(values)] = NO_CLASS
+    return classes
+
+
+def _encode(classes: np.ndarray) -> str:
+    return base64.b64encode(classes.astype(np.uint8).tobytes()).decode('ascii')
+
+
+def _classify_scope(values: np.ndarray, mask: np.ndarray, method: str, k: int):
+    """
+    Grenzen en klassen voor de gemeenten in mask (de rest krijgt NO_CLASS).
+    """
+    classes = np.full(len(values), NO_CLASS, dtype=np.uint8)
+    valid = mask & ~np.isnan(values)
+    if not valid.any():
+        return None, classes
+
+    breaks = BREAK_FUNCTIONS[method](values[valid], k)
+    classes[valid] = classify(values[valid], breaks)
+    return [round(float(b), 2) for b in breaks], classes
+
+
+def build_classifications(matrix: YearMatrix, factors: np.ndarray,
+                          k: int = DEFAULT_CLASSES) -> dict:
+    """
+    Bereken klassegrenzen en klasse-indices voor alle kaartconfiguraties.
+
+    Configuraties: jaar × modus × methode × schaal. Bij schaal 'provincie'
+    wordt elke gemeente geclassificeerd tegenover de grenzen van haar
+    eigen provincie, zodat één array per configuratie volstaat.
+
+    Args:
+        matrix: Gemeenten × jaren matrix (nominaal)
+        factors: Inflatiefactor per jaar (zie inflation.cpi_factors)
+        k: Aantal klassen
+
+    Returns:
+        Dict met de assen en configuraties[jaar][modus][methode][schaal]
+        = {'grenzen': ..., 'klassen': base64 uint8 array in feature volgorde}
+    """
+    provinces = np.array(matrix.provinces, dtype=object)
+    province_names = sorted(set(matrix.provinces))
+    everywhere = np.ones(len(matrix.names), dtype=bool)
+    modes = {'nominaal': matrix.values, 'reeel': matrix.values * factors}
+
+    configurations = {}
+    for col, year in enumerate(matrix.years):
+        per_year = configurations[str(year)] = {}
+        for mode, values in modes.items():
+            per_mode = per_year[mode] = {}
+            column = values[:, col]
+
+            for method in METHODS:
+                breaks, classes = _classify_scope(column, everywhere, method, k)
+                vlaanderen = {'grenzen': breaks, 'klassen': _encode(classes)}
+
+                province_breaks = {}
+                province_classes = np.full(len(column), NO_CLASS, dtype=np.uint8)
+                for province in province_names:
+                    mask = provinces == province
+                    breaks, classes = _classify_scope(column, mask, method, k)
+                    province_breaks[province] = breaks
+                    province_classes[mask] = classes[mask]
+
+                per_mode[method] = {
+                    'vlaanderen': vlaanderen,
+                    'provincie': {'grenzen': province_breaks, 'klassen': _encode(province_classes)}
+                }
+
+    return {
+        'aantal_klassen': k,
+        'geen_klasse': NO_CLASS,
+        'gemeenten': matrix.names,
+        'jaren': matrix.years,
+        'modi': list(modes),
+        'methodes': list(METHODS),
+        'schalen': ['vlaanderen', 'provincie'],
+        'configuraties': configurations
+    }
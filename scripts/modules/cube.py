@@ -0,0 +1,393 @@
+"""
+Beleidsdomein kubus: sommen op elk niveau × jaar × gemeente/provincie/Vlaanderen.
+
+De CSV 'investeringsuitgave per beleidsdomein.csv' heeft per gemeente een
+kolom voor elke (boekjaar, BV_domein, BV_subdomein[, beleidsveld])
+combinatie. De niveaus komen uit de header rijen tussen 'Boekjaar' en
+'Grondgebied', dus een export met een beleidsveld rij krijgt vanzelf een
+extra niveau.
+
+De CSV wordt één keer gelezen naar een feitentabel (gemeente, kolom,
+bedrag). Daaruit worden in één doorgang alle grouping sets berekend:
+eerst de bladeren per gemeente, dan per niveau (totaal, domein,
+subdomein, ...) en per geografie (gemeente, provincie, Vlaanderen). Elke
+vraag daarna is een slice van een van die arrays. Bedragen zijn int64
+centen, dus elke som is exact; euro's pas in to_dict(), tensor() en value().
+"""
+
+import csv
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+import numpy as np
+
+from .utils import normalize_municipality_name, parse_cents, parse_value, cents_to_euro
+
+
+TOTAL_LEVEL = 'totaal'
+TOTAL_LABEL = 'Totaal'
+
+GEOGRAPHIES = ('gemeente', 'provincie', 'vlaanderen')
+FLANDERS_LABEL = 'Vlaanderen'
+
+# Aantal header rijen dat maximaal gelezen wordt om de 'Grondgebied' rij te vinden
+MAX_HEADER_ROWS = 10
+
+SKIP_ROWS = ('Total', 'Totaal')
+
+# Scheiding tussen de niveaus in de naam van een lid waarvan het label niet uniek is
+PATH_SEPARATOR = ' > '
+
+
+def _region_key(label: str) -> str:
+    # 'Provincie Limburg' en 'Limburg' zijn dezelfde regio
+    return normalize_municipality_name(label.removeprefix('Provincie '))
+
+
+class CubeSlice(NamedTuple):
+    """
+    Deel van de kubus: leden × jaren × regio's (sums in centen).
+    """
+    level: str
+    geo: str
+    members: list[str]
+    years: list[int]
+    regions: list[str]
+    sums: np.ndarray
+    counts: np.ndarray
+
+    def to_dict(self) -> dict:
+        """
+        {lid: {jaar: {regio: som in euro}}}, enkel cellen met minstens één bedrag.
+
+        De leden zijn unieke namen (zie BeleidsdomeinCube.names), dus geen
+        twee leden komen op dezelfde sleutel terecht.
+        """
+        result = {}
+        for i, member in enumerate(self.members):
+            by_year = {}
+            for j, year in enumerate(self.years):
+                cells = {
+                    region: cents_to_euro(self.sums[i, j, k])
+                    for k, region in enumerate(self.regions) if self.counts[i, j, k]
+                }
+                if cells:
+                    by_year[year] = cells
+            if by_year:
+                result[member] = by_year
+        return result
+
+
+class BeleidsdomeinCube:
+    """
+    Gematerialiseerde sommen en aantallen per (niveau, geografie).
+
+    sums[(niveau, geo)] en counts[(niveau, geo)] zijn arrays
+    leden × jaren × regio's; sums in int64 centen, counts telt het aantal
+    niet-lege cellen.
+
+    Een lid is een pad (bv. domein, subdomein): hetzelfde subdomein label
+    kan onder twee domeinen voorkomen. Zo'n lid heet dan voluit
+    'Cultuur > Overige'; het label alleen is dubbelzinnig.
+    """
+
+    def __init__(self, levels: list[str], members: dict[str, list[str]], parents: dict[str, list[int]],
+                 years: list[int], regions: dict[str, list[str]],
+                 sums: dict[tuple[str, str], np.ndarray], counts: dict[tuple[str, str], np.ndarray]):
+        """
+        Args:
+            levels: Niveaus van boven naar onder, te beginnen met 'totaal'
+            members: Labels per niveau
+            parents: Per niveau het lid van het niveau erboven (-1 voor 'totaal')
+            years: Boekjaren (oplopend)
+            regions: Regio's per geografie ('gemeente', 'provincie', 'vlaanderen')
+            sums: Sommen in centen per (niveau, geografie)
+            counts: Aantal niet-lege cellen per (niveau, geografie)
+        """
+        self.levels = levels
+        self.members = members
+        self.parents = parents
+        self.years = years
+        self.regions = regions
+        self.sums = sums
+        self.counts = counts
+        self.paths = {TOTAL_LEVEL: [()]}
+        for above, level in zip(levels, levels[1:]):
+            self.paths[level] = [
+                self.paths[above][parent] + (label,) for label, parent in zip(members[level], parents[level])
+            ]
+
+        # Unieke naam per lid: het label, of het volledige pad als het label meer dan eens voorkomt
+        self.names = {}
+        self.member_index = {}
+        for level, labels in members.items():
+            ambiguous = {label for label, n in Counter(labels).items() if n > 1}
+            names = [
+                PATH_SEPARATOR.join(path) if label in ambiguous else label
+                for label, path in zip(labels, self.paths[level])
+            ]
+            index = {PATH_SEPARATOR.join(path): i for i, path in enumerate(self.paths[level]) if path}
+            index.update((name, i) for i, name in enumerate(names))
+            # None: het label alleen volstaat niet, _positions meldt een KeyError
+            index.update((label, None) for label in ambiguous)
+            self.names[level] = names
+            self.member_index[level] = index
+        self.year_index = {year: i for i, year in enumerate(years)}
+        self.region_index = {
+            geo: {_region_key(label): i for i, label in enumerate(labels)}
+            for geo, labels in regions.items()
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.sums.values()) + sum(array.nbytes for array in self.counts.values())
+
+    def _level(self, level: str) -> str:
+        if level not in self.members:
+            raise KeyError(f"Onbekend niveau: {level} (kies uit {', '.join(self.levels)})")
+        return level
+
+    def _geo(self, geo: str) -> str:
+        if geo not in self.regions:
+            raise KeyError(f"Onbekende geografie: {geo} (kies uit {', '.join(GEOGRAPHIES)})")
+        return geo
+
+    @staticmethod
+    def _positions(wanted, index: dict, size: int, kind: str, key: Callable = lambda value: value) -> list[int]:
+        if wanted is None:
+            return list(range(size))
+        if isinstance(wanted, (str, int)):
+            wanted = [wanted]
+        positions = []
+        for value in wanted:
+            if key(value) not in index:
+                raise KeyError(f"Onbekend {kind}: {value}")
+            position = index[key(value)]
+            if position is None:
+                raise KeyError(f"Dubbelzinnig {kind}: {value} (gebruik het volledige pad, bv. 'domein{PATH_SEPARATOR}{value}')")
+            positions.append(position)
+        return positions
+
+    def slice(self, level: str = TOTAL_LEVEL, geo: str = 'vlaanderen',
+              members: str | Iterable[str] | None = None,
+              years: int | Iterable[int] | None = None,
+              regions: str | Iterable[str] | None = None) -> CubeSlice:
+        """
+        Selecteer een deel van een gematerialiseerde aggregatie.
+
+        Args:
+            level: Niveau ('totaal', 'domein', 'subdomein', ...)
+            geo: 'gemeente', 'provincie' of 'vlaanderen'
+            members: Leden van het niveau, op naam of volledig pad (None = alle)
+            years: Boekjaren (None = alle)
+            regions: Gemeenten of provincies (None = alle)
+
+        Returns:
+            CubeSlice met de gevraagde leden, jaren en regio's
+
+        Raises:
+            KeyError: Bij een onbekend niveau, geografie, lid, jaar of regio
+        """
+        level, geo = self._level(level), self._geo(geo)
+        member_pos = self._positions(members, self.member_index[level], len(self.members[level]), 'lid')
+        year_pos = self._positions(years, self.year_index, len(self.years), 'jaar', int)
+        region_pos = self._positions(regions, self.region_index[geo], len(self.regions[geo]), 'regio', _region_key)
+
+        index = np.ix_(member_pos, year_pos, region_pos)
+        return CubeSlice(
+            level,
+            geo,
+            [self.names[level][i] for i in member_pos],
+            [self.years[i] for i in year_pos],
+            [self.regions[geo][i] for i in region_pos],
+            self.sums[level, geo][index],
+            self.counts[level, geo][index]
+        )
+
+    def children(self, level: str, member: str) -> tuple[str, list[str]]:
+        """
+        Niveau en namen van de kinderen van een lid (voor drill-down).
+
+        Returns:
+            (niveau eronder, namen); (None, []) op het onderste niveau
+        """
+        depth = self.levels.index(self._level(level))
+        if depth + 1 == len(self.levels):
+            return None, []
+        parent = self._positions(member, self.member_index[level], len(self.members[level]), 'lid')[0]
+        below = self.levels[depth + 1]
+        return below, [name for name, p in zip(self.names[below], self.parents[below]) if p == parent]
+
+    def tensor(self, level: str | None = None) -> np.ndarray:
+        """
+        Gemeenten × jaren × leden als float32 (NaN = geen bedrag), standaard
+        op het onderste niveau. Dit zijn de volledige gegevens van de CSV.
+        """
+        level = self._level(level or self.levels[-1])
+        values = np.where(self.counts[level, 'gemeente'] > 0, cents_to_euro(self.sums[level, 'gemeente']), np.nan)
+        return np.ascontiguousarray(values.transpose(2, 1, 0), dtype=np.float32)
+
+    def value(self, level: str, member: str, year: int,
+              geo: str = 'vlaanderen', region: str = FLANDERS_LABEL) -> float:
+        """
+        Eén som in euro, bv. cube.value('domein', 'Wonen', 2024, 'provincie', 'Limburg').
+        """
+        return cents_to_euro(self.slice(level, geo, member, year, region).sums[0, 0, 0])
+
+
+def _prefixes(paths: dict[tuple[str, ...], int], depth: int) -> dict[tuple[str, ...], int]:
+    """
+    Nummer van elk pad prefix van lengte depth, in volgorde van eerste voorkomen.
+    """
+    prefixes: dict[tuple[str, ...], int] = {}
+    for path in paths:
+        prefixes.setdefault(path[:depth], len(prefixes))
+    return prefixes
+
+
+def _read_header(f) -> tuple[list[str], list[list[str]], list[list[str]]]:
+    """
+    Lees de header rijen tot en met 'Grondgebied;Bestuur;...'.
+
+    Returns:
+        (niveaunamen, cellen per niveau, jaren rij) zonder de eerste twee kolommen
+    """
+    rows = []
+    while len(rows) < MAX_HEADER_ROWS:
+        rows.append(f.readline().rstrip('\r\n').split(';'))
+        if rows[-1][0].strip() == 'Grondgebied':
+            break
+    else:
+        raise ValueError(f"Geen 'Grondgebied' rij in de eerste {MAX_HEADER_ROWS} rijen")
+
+    # Zonder labels: rij 1 = jaren, rij 2 en 3 = domein en subdomein (zoals de PowerBI export)
+    labels = [row[0].strip() for row in rows]
+    year_row = labels.index('Boekjaar') if 'Boekjaar' in labels else 1
+    level_rows = rows[year_row + 1:-1]
+
+    names = []
+    for depth, row in enumerate(level_rows, start=1):
+        name = row[0].strip().lower().removeprefix('bv_')
+        names.append(name or f'niveau_{depth}')
+    return names, [row[2:] for row in level_rows], rows[year_row][2:]
+
+
+def build_beleidsdomein_cube(csv_path: str | Path,
+                             province_of: Callable[[str], str | None] | None = None) -> BeleidsdomeinCube:
+    """
+    Lees de beleidsdomein CSV (alle jaren) en materialiseer alle grouping sets.
+
+    Rijen met 'Total'/'Totaal' en dubbele gemeenten worden overgeslagen.
+    Gemeenten zonder provincie tellen enkel mee voor Vlaanderen.
+
+    Args:
+        csv_path: Pad naar 'investeringsuitgave per beleidsdomein.csv'
+        province_of: Provincie voor een gemeentenaam uit de CSV (None = onbekend)
+
+    Returns:
+        BeleidsdomeinCube
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        level_names, level_cells, year_cells = _read_header(f)
+
+        # Kolom -> (jaar, pad); kolommen zonder jaar of zonder label op het onderste niveau vallen weg
+        years = sorted({int(value) for value in map(parse_value, year_cells) if value is not None})
+        year_index = {year: i for i, year in enumerate(years)}
+        paths: dict[tuple[str, ...], int] = {}
+        column_year, column_leaf = [], []
+        for column, year_cell in enumerate(year_cells):
+            year = parse_value(year_cell)
+            path = tuple(cells[column].strip() if column < len(cells) else '' for cells in level_cells)
+            if year is None or not path or not path[-1]:
+                column_year.append(-1)
+                column_leaf.append(-1)
+                continue
+            column_year.append(year_index[int(year)])
+            column_leaf.append(paths.setdefault(path, len(paths)))
+
+        # Eén doorgang over de data: feitentabel (gemeente, kolom, bedrag)
+        municipalities = []
+        seen = set()
+        fact_rows, fact_columns, fact_values = [], [], []
+        for row in csv.reader(f, delimiter=';'):
+            name = row[0].strip() if row else ''
+            if not name or name in SKIP_ROWS:
+                continue
+            normalized = name.lower()
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+
+            for column, cell in enumerate(row[2:2 + len(year_cells)]):
+                if column_leaf[column] < 0:
+                    continue
+                value = parse_cents(cell)
+                if not value:
+                    continue
+                fact_rows.append(len(municipalities))
+                fact_columns.append(column)
+                fact_values.append(value)
+            municipalities.append(name)
+
+    fact_rows = np.array(fact_rows, dtype=np.int64)
+    fact_columns = np.array(fact_columns, dtype=np.int64)
+    fact_values = np.array(fact_values, dtype=np.int64)
+
+    # Bladeren × jaren × gemeenten
+    shape = (len(paths), len(years), len(municipalities))
+    base_sums = np.zeros(shape, dtype=np.int64)
+    base_counts = np.zeros(shape, dtype=np.int32)
+    cells = (np.array(column_leaf)[fact_columns], np.array(column_year)[fact_columns], fact_rows)
+    np.add.at(base_sums, cells, fact_values)
+    np.add.at(base_counts, cells, 1)
+
+    # Leden per niveau, elk met zijn ouder op het niveau erboven
+    levels = [TOTAL_LEVEL] + level_names
+    members = {TOTAL_LEVEL: [TOTAL_LABEL]}
+    parents = {TOTAL_LEVEL: [-1]}
+    leaf_member = {TOTAL_LEVEL: np.zeros(len(paths), dtype=np.int64)}
+    for depth, level in enumerate(level_names, start=1):
+        keys = _prefixes(paths, depth)
+        parent_keys = _prefixes(paths, depth - 1)
+        members[level] = [key[-1] for key in keys]
+        parents[level] = [parent_keys.get(key[:-1], 0) for key in keys]
+        leaf_member[level] = np.array([keys[path[:depth]] for path in paths], dtype=np.int64)
+
+    # Geografie per gemeente
+    provinces = [province_of(name) if province_of else None for name in municipalities]
+    province_labels = sorted({province for province in provinces if province})
+    province_ids = {province: i for i, province in enumerate(province_labels)}
+    regions = {
+        'gemeente': municipalities,
+        'provincie': province_labels,
+        'vlaanderen': [FLANDERS_LABEL]
+    }
+    in_province = np.array([province in province_ids for province in provinces], dtype=bool)
+    region_of = {
+        'provincie': np.array([province_ids[p] for p in provinces if p in province_ids], dtype=np.int64),
+        'vlaanderen': np.zeros(len(municipalities), dtype=np.int64)
+    }
+
+    # Grouping sets: (niveau) × (gemeente, provincie, Vlaanderen)
+    sums, counts = {}, {}
+    for level in levels:
+        level_shape = (len(members[level]), len(years), len(municipalities))
+        level_sums = np.zeros(level_shape, dtype=np.int64)
+        level_counts = np.zeros(level_shape, dtype=np.int32)
+        np.add.at(level_sums, leaf_member[level], base_sums)
+        np.add.at(level_counts, leaf_member[level], base_counts)
+        sums[level, 'gemeente'] = level_sums
+        counts[level, 'gemeente'] = level_counts
+
+        for geo, region_ids in region_of.items():
+            keep = in_province if geo == 'provincie' else slice(None)
+            geo_shape = level_shape[:2] + (len(regions[geo]),)
+            geo_sums = np.zeros(geo_shape, dtype=np.int64)
+            geo_counts = np.zeros(geo_shape, dtype=np.int32)
+            np.add.at(geo_sums, (slice(None), slice(None), region_ids), level_sums[:, :, keep])
+            np.add.at(geo_counts, (slice(None), slice(None), region_ids), level_counts[:, :, keep])
+            sums[level, geo] = geo_sums
+            counts[level, geo] = geo_counts
+
+    return BeleidsdomeinCube(levels, members, parents, years, regions, sums, counts)
@@ -0,0 +1,274 @@
+"""
+Build daemon: een warme pipeline die commando's ontvangt over een Unix socket.
+
+Het proces blijft draaien na de eerste build. De geparste datasets (detail,
+beleidsdomein, provinciale data) en de base geometrie blijven als
+resultaten van de pipeline in het geheugen, zodat een rebuild na een
+kleine wijziging enkel de getroffen stappen uitvoert, zonder opstart van
+Python en pandas en zonder de ongewijzigde input opnieuw te parsen.
+
+Protocol: per regel één JSON object, per regel één JSON antwoord.
+
+    {"opdracht": "rebuild", "stappen": ["averages"], "forceer": false}
+    {"opdracht": "status"}
+    {"opdracht": "query", "naam": "gemeente", "argumenten": {"naam": "Gent"}}
+    {"opdracht": "stop"}
+
+Een antwoord heeft altijd "ok"; bij een fout ook "fout".
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Callable
+
+from .pipeline import Pipeline
+
+
+class DaemonError(Exception):
+    """Fout die als {"ok": false, "fout": ...} naar de client gaat."""
+
+
+def _json_default(obj):
+    # NumPy scalars en arrays (zonder numpy te importeren: de client blijft licht)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if isinstance(obj, (set, tuple)):
+        return list(obj)
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return str(obj)
+
+
+class _Tee(io.TextIOBase):
+    """
+    Schrijft naar de console van de daemon en bewaart een kopie voor de client.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+
+    def write(self, text: str) -> int:
+        self.stream.write(text)
+        return self.buffer.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            command = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise DaemonError("Verwacht een JSON object")
+                command = request.get('opdracht')
+                response = {'ok': True, **self.server.daemon.handle(request)}
+            except (DaemonError, json.JSONDecodeError) as e:
+                response = {'ok': False, 'fout': str(e)}
+            except Exception as e:
+                traceback.print_exc()
+                response = {'ok': False, 'fout': f"{type(e).__name__}: {e}"}
+
+            self.wfile.write(json.dumps(response, ensure_ascii=False, default=_json_default).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            if command == 'stop':
+                break
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class BuildDaemon:
+    """
+    Houdt een Pipeline warm en voert commando's van clients uit.
+
+    Commando's worden één voor één uitgevoerd (een rebuild en een query
+    zien nooit een half bijgewerkte pipeline), maar meerdere clients
+    kunnen tegelijk verbonden zijn.
+
+    Gebruik:
+        daemon = BuildDaemon(pipeline, socket_path)
+
+        @daemon.query
+        def gemeente(results, naam):
+            ...
+
+        daemon.serve_forever()
+    """
+
+    def __init__(self, pipeline: Pipeline, socket_path: str | Path):
+        self.pipeline = pipeline
+        self.socket_path = Path(socket_path)
+        self.queries: dict[str, Callable[..., Any]] = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.server = None
+
+    def query(self, function: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Decorator die een query toevoegt (naam = functienaam).
+
+        De functie krijgt pipeline.results en de argumenten van de client
+        als keyword argumenten.
+        """
+        self.queries[function.__name__] = function
+        return function
+
+    def handle(self, request: dict) -> dict:
+        """
+        Voer één commando uit.
+
+        Returns:
+            Antwoord (zonder "ok")
+
+        Raises:
+            DaemonError: Bij een onbekend commando, een onbekende stap of query
+        """
+        command = request.get('opdracht')
+        with self.lock:
+            if command == 'rebuild':
+                return self.rebuild(request.get('stappen'), request.get('forceer', False))
+            if command == 'status':
+                return self.status()
+            if command == 'query':
+                return self.run_query(request.get('naam'), request.get('argumenten') or {})
+            if command == 'stop':
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return {}
+        raise DaemonError(f"Onbekende opdracht: {command!r}")
+
+    def _check_steps(self, names: list[str]) -> set[str]:
+        unknown = [name for name in names if name not in self.pipeline.steps]
+        if unknown:
+            raise DaemonError(f"Onbekende stappen: {', '.join(unknown)}")
+        return set(names)
+
+    def rebuild(self, steps: list[str] | None = None, force: bool = False) -> dict:
+        """
+        Werk de pipeline bij; enkel vuile stappen worden uitgevoerd.
+
+        Args:
+            steps: Enkel deze stappen (en wat ze nodig hebben); None = alles
+            force: De gegeven stappen (of alles) ook zonder gewijzigde input
+                opnieuw uitvoeren; wat ervan afhangt volgt vanzelf
+        """
+        targets = self._check_steps(steps) if steps else None
+        if force:
+            self.pipeline.invalidate(targets)
+
+        start = time.perf_counter()
+        output = _Tee(sys.stdout)
+        try:
+            with contextlib.redirect_stdout(output):
+                executed = self.pipeline.run(targets)
+        except Exception as e:
+            traceback.print_exc()
+            raise DaemonError(f"Build mislukt: {type(e).__name__}: {e}\n{output.buffer.getvalue()}") from e
+
+        return {
+            'uitgevoerd': executed,
+            'duur': {name: round(self.pipeline.durations[name], 4) for name in executed},
+            'totaal': round(time.perf_counter() - start, 4),
+            'log': output.buffer.getvalue()
+        }
+
+    def status(self) -> dict:
+        dirty = self.pipeline.dirty()
+        return {
+            'pid': os.getpid(),
+            'sinds': round(time.time() - self.started, 1),
+            'stappen': {
+                name: {
+                    'geladen': name in self.pipeline.results,
+                    'vuil': name in dirty,
+                    'duur': round(self.pipeline.durations[name], 4) if name in self.pipeline.durations else None,
+                    'afhankelijk_van': list(step.deps)
+                }
+                for name, step in self.pipeline.steps.items()
+            },
+            'queries': sorted(self.queries)
+        }
+
+    def run_query(self, name: str, arguments: dict) -> dict:
+        if name not in self.queries:
+            raise DaemonError(f"Onbekende query: {name!r} (beschikbaar: {', '.join(sorted(self.queries))})")
+        try:
+            result = self.queries[name](self.pipeline.results, **arguments)
+        except (KeyError, TypeError, ValueError) as e:
+            raise DaemonError(f"Query {name} mislukt: {e}") from e
+        return {'resultaat': result}
+
+    def _claim_socket(self) -> None:
+        """
+        Verwijder een achtergebleven socket bestand, maar niet dat van een
+        daemon die nog draait.
+
+        Raises:
+            DaemonError: Als er al een daemon luistert
+        """
+        if not self.socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            self.socket_path.unlink(missing_ok=True)
+        else:
+            raise DaemonError(f"Er draait al een daemon op {self.socket_path}")
+        finally:
+            probe.close()
+
+    def serve_forever(self) -> None:
+        """
+        Luister tot een client "stop" stuurt (of tot Ctrl+C).
+        """
+        self._claim_socket()
+        self.server = _Server(str(self.socket_path), _Handler)
+        self.server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+
+def send_request(socket_path: str | Path, request: dict, timeout: float | None = None) -> dict:
+    """
+    Stuur één commando naar een draaiende daemon.
+
+    Args:
+        socket_path: Pad van de Unix socket
+        request: Commando, bv. {"opdracht": "rebuild", "stappen": ["averages"]}
+        timeout: Maximale wachttijd in seconden (None = tot de build klaar is)
+
+    Returns:
+        Antwoord van de daemon
+
+    Raises:
+        ConnectionError: Als er geen daemon luistert
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"Geen build daemon op {socket_path}") from e
+        client.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        with client.makefile('rb') as response:
+            return json.loads(response.readline())
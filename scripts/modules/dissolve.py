@@ -0,0 +1,169 @@
+"""
+Samenvoegen (dissolve) van gemeenten tot grotere gebieden.
+
+Gemeenten die naast elkaar liggen delen exact dezelfde grenszijden. Bij
+het samenvoegen van een groep vallen de zijden die twee keer voorkomen weg
+(interne grenzen); de overblijvende zijden worden terug aan elkaar gezet
+tot ringen. Dat is lineair in het aantal punten, zonder algemene
+polygon-unie.
+"""
+
+from collections import Counter, defaultdict
+from typing import Callable, Hashable
+
+import numpy as np
+
+from .geometry import polygons, polylabel, signed_area, simplify, vertex_keys
+from .locator import contains
+
+
+# Standaard tolerantie voor de vereenvoudiging in graden (~100 m)
+DEFAULT_TOLERANCE = 0.001
+
+
+def _oriented_edges(geometry: dict, coords_by_key: dict) -> list[tuple[int, int]]:
+    """
+    Gerichte zijden van een geometrie: buitenringen tegenwijzerzin, gaten wijzerzin.
+
+    Zo lopen gedeelde zijden van twee buren altijd in tegengestelde richting.
+    """
+    edges = []
+    for polygon in polygons(geometry):
+        for ring_idx, ring in enumerate(polygon):
+            counter_clockwise = signed_area(ring) > 0
+            if counter_clockwise == (ring_idx > 0):
+                ring = ring[::-1]
+
+            keys = vertex_keys(ring)
+            for key, point in zip(keys.tolist(), ring):
+                coords_by_key.setdefault(key, point)
+            edges.extend((a, b) for a, b in zip(keys[:-1].tolist(), keys[1:].tolist()) if a != b)
+    return edges
+
+
+def _assemble_rings(edges: list[tuple[int, int]], coords_by_key: dict) -> list[np.ndarray]:
+    """
+    Zet losse gerichte zijden aan elkaar tot gesloten ringen.
+    """
+    outgoing = defaultdict(list)
+    for a, b in edges:
+        outgoing[a].append(b)
+
+    rings = []
+    for start in list(outgoing):
+        while outgoing[start]:
+            ring = [start]
+            current = outgoing[start].pop()
+            while current != start:
+                ring.append(current)
+                if not outgoing[current]:
+                    # Open keten (ongeldige topologie in de bron): overslaan
+                    ring = None
+                    break
+                current = outgoing[current].pop()
+
+            if ring and len(ring) >= 3:
+                ring.append(start)
+                rings.append(np.array([coords_by_key[key] for key in ring]))
+    return rings
+
+
+def dissolve_geometries(geometries: list[dict], tolerance: float = 0.0) -> list[list[np.ndarray]]:
+    """
+    Voeg geometrieën samen door gedeelde zijden te laten wegvallen.
+
+    Args:
+        geometries: GeoJSON (Multi)Polygon geometrieën die exact gedeelde grenzen hebben
+        tolerance: Douglas-Peucker tolerantie (0 = niet vereenvoudigen)
+
+    Returns:
+        Lijst van polygonen (buitenring gevolgd door de gaten)
+    """
+    coords_by_key = {}
+    edges = [edge for geometry in geometries for edge in _oriented_edges(geometry, coords_by_key)]
+
+    # Interne grenzen komen twee keer voor (in beide richtingen)
+    counts = Counter((min(a, b), max(a, b)) for a, b in edges)
+    boundary = [(a, b) for a, b in edges if counts[(min(a, b), max(a, b))] == 1]
+
+    outers, holes = [], []
+    for ring in _assemble_rings(boundary, coords_by_key):
+        (outers if signed_area(ring) > 0 else holes).append(ring)
+
+    # Elk gat hoort bij de kleinste buitenring die het bevat
+    outer_segments = [np.hstack([ring[:-1], ring[1:]]) for ring in outers]
+    outer_areas = [signed_area(ring) for ring in outers]
+    result = [[ring] for ring in outers]
+    for hole in holes:
+        containing = [i for i, segments in enumerate(outer_segments) if contains(segments, *hole[0])]
+        if containing:
+            result[min(containing, key=lambda i: outer_areas[i])].append(hole)
+
+    if tolerance > 0:
+        simplified = []
+        for polygon in result:
+            rings = [simplify(ring, tolerance) for ring in polygon]
+            if len(rings[0]) >= 4:
+                simplified.append([ring for ring in rings if len(ring) >= 4])
+        result = simplified
+
+    return result
+
+
+def _to_geometry(parts: list[list[np.ndarray]], decimals: int = 6) -> dict:
+    coordinates = [[np.round(ring, decimals).tolist() for ring in polygon] for polygon in parts]
+    if len(coordinates) == 1:
+        return {'type': 'Polygon', 'coordinates': coordinates[0]}
+    return {'type': 'MultiPolygon', 'coordinates': coordinates}
+
+
+def dissolve(geojson: dict, key: str | Callable[[dict], Hashable] = 'province',
+             tolerance: float = DEFAULT_TOLERANCE, name_property: str = 'naam') -> dict:
+    """
+    Voeg features samen per groep.
+
+    Werkt voor elke indeling: een property naam (bv. 'province') of een
+    functie op de properties, bv. voor politiezones of eigen regio's:
+    dissolve(geojson, lambda p: zones.get(p['municipality'])).
+
+    Args:
+        geojson: GeoJSON met aangrenzende (Multi)Polygon features
+        key: Property naam of functie properties -> groep (None = overslaan)
+        tolerance: Douglas-Peucker tolerantie in graden
+        name_property: Property waarin de groepsnaam bewaard wordt
+
+    Returns:
+        FeatureCollection met één feature per groep, met het aantal
+        gemeenten, de bbox en een labelpunt in de properties
+    """
+    get_group = key if callable(key) else (lambda properties: properties.get(key))
+
+    groups = defaultdict(list)
+    for feature in geojson['features']:
+        group = get_group(feature['properties'])
+        if group is not None and feature.get('geometry'):
+            groups[group].append(feature['geometry'])
+
+    features = []
+    for group in sorted(groups, key=str):
+        parts = dissolve_geometries(groups[group], tolerance)
+        if not parts:
+            continue
+
+        coords = np.concatenate([polygon[0] for polygon in parts])
+        largest = max(parts, key=lambda polygon: signed_area(polygon[0]))
+        scale = np.cos(np.radians(largest[0][:, 1].mean()))
+        label, _ = polylabel([ring * [scale, 1.0] for ring in largest], 1e-4)
+
+        features.append({
+            'type': 'Feature',
+            'properties': {
+                name_property: group,
+                'aantal_gemeenten': len(groups[group]),
+                'bbox': [round(float(v), 6) for v in (*coords.min(axis=0), *coords.max(axis=0))],
+                'label': [round(float(v), 6) for v in label / [scale, 1.0]]
+            },
+            'geometry': _to_geometry(parts)
+        })
+
+    return {'type': 'FeatureCollection', 'features': features}
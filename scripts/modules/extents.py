@@ -0,0 +1,192 @@
+"""
+Bounding box, centroid en labelpunt per gemeente en per groep (provincie).
+
+Deze waarden worden in de build berekend zodat de kaart kan inzoomen en
+labels plaatsen zonder de geometrie te doorlopen.
+"""
+
+import numpy as np
+
+from .geometry import flatten_rings, polygons, polylabel, ring_moments
+
+
+# Nauwkeurigheid van het labelpunt in graden (~10 m)
+LABEL_PRECISION = 1e-4
+
+COORDINATE_DECIMALS = 6
+
+
+def _round(values) -> list[float]:
+    return [round(float(v), COORDINATE_DECIMALS) for v in values]
+
+
+def _polygon_moments(geojson: dict) -> dict[str, np.ndarray]:
+    """
+    Oppervlakte, momenten en bounding box per feature, volledig gevectoriseerd.
+
+    Binnenringen tellen negatief mee, ongeacht hun oriëntatie in de bron.
+    """
+    rings = flatten_rings(geojson)
+    area, moment_x, moment_y = ring_moments(rings['coords'], rings['ring_offsets'])
+
+    sign = np.where(rings['ring_is_hole'], -1.0, 1.0) * np.sign(area)
+    n = len(geojson['features'])
+    feature = rings['ring_feature']
+
+    starts = rings['ring_offsets'][:-1]
+    coords = rings['coords']
+    ring_min = np.minimum.reduceat(coords, starts) if len(starts) else np.empty((0, 2))
+    ring_max = np.maximum.reduceat(coords, starts) if len(starts) else np.empty((0, 2))
+
+    bbox = np.full((n, 4), np.nan)
+    for axis in (0, 1):
+        low = np.full(n, np.inf)
+        high = np.full(n, -np.inf)
+        np.minimum.at(low, feature, ring_min[:, axis])
+        np.maximum.at(high, feature, ring_max[:, axis])
+        bbox[:, axis], bbox[:, axis + 2] = low, high
+    bbox[~np.isin(np.arange(n), feature)] = np.nan
+
+    return {
+        'area': np.bincount(feature, sign * area, minlength=n),
+        'moment_x': np.bincount(feature, sign * moment_x, minlength=n),
+        'moment_y': np.bincount(feature, sign * moment_y, minlength=n),
+        'bbox': bbox
+    }
+
+
+def label_point(geometry: dict) -> np.ndarray | None:
+    """
+    Labelpunt (pole of inaccessibility) van de grootste polygon.
+
+    De lengtegraad wordt geschaald met cos(breedtegraad), zodat afstanden
+    in beide richtingen vergelijkbaar zijn.
+
+    Args:
+        geometry: GeoJSON (Multi)Polygon
+
+    Returns:
+        Array [lon, lat], of None zonder geometrie
+    """
+    parts = polygons(geometry)
+    if not parts:
+        return None
+
+    def outer_area(polygon):
+        area, _, _ = ring_moments(polygon[0], np.array([0, len(polygon[0])]))
+        return abs(area[0])
+
+    polygon = max(parts, key=outer_area)
+    scale = np.cos(np.radians(polygon[0][:, 1].mean()))
+    scaled = [ring * [scale, 1.0] for ring in polygon]
+
+    point, _ = polylabel(scaled, LABEL_PRECISION)
+    return point / [scale, 1.0]
+
+
+def add_feature_extents(geojson: dict) -> dict:
+    """
+    Voeg 'bbox', 'centroid' en 'label' toe aan de properties van elk feature.
+
+    Args:
+        geojson: GeoJSON data (wordt aangepast)
+
+    Returns:
+        De aangepaste GeoJSON
+    """
+    moments = _polygon_moments(geojson)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centroids = np.column_stack([moments['moment_x'], moments['moment_y']]) / moments['area'][:, None]
+
+    for idx, feature in enumerate(geojson['features']):
+        properties = feature['properties']
+        if np.isnan(moments['bbox'][idx]).any():
+            properties['bbox'] = properties['centroid'] = properties['label'] = None
+            continue
+
+        properties['bbox'] = _round(moments['bbox'][idx])
+        properties['centroid'] = _round(centroids[idx])
+        properties['label'] = _round(label_point(feature['geometry']))
+
+    return geojson
+
+
+def _group_extents(geojson: dict, moments: dict, members: list[int], outline: dict | None = None) -> dict | None:
+    """
+    Bbox, centroid en labelpunt van een groep features.
+
+    Het labelpunt is de pole of inaccessibility van de samengevoegde
+    geometrie (outline), of van het grootste lid als die er niet is.
+    """
+    features = geojson['features']
+    members = [i for i in members if not np.isnan(moments['bbox'][i]).any()]
+    if not members:
+        return None
+
+    area = np.abs(moments['area'][members])
+    boxes = moments['bbox'][members]
+    centroid = np.array([moments['moment_x'][members].sum(), moments['moment_y'][members].sum()]) / area.sum()
+
+    label = label_point(outline) if outline else None
+    if label is None:
+        label = label_point(features[members[int(np.argmax(area))]]['geometry'])
+
+    return {
+        'bbox': _round([*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0)]),
+        'centroid': _round(centroid),
+        'label': _round(label),
+        'oppervlakte': round(float(area.sum()), 8)
+    }
+
+
+def compute_group_extents(geojson: dict, key: str = 'province', outlines: dict | None = None) -> dict:
+    """
+    Bereken bbox, centroid en labelpunt per groep features (bv. per provincie).
+
+    De centroid is het oppervlakte-gewogen gemiddelde van de centroids van
+    de leden, zonder de geometrieën samen te voegen.
+
+    Args:
+        geojson: GeoJSON data
+        key: Property waarop gegroepeerd wordt
+        outlines: Samengevoegde geometrie per groep (zie modules/dissolve.py)
+            voor het labelpunt; zonder outline het grootste lid
+
+    Returns:
+        Dict {groep: {'bbox', 'centroid', 'label', 'oppervlakte'}}; de
+        oppervlakte is in vierkante graden en enkel bedoeld om te vergelijken
+    """
+    moments = _polygon_moments(geojson)
+    groups = {}
+    for idx, feature in enumerate(geojson['features']):
+        name = feature['properties'].get(key)
+        if name is not None:
+            groups.setdefault(name, []).append(idx)
+
+    result = {}
+    for name in sorted(groups):
+        extent = _group_extents(geojson, moments, groups[name], (outlines or {}).get(name))
+        if extent:
+            result[name] = extent
+    return result
+
+
+def build_extents(geojson: dict, outlines: dict | None = None) -> dict:
+    """
+    Bouw extents.json: Vlaanderen en de provincies (zoals averages.json).
+
+    Args:
+        geojson: GeoJSON data
+        outlines: Samengevoegde geometrie per naam, bv. {'Vlaanderen': ...,
+            'Limburg': ...} uit modules/dissolve.py
+
+    Returns:
+        Dict met 'Vlaanderen' en 'Provincies'
+    """
+    outlines = outlines or {}
+    moments = _polygon_moments(geojson)
+    return {
+        'Vlaanderen': _group_extents(geojson, moments, list(range(len(geojson['features']))),
+                                     outlines.get('Vlaanderen')),
+        'Provincies': compute_group_extents(geojson, 'province', outlines)
+    }
@@ -0,0 +1,142 @@
+"""
+Fingerprinting van de website: elk bestand krijgt een hash in de naam.
+
+Vertrekkend van index.html worden alle verwijzingen gevolgd (scripts,
+stylesheets, imports tussen modules, fetch() van data bestanden en
+verwijzingen binnen JSON headers). Elk bestand wordt gekopieerd naar
+naam.<hash>.ext en de verwijzingen worden herschreven. Een bestand wordt
+pas gehasht nadat zijn eigen verwijzingen herschreven zijn, zodat een
+gewijzigde module ook de hash van alles wat ze importeert verandert.
+
+Enkel index.html en asset-manifest.json houden hun naam; al de rest kan
+geserveerd worden met Cache-Control: immutable.
+"""
+
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path, PurePosixPath
+
+
+MANIFEST_NAME = 'asset-manifest.json'
+
+HASH_LENGTH = 10
+
+# Bestanden waarin naar andere bestanden verwezen kan worden
+TEXT_SUFFIXES = {'.html', '.js', '.css', '.json'}
+
+# Een bestandsnaam als string literal of in url(), met optionele query string
+REFERENCE = re.compile(r'''(["'(])([\w./-]+\.[A-Za-z0-9]+)(\?[^"'()\s]*)?(?=["')])''')
+
+# Herkent een gefingerprinte bestandsnaam (zie serve.py)
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    """
+    'js/app.js' -> 'js/app.<hash>.js' (eerste tekens van de SHA-256).
+    """
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    path = PurePosixPath(path)
+    return str(path.with_name(f'{path.stem}.{digest}{path.suffix}'))
+
+
+def _resolve(reference: str, source: str, site_dir: Path) -> str | None:
+    """
+    Pad van een verwijzing binnen de site, of None als het geen bestand van de site is.
+
+    Relatief tegenover het bestand zelf (imports, CSS url()) of tegenover
+    de pagina (fetch() vanuit een module).
+    """
+    if '://' in reference or reference.startswith(('/', 'data:', 'mailto:')):
+        return None
+
+    for base in (PurePosixPath(source).parent, PurePosixPath('.')):
+        parts = []
+        for part in (base / reference).parts:
+            if part == '..':
+                if not parts:
+                    break
+                parts.pop()
+            elif part != '.':
+                parts.append(part)
+        else:
+            path = '/'.join(parts)
+            if path and (site_dir / path).is_file():
+                return path
+    return None
+
+
+def _references(path: str, text: str, site_dir: Path) -> list[tuple[re.Match, str]]:
+    return [
+        (match, target)
+        for match in REFERENCE.finditer(text)
+        if (target := _resolve(match.group(2), path, site_dir)) and target != path
+    ]
+
+
+def fingerprint_site(site_dir: str | Path, output_dir: str | Path, entry: str = 'index.html') -> dict[str, str]:
+    """
+    Kopieer de site met gehashte bestandsnamen en herschreven verwijzingen.
+
+    Args:
+        site_dir: Map met de website (longread_output)
+        output_dir: Doelmap (wordt eerst leeggemaakt)
+        entry: Startpagina; behoudt zijn naam
+
+    Returns:
+        Manifest {origineel pad: gehasht pad}, ook bewaard als asset-manifest.json
+
+    Raises:
+        ValueError: Bij een kringverwijzing (dan bestaat er geen hash volgorde)
+    """
+    site_dir = Path(site_dir)
+    output_dir = Path(output_dir)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    manifest = {}
+    visiting = set()
+
+    def rewrite(path: str) -> bytes:
+        content = (site_dir / path).read_bytes()
+        if PurePosixPath(path).suffix not in TEXT_SUFFIXES:
+            return content
+
+        text = content.decode('utf-8')
+        references = _references(path, text, site_dir)
+        for _, target in references:
+            visit(target)
+
+        # Van achter naar voor vervangen zodat de posities geldig blijven
+        for match, target in reversed(references):
+            old = match.group(2)
+            new = PurePosixPath(manifest[target]).name
+            replaced = old[:len(old) - len(PurePosixPath(old).name)] + new
+            # Een eventuele query string (bv. ?v=...) is met de hash overbodig
+            text = text[:match.start(2)] + replaced + text[match.end():]
+        return text.encode('utf-8')
+
+    def visit(path: str) -> None:
+        if path in manifest:
+            return
+        if path in visiting:
+            raise ValueError(f"Kringverwijzing via {path}")
+        visiting.add(path)
+
+        content = rewrite(path)
+        target = fingerprinted_name(path, content)
+        (output_dir / target).parent.mkdir(parents=True, exist_ok=True)
+        (output_dir / target).write_bytes(content)
+        manifest[path] = target
+        visiting.discard(path)
+
+    (output_dir / entry).write_bytes(rewrite(entry))
+
+    manifest = dict(sorted(manifest.items()))
+    with open(output_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    return manifest
@@ -0,0 +1,485 @@
+"""
+Hulpfuncties voor de polygonen van de gemeenten (GeoJSON, CRS84).
+
+Geometrieën kunnen als GeoJSON dicts (geneste lijsten) of als GeometryArray
+(aaneengesloten NumPy buffers met offsets) in het geheugen zitten.
+Coördinaten worden gekwantiseerd tot gehele getallen zodat gedeelde
+grenzen tussen gemeenten exact vergeleken (gehasht) kunnen worden.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+
+# 7 decimalen (~1 cm) zoals in municipalities.geojson
+QUANTIZE_DECIMALS = 7
+
+
+class GeometryArray:
+    """
+    Geometrieën van alle features in één ragged layout.
+
+    Alle punten staan in één aaneengesloten buffer: float64, of int32
+    gekwantiseerd op QUANTIZE_DECIMALS (8 bytes per punt). Drie offset
+    arrays verdelen die buffer in ringen, polygonen en features:
+
+    - ring_offsets[r]:r+1 -> punten van ring r
+    - polygon_offsets[p]:p+1 -> ringen van polygon p (eerst de buitenring)
+    - feature_offsets[f]:f+1 -> polygonen van feature f
+
+    Python lijsten worden pas gemaakt bij het wegschrijven (to_geojson).
+    """
+
+    def __init__(self, coords: np.ndarray, ring_offsets: np.ndarray, polygon_offsets: np.ndarray,
+                 feature_offsets: np.ndarray, multi: np.ndarray, scale: float | None = None):
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.polygon_offsets = polygon_offsets
+        self.feature_offsets = feature_offsets
+        self.multi = multi
+        self.scale = scale
+
+    def __len__(self) -> int:
+        return len(self.feature_offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.coords, self.ring_offsets, self.polygon_offsets,
+                                      self.feature_offsets, self.multi))
+
+    def ring(self, r: int) -> np.ndarray:
+        """
+        Ring r als float64 (n, 2) array (een view als niet gekwantiseerd).
+        """
+        points = self.coords[self.ring_offsets[r]:self.ring_offsets[r + 1]]
+        return points if self.scale is None else points / self.scale
+
+    def polygons(self, f: int) -> list[list[np.ndarray]]:
+        """
+        Polygonen van feature f, zoals polygons() voor een GeoJSON geometrie.
+        """
+        return [
+            [self.ring(r) for r in range(self.polygon_offsets[p], self.polygon_offsets[p + 1])]
+            for p in range(self.feature_offsets[f], self.feature_offsets[f + 1])
+        ]
+
+    def to_geojson(self, f: int) -> dict | None:
+        """
+        Zet feature f terug om naar een GeoJSON geometrie (voor het wegschrijven).
+        """
+        parts = self.polygons(f)
+        if not parts:
+            return None
+
+        decimals = QUANTIZE_DECIMALS if self.scale is not None else None
+        coordinates = [
+            [(np.round(ring, decimals) if decimals else ring).tolist() for ring in polygon]
+            for polygon in parts
+        ]
+        if self.multi[f]:
+            return {'type': 'MultiPolygon', 'coordinates': coordinates}
+        return {'type': 'Polygon', 'coordinates': coordinates[0]}
+
+
+class GeometryRef:
+    """
+    Verwijzing naar één feature in een GeometryArray.
+
+    Neemt de plaats in van feature['geometry'] na
+    load_geojson(..., geometry_array=True). Alle functies in deze module
+    aanvaarden zowel een GeoJSON dict als een GeometryRef.
+    """
+    __slots__ = ('array', 'index')
+
+    def __init__(self, array: GeometryArray | None, index: int):
+        self.array = array
+        self.index = index
+
+    def polygons(self) -> list[list[np.ndarray]]:
+        return self.array.polygons(self.index)
+
+    def to_geojson(self) -> dict | None:
+        return self.array.to_geojson(self.index)
+
+
+class GeometryArrayBuilder:
+    """
+    Bouwt een GeometryArray terwijl de GeoJSON geparsed wordt.
+
+    Bedoeld als json object_hook: elke geometrie wordt omgezet zodra ze
+    gelezen is, zodat nooit alle coördinaten tegelijk als Python lijsten
+    in het geheugen zitten.
+    """
+
+    def __init__(self, quantize: bool = False):
+        self.scale = 10 ** QUANTIZE_DECIMALS if quantize else None
+        self.chunks = []
+        self.ring_lengths = []
+        self.polygon_lengths = []
+        self.feature_lengths = []
+        self.multi = []
+        self.refs = []
+
+    def add(self, geometry: dict) -> GeometryRef:
+        parts = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+        for polygon in parts:
+            for ring in polygon:
+                points = np.asarray(ring, dtype=float)[:, :2]
+                if self.scale is not None:
+                    points = np.round(points * self.scale).astype(np.int32)
+                self.chunks.append(points)
+                self.ring_lengths.append(len(points))
+            self.polygon_lengths.append(len(polygon))
+        self.feature_lengths.append(len(parts))
+        self.multi.append(geometry['type'] == 'MultiPolygon')
+
+        ref = GeometryRef(None, len(self.refs))
+        self.refs.append(ref)
+        return ref
+
+    def object_hook(self, obj: dict):
+        if obj.get('type') in ('Polygon', 'MultiPolygon') and 'coordinates' in obj:
+            return self.add(obj)
+        return obj
+
+    def finish(self) -> GeometryArray:
+        dtype = np.int32 if self.scale is not None else np.float64
+
+        def offsets(lengths):
+            result = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=result[1:])
+            return result
+
+        array = GeometryArray(
+            coords=np.concatenate(self.chunks).astype(dtype, copy=False) if self.chunks else np.empty((0, 2), dtype),
+            ring_offsets=offsets(self.ring_lengths),
+            polygon_offsets=offsets(self.polygon_lengths),
+            feature_offsets=offsets(self.feature_lengths),
+            multi=np.array(self.multi, dtype=bool),
+            scale=self.scale
+        )
+        self.chunks = []
+        for ref in self.refs:
+            ref.array = array
+        return array
+
+
+def polygons(geometry: dict | GeometryRef) -> list[list[np.ndarray]]:
+    """
+    Geef de polygonen van een Polygon of MultiPolygon geometrie.
+
+    Args:
+        geometry: GeoJSON geometrie of GeometryRef
+
+    Returns:
+        Lijst van polygonen, elk een lijst van ringen (eerst de buitenring)
+        als float64 arrays van vorm (n, 2)
+    """
+    if geometry is None:
+        return []
+
+    if isinstance(geometry, GeometryRef):
+        return geometry.polygons()
+
+    if geometry['type'] == 'Polygon':
+        parts = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        parts = geometry['coordinates']
+    else:
+        raise ValueError(f"Geometrie type niet ondersteund: {geometry['type']}")
+
+    return [[np.asarray(ring, dtype=float)[:, :2] for ring in polygon] for polygon in parts]
+
+
+def rings(geometry: dict) -> list[np.ndarray]:
+    """
+    Geef alle ringen (buiten- en binnenringen) van een geometrie.
+
+    Args:
+        geometry: GeoJSON geometrie
+
+    Returns:
+        Lijst van (n, 2) arrays
+    """
+    return [ring for polygon in polygons(geometry) for ring in polygon]
+
+
+def bounding_box(geometry: dict) -> tuple[float, float, float, float] | None:
+    """
+    Bereken de bounding box van een geometrie.
+
+    Args:
+        geometry: GeoJSON geometrie
+
+    Returns:
+        (min_lon, min_lat, max_lon, max_lat), of None zonder coördinaten
+    """
+    all_rings = rings(geometry)
+    if not all_rings:
+        return None
+
+    coords = np.concatenate(all_rings)
+    min_x, min_y = coords.min(axis=0)
+    max_x, max_y = coords.max(axis=0)
+    return float(min_x), float(min_y), float(max_x), float(max_y)
+
+
+def vertex_keys(ring: np.ndarray, decimals: int = QUANTIZE_DECIMALS) -> np.ndarray:
+    """
+    Kwantiseer de punten van een ring tot één int64 sleutel per punt.
+
+    Args:
+        ring: (n, 2) array met lon/lat
+        decimals: Aantal decimalen dat behouden blijft
+
+    Returns:
+        int64 array met (lon << 32) | lat per punt
+    """
+    quantized = np.round(ring * 10 ** decimals).astype(np.int64)
+    return (quantized[:, 0] << 32) | (quantized[:, 1] & 0xFFFFFFFF)
+
+
+def edge_keys(ring: np.ndarray, decimals: int = QUANTIZE_DECIMALS) -> np.ndarray:
+    """
+    Bereken een richtingsonafhankelijke sleutel per zijde van een ring.
+
+    Twee gemeenten die een grens delen hebben dezelfde sleutels voor de
+    gedeelde zijden (in tegengestelde richting doorlopen).
+
+    Args:
+        ring: Gesloten (n, 2) ring (eerste punt = laatste punt)
+        decimals: Aantal decimalen dat behouden blijft
+
+    Returns:
+        (n - 1, 2) int64 array met (kleinste, grootste) puntsleutel,
+        zonder gedegenereerde zijden
+    """
+    keys = vertex_keys(ring, decimals)
+    start, end = keys[:-1], keys[1:]
+    edges = np.stack([np.minimum(start, end), np.maximum(start, end)], axis=1)
+    return edges[start != end]
+
+
+def simplify(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Vereenvoudig een gesloten ring met het Douglas-Peucker algoritme.
+
+    Args:
+        ring: Gesloten (n, 2) ring
+        tolerance: Maximale afwijking (in de eenheid van de coördinaten)
+
+    Returns:
+        Vereenvoudigde gesloten ring (kan minder dan 4 punten hebben als
+        de ring wegvalt bij deze tolerantie)
+    """
+    if len(ring) <= 4 or tolerance <= 0:
+        return ring
+
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    # Een gesloten ring eerst splitsen op het punt het verst van het begin
+    far = int(np.argmax(np.hypot(*(ring - ring[0]).T)))
+    keep[far] = True
+    stack = [(0, far), (far, len(ring) - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        a, b = ring[start], ring[end]
+        points = ring[start + 1:end]
+        dx, dy = b - a
+        length = np.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(*(points - a).T)
+        else:
+            distances = np.abs(dx * (points[:, 1] - a[1]) - dy * (points[:, 0] - a[0])) / length
+
+        idx = int(np.argmax(distances))
+        if distances[idx] > tolerance:
+            split = start + 1 + idx
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return ring[keep]
+
+
+def signed_area(ring: np.ndarray) -> float:
+    """
+    Bereken de oppervlakte van een gesloten ring met de shoelace formule.
+
+    Args:
+        ring: Gesloten (n, 2) ring
+
+    Returns:
+        Oppervlakte, positief voor tegenwijzerzin (bij een y-as naar boven)
+    """
+    x, y = ring[:-1, 0], ring[:-1, 1]
+    x_next, y_next = ring[1:, 0], ring[1:, 1]
+    return float(np.sum(x * y_next - x_next * y) / 2)
+
+
+def geometry_array(geojson: dict) -> GeometryArray | None:
+    """
+    De GeometryArray achter de features, als alle features er één delen.
+
+    Args:
+        geojson: GeoJSON data
+
+    Returns:
+        GeometryArray in feature volgorde, of None (gewone GeoJSON dicts)
+    """
+    geometries = [feature.get('geometry') for feature in geojson['features']]
+    if not geometries or not all(isinstance(g, GeometryRef) for g in geometries):
+        return None
+
+    array = geometries[0].array
+    if any(g.array is not array or g.index != i for i, g in enumerate(geometries)) or len(array) != len(geometries):
+        return None
+    return array
+
+
+def flatten_rings(geojson: dict) -> dict[str, np.ndarray]:
+    """
+    Zet alle ringen van alle features om naar platte NumPy arrays.
+
+    Args:
+        geojson: GeoJSON met (Multi)Polygon geometrieën
+
+    Returns:
+        Dict met 'coords' (n, 2), 'ring_offsets' (start van elke ring plus
+        het einde), 'ring_feature' (feature index per ring), 'ring_polygon'
+        (polygon index binnen het feature) en 'ring_is_hole' per ring
+    """
+    array = geometry_array(geojson)
+    if array is not None:
+        ring_polygon_idx = np.repeat(np.arange(len(array.polygon_offsets) - 1), np.diff(array.polygon_offsets))
+        polygon_feature = np.repeat(np.arange(len(array)), np.diff(array.feature_offsets))
+        ring_position = np.arange(len(ring_polygon_idx)) - array.polygon_offsets[ring_polygon_idx]
+        coords = array.coords if array.scale is None else array.coords / array.scale
+        return {
+            'coords': coords,
+            'ring_offsets': array.ring_offsets,
+            'ring_feature': polygon_feature[ring_polygon_idx],
+            'ring_polygon': ring_polygon_idx - array.feature_offsets[polygon_feature[ring_polygon_idx]],
+            'ring_is_hole': ring_position > 0
+        }
+
+    coords, offsets, ring_feature, ring_polygon, ring_is_hole = [], [0], [], [], []
+    for feature_idx, feature in enumerate(geojson['features']):
+        for polygon_idx, polygon in enumerate(polygons(feature.get('geometry'))):
+            for ring_idx, ring in enumerate(polygon):
+                coords.append(ring)
+                offsets.append(offsets[-1] + len(ring))
+                ring_feature.append(feature_idx)
+                ring_polygon.append(polygon_idx)
+                ring_is_hole.append(ring_idx > 0)
+
+    return {
+        'coords': np.concatenate(coords) if coords else np.empty((0, 2)),
+        'ring_offsets': np.array(offsets, dtype=np.int64),
+        'ring_feature': np.array(ring_feature, dtype=np.int64),
+        'ring_polygon': np.array(ring_polygon, dtype=np.int64),
+        'ring_is_hole': np.array(ring_is_hole, dtype=bool)
+    }
+
+
+def ring_moments(coords: np.ndarray, ring_offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bereken oppervlakte en eerste momenten van alle ringen tegelijk (shoelace).
+
+    Args:
+        coords: (n, 2) coördinaten van alle (gesloten) ringen achter elkaar
+        ring_offsets: Start van elke ring plus het einde
+
+    Returns:
+        Tuple (oppervlakte, moment_x, moment_y) per ring, met teken volgens
+        de oriëntatie; centroid van een ring = moment / oppervlakte
+    """
+    x, y = coords[:-1, 0], coords[:-1, 1]
+    x_next, y_next = coords[1:, 0], coords[1:, 1]
+    cross = x * y_next - x_next * y
+
+    # Paren die over de grens tussen twee ringen lopen tellen niet mee
+    cross[ring_offsets[1:-1] - 1] = 0
+
+    starts = ring_offsets[:-1]
+    area = np.add.reduceat(cross, starts) / 2
+    moment_x = np.add.reduceat((x + x_next) * cross, starts) / 6
+    moment_y = np.add.reduceat((y + y_next) * cross, starts) / 6
+    return area, moment_x, moment_y
+
+
+def polylabel(polygon: list[np.ndarray], precision: float) -> tuple[np.ndarray, float]:
+    """
+    Zoek het punt in een polygon dat het verst van de rand ligt.
+
+    Dit 'pole of inaccessibility' is een goed labelpunt, ook voor
+    holle of langgerekte vormen waar de centroid buiten de polygon valt.
+    Quadtree zoektocht met een priority queue (zoals Mapbox polylabel).
+
+    Args:
+        polygon: Ringen van één polygon (eerst de buitenring)
+        precision: Gewenste nauwkeurigheid (in de eenheid van de coördinaten)
+
+    Returns:
+        Tuple (punt, afstand tot de rand)
+    """
+    segments = np.concatenate([np.hstack([ring[:-1], ring[1:]]) for ring in polygon])
+    x1, y1, x2, y2 = segments.T
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = np.where(dx * dx + dy * dy == 0, 1.0, dx * dx + dy * dy)
+
+    def signed_distance(px, py):
+        # Positief binnen de polygon, negatief erbuiten
+        crosses = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_at_y = x1 + (py - y1) * dx / (y2 - y1)
+        inside = np.count_nonzero(crosses & (px < x_at_y)) % 2 == 1
+
+        t = np.clip(((px - x1) * dx + (py - y1) * dy) / length_sq, 0, 1)
+        distance = np.sqrt(np.min((x1 + t * dx - px) ** 2 + (y1 + t * dy - py) ** 2))
+        return distance if inside else -distance
+
+    outer = polygon[0]
+    min_x, min_y = outer.min(axis=0)
+    max_x, max_y = outer.max(axis=0)
+    cell_size = min(max_x - min_x, max_y - min_y)
+    if cell_size == 0:
+        return np.array([min_x, min_y]), 0.0
+
+    def cell(cx, cy, half):
+        d = signed_distance(cx, cy)
+        # Bovengrens voor de afstand van eender welk punt in de cel
+        return (-(d + half * math.sqrt(2)), cx, cy, half, d)
+
+    half = cell_size / 2
+    queue = [
+        cell(x, y, half)
+        for x in np.arange(min_x, max_x, cell_size) + half
+        for y in np.arange(min_y, max_y, cell_size) + half
+    ]
+    heapq.heapify(queue)
+
+    # Startwaarde: centroid van de buitenring
+    area, moment_x, moment_y = ring_moments(outer, np.array([0, len(outer)]))
+    best = cell(moment_x[0] / area[0], moment_y[0] / area[0], 0) if area[0] else cell(min_x, min_y, 0)
+
+    while queue:
+        current = heapq.heappop(queue)
+        if current[4] > best[4]:
+            best = current
+        if -current[0] - best[4] <= precision:
+            continue
+
+        half = current[3] / 2
+        for ox in (-half, half):
+            for oy in (-half, half):
+                heapq.heappush(queue, cell(current[1] + ox, current[2] + oy, half))
+
+    return np.array([best[1], best[2]]), best[4]
@@ -0,0 +1,214 @@
+"""
+Rekeningenstelsel als boom, met subtotalen op elk niveau per gemeente.
+
+De boom komt uit de niveau_1 ... niveau_8 kolommen van de PowerBI export
+(zie prepare_data.py): elke rekening is een blad onder het pad van zijn
+niveaus. De subtotalen voor alle gemeenten worden in één keer berekend:
+eerst de bladeren uit de SparseMatrix, daarna niveau per niveau van onder
+naar boven opgeteld bij de ouder.
+
+Voor de frontend wordt per knoop een klein JSON bestand geschreven met de
+bedragen van de kinderen per gemeente. Het detail paneel laadt enkel de
+knopen waar de gebruiker naartoe klikt.
+"""
+
+import json
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from .sparse import SparseMatrix, sum_by
+
+
+ROOT_LABEL = 'Investeringsuitgaven'
+
+NIVEAUS = tuple(f'niveau_{i}' for i in range(1, 9))
+
+
+class AccountTree:
+    """
+    Boom met knoopnummers in aanmaakvolgorde: een ouder heeft altijd een
+    kleiner nummer dan zijn kinderen, en knoop 0 is de wortel.
+    """
+
+    def __init__(self, root_label: str = ROOT_LABEL):
+        self.labels = [root_label]
+        self.codes: list[str | None] = [None]
+        self.parents = [-1]
+        self.depths = [0]
+        # Kinderen per knoop; niveaus op naam, rekeningen op ('rekening', code)
+        self.children: list[dict[str | tuple, int]] = [{}]
+        self.leaves: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _child(self, parent: int, label: str, code: str | None = None) -> int:
+        key = label if code is None else ('rekening', code)
+        node = self.children[parent].get(key)
+        if node is None:
+            node = len(self.labels)
+            self.labels.append(label)
+            self.codes.append(code)
+            self.parents.append(parent)
+            self.depths.append(self.depths[parent] + 1)
+            self.children.append({})
+            self.children[parent][key] = node
+        return node
+
+    def add(self, levels: Sequence[str], code: str, label: str) -> int:
+        """
+        Voeg een rekening toe onder het pad van zijn niveaus.
+
+        Args:
+            levels: Niveaus van boven naar onder (leeg = rechtstreeks onder de wortel)
+            code: Rekeningcode (sleutel van het blad)
+            label: Volledige naam van de rekening
+
+        Returns:
+            Knoopnummer van het blad (het bestaande als de code al gekend is)
+        """
+        if code in self.leaves:
+            return self.leaves[code]
+        node = 0
+        for level in levels:
+            node = self._child(node, level)
+        leaf = self._child(node, label, code)
+        self.leaves[code] = leaf
+        return leaf
+
+    @classmethod
+    def from_rekeningen(cls, rekeningen: dict, root_label: str = ROOT_LABEL) -> 'AccountTree':
+        """
+        Bouw de boom uit de rekeningen van de store (load_rekening_metadata).
+
+        Args:
+            rekeningen: Dict {code: {'alg_rekening': ..., 'niveaus': {'niveau_1': ..., ...}}}
+        """
+        tree = cls(root_label)
+        for code, rekening in rekeningen.items():
+            niveaus = rekening.get('niveaus') or {}
+            tree.add([niveaus[key] for key in NIVEAUS if niveaus.get(key)], code, rekening['alg_rekening'])
+        return tree
+
+    def is_leaf(self, node: int) -> bool:
+        return not self.children[node]
+
+    def path(self, node: int) -> list[int]:
+        """
+        Knoopnummers van de wortel tot en met node.
+        """
+        path = []
+        while node >= 0:
+            path.append(node)
+            node = self.parents[node]
+        return path[::-1]
+
+    def leaf_ids(self, matrix: SparseMatrix) -> np.ndarray:
+        """
+        Bladnummer per kolom van de matrix; rekeningen die niet in de boom
+        staan worden rechtstreeks onder de wortel gehangen.
+        """
+        meta = matrix.column_meta or [{'code': label, 'naam': label} for label in matrix.columns]
+        return np.array([self.add([], column['code'], column['naam']) for column in meta], dtype=np.int64)
+
+
+def rollup(matrix: SparseMatrix, tree: AccountTree) -> np.ndarray:
+    """
+    Subtotalen op elk niveau voor elke rij van de matrix.
+
+    De bladeren worden in één keer per (blad, rij) opgeteld; daarna wordt
+    elk niveau, van het diepste naar boven, in één keer bij de ouders
+    opgeteld. Met centen als int64 zijn alle subtotalen exact.
+
+    Args:
+        matrix: Gemeenten × rekeningen
+        tree: Rekeningenboom (onbekende rekeningen worden toegevoegd)
+
+    Returns:
+        Matrix knopen × rijen in het dtype van de matrix (rij 0 = totaal per gemeente)
+    """
+    leaf_ids = tree.leaf_ids(matrix)
+    nodes, rows = len(tree), len(matrix)
+
+    flat = leaf_ids[matrix.indices] * rows + matrix.row_ids()
+    subtotals = sum_by(flat, matrix.data, nodes * rows).reshape(nodes, rows)
+
+    parents = np.array(tree.parents, dtype=np.int64)
+    depths = np.array(tree.depths, dtype=np.int64)
+    for depth in range(depths.max(initial=0), 0, -1):
+        level = np.flatnonzero(depths == depth)
+        np.add.at(subtotals, parents[level], subtotals[level])
+    return subtotals
+
+
+def breakdown_file(node: int) -> str:
+    return f'{node}.json'
+
+
+def write_breakdowns(tree: AccountTree, names: list[str], years: list[int],
+                     subtotals: np.ndarray, output_dir: str | Path) -> int:
+    """
+    Schrijf per knoop de bedragen van zijn kinderen per gemeente en per jaar.
+
+    Enkel knopen en kinderen met een bedrag verschillend van 0 worden
+    opgenomen. Een kind dat zelf kinderen heeft verwijst met 'bestand'
+    naar zijn eigen breakdown (relatief tegenover de website, zodat
+    fingerprinting ook deze verwijzingen herschrijft).
+
+    Args:
+        tree: Rekeningenboom
+        names: Gemeentenamen (zoals in de GeoJSON), één per kolom van subtotals
+        years: Jaren, één per eerste as van subtotals
+        subtotals: Array jaren × knopen × gemeenten (NaN = geen data dat jaar)
+        output_dir: Map voor de bestanden (wordt eerst leeggemaakt)
+
+    Returns:
+        Aantal geschreven bestanden
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for old in output_dir.glob('*.json'):
+        old.unlink()
+
+    present = np.nan_to_num(subtotals).any(axis=(0, 2))
+    prefix = output_dir.name
+
+    written = 0
+    for node in range(len(tree)):
+        children = [child for child in tree.children[node].values() if present[child]]
+        if not children:
+            continue
+
+        values = subtotals[:, children, :]
+        missing = np.isnan(values).all(axis=1).T.tolist()
+        values = np.nan_to_num(values)
+        gemeenten = {}
+        for column in np.flatnonzero(values.any(axis=(0, 1))).tolist():
+            gemeenten[names[column]] = [
+                None if no_data else [round(value, 2) for value in row]
+                for row, no_data in zip(values[:, :, column].tolist(), missing[column])
+            ]
+
+        breakdown = {
+            'id': node,
+            'naam': tree.labels[node],
+            'pad': [{'id': ancestor, 'naam': tree.labels[ancestor]} for ancestor in tree.path(node)],
+            'jaren': years,
+            'kinderen': [
+                {
+                    'id': child,
+                    'naam': tree.labels[child],
+                    'code': tree.codes[child],
+                    'bestand': None if tree.is_leaf(child) else f'{prefix}/{breakdown_file(child)}'
+                }
+                for child in children
+            ],
+            'gemeenten': gemeenten
+        }
+        with open(output_dir / breakdown_file(node), 'w', encoding='utf-8') as f:
+            json.dump(breakdown, f, separators=(',', ':'), ensure_ascii=False)
+        written += 1
+
+    return written
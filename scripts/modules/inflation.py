@@ -0,0 +1,143 @@
+"""
+Inflatiecorrectie van de reeksen op basis van de consumptieprijsindex.
+
+Alle reeksen worden als parallelle arrays bewaard ('nominaal' en 'reeel'
+per jaar), zodat de frontend enkel van array moet wisselen.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from .loaders import load_json
+from .year_matrix import YearMatrix, to_json_list
+
+
+REFERENCE_YEAR = 2014
+
+
+def load_cpi(filepath: str | Path) -> dict[int, float]:
+    """
+    Laad de consumptieprijsindex per jaar.
+
+    Bij dubbele jaren wordt (zoals in de frontend) de eerste waarde gebruikt.
+
+    Args:
+        filepath: Pad naar cpi.json
+
+    Returns:
+        Dict {jaar: index}
+    """
+    cpi = {}
+    for fact in load_json(filepath).get('facts', []):
+        year = int(fact['Jaar'])
+        if year not in cpi:
+            cpi[year] = fact['Consumptieprijsindex']
+    return cpi
+
+
+def cpi_factors(years: list[int], cpi: dict[int, float],
+                reference_year: int = REFERENCE_YEAR) -> np.ndarray:
+    """
+    Bereken de omrekenfactor naar prijzen van het referentiejaar.
+
+    Args:
+        years: Jaren van de reeks
+        cpi: Dict {jaar: index}
+        reference_year: Jaar waarin de reële bedragen uitgedrukt worden
+
+    Returns:
+        Array met factor per jaar (1.0 als de index ontbreekt)
+    """
+    reference = cpi[reference_year]
+    index = np.array([cpi.get(year, np.nan) for year in years], dtype=float)
+    return np.where(np.isnan(index), 1.0, reference / index)
+
+
+def period_factors(periods: list[str], cpi: dict[int, float],
+                   reference_year: int = REFERENCE_YEAR) -> np.ndarray:
+    """
+    Bereken de omrekenfactor per meerjarenplan ('2014-2019').
+
+    Gebruikt de gemiddelde index over de jaren van de periode waarvoor een
+    index bekend is. Zonder gekende jaren is de factor 1.0.
+
+    Args:
+        periods: Labels van de meerjarenplannen
+        cpi: Dict {jaar: index}
+        reference_year: Jaar waarin de reële bedragen uitgedrukt worden
+
+    Returns:
+        Array met factor per periode
+    """
+    factors = []
+    for period in periods:
+        start, end = (int(year) for year in period.split('-'))
+        known = [cpi[year] for year in range(start, end + 1) if year in cpi]
+        factors.append(cpi[reference_year] / np.mean(known) if known else 1.0)
+    return np.array(factors)
+
+
+def _series_by_key(data: dict, keys: list, factors: np.ndarray) -> dict:
+    """
+    Reeksen voor een dict {naam: {key: waarde}} in één matrixvermenigvuldiging.
+    """
+    names = list(data)
+    nominal = np.array(
+        [[np.nan if data[name].get(key) is None else data[name][key] for key in keys] for name in names],
+        dtype=float
+    ).reshape(len(names), len(keys))
+    real = nominal * factors
+
+    return {
+        name: {'nominaal': to_json_list(nominal[i]), 'reeel': to_json_list(real[i])}
+        for i, name in enumerate(names)
+    }
+
+
+def build_inflation_series(matrix: YearMatrix, averages: dict, beleidsdomein_totals: dict,
+                           cpi: dict[int, float], provincie_totals: dict | None = None,
+                           reference_year: int = REFERENCE_YEAR) -> dict:
+    """
+    Bereken nominale en reële reeksen voor alle grafieken.
+
+    Args:
+        matrix: Gemeenten × jaren matrix
+        averages: Gemiddelden ({'Vlaanderen': {...}, 'Provincies': {...}})
+        beleidsdomein_totals: Totalen {subdomein: {jaar: totaal}}
+        cpi: Dict {jaar: index}
+        provincie_totals: Optionele totalen {provincie: {meerjarenplan: totaal}}
+        reference_year: Jaar waarin de reële bedragen uitgedrukt worden
+
+    Returns:
+        Dict met parallelle 'nominaal' en 'reeel' arrays per reeks
+    """
+    years = matrix.years
+    year_keys = [str(year) for year in years]
+    factors = cpi_factors(years, cpi, reference_year)
+    regions = _series_by_key(
+        {'Vlaanderen': averages['Vlaanderen'], **averages.get('Provincies', {})}, year_keys, factors
+    )
+
+    result = {
+        'referentiejaar': reference_year,
+        'jaren': years,
+        'factoren': to_json_list(factors, 6),
+        'vlaanderen': regions.pop('Vlaanderen'),
+        'provincies': regions,
+        # Keys van beleidsdomein_totals zijn ints in de build, strings na JSON
+        'beleidsdomeinen': _series_by_key(
+            {name: {int(y): v for y, v in data.items()} for name, data in beleidsdomein_totals.items()},
+            years,
+            factors
+        )
+    }
+
+    if provincie_totals:
+        periods = sorted({period for data in provincie_totals.values() for period in data})
+        factors_mjp = period_factors(periods, cpi, reference_year)
+        result['meerjarenplannen'] = periods
+        result['periode_factoren'] = to_json_list(factors_mjp, 6)
+        result['provincie_totalen'] = _series_by_key(provincie_totals, periods, factors_mjp)
+
+    return result
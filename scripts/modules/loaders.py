@@ -4,35 +4,159 @@ Data loaders voor verschillende input formaten.
 
 import json
 import csv
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import defaultdict
-from .utils import normalize_municipality_name, parse_value
+from typing import Callable
+from .geometry import GeometryArrayBuilder, GeometryRef
+from .sparse import SparseMatrix
+from .utils import normalize_municipality_name, parse_cents
 
 
-def load_geojson(filepath: str | Path) -> dict:
+def load_geojson(filepath: str | Path, geometry_array: bool = False, quantize: bool = False) -> dict:
     """
     Laad een GeoJSON bestand.
     
+    Met geometry_array=True worden de geometrieën tijdens het parsen omgezet
+    naar één GeometryArray (NumPy buffers met offsets); feature['geometry']
+    is dan een GeometryRef. Dat gebruikt een fractie van het geheugen van
+    geneste Python lijsten.
+    
     Args:
         filepath: Pad naar GeoJSON bestand
+        geometry_array: Geometrieën als GeometryArray bewaren
+        quantize: Coördinaten als int32 (7 decimalen) in plaats van float64
         
     Returns:
         Dict met GeoJSON data
     """
     with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        if not geometry_array:
+            return json.load(f)
+
+        builder = GeometryArrayBuilder(quantize=quantize)
+        data = json.load(f, object_hook=builder.object_hook)
+        builder.finish()
+        return data
+
+
+def _geometry_default(obj):
+    # GeometryRef wordt pas bij het wegschrijven terug een GeoJSON geometrie
+    if isinstance(obj, GeometryRef):
+        return obj.to_geojson()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class GeoJSONWriter:
+    """
+    Schrijf een FeatureCollection feature per feature weg.
+    
+    Eerst de kop (de andere members van de collectie), daarna elk feature
+    zodra het klaar is. Enkel het feature dat geschreven wordt staat als
+    tekst in het geheugen. De output is byte-identiek aan json.dump met
+    indent=2.
+    
+    Met seq=True wordt GeoJSONSeq geschreven: één compact feature per lijn
+    zonder kop, zodat een client elk feature kan tekenen zodra de lijn
+    binnen is.
+    
+    Er wordt naar '<naam>.tmp' naast het doel geschreven; pas close() zet
+    het bestand op zijn plaats. Loopt er in de with-blok een fout op, dan
+    blijft het vorige bestand staan (geen afgekapte maar geldige JSON die
+    --livereload naar de browser zou sturen).
+    
+    Gebruik:
+        with GeoJSONWriter(path, {'type': 'FeatureCollection', 'name': ...}) as writer:
+            for feature in features:
+                writer.write(feature)
+    """
+    
+    def __init__(self, filepath: str | Path, members: dict | None = None, seq: bool = False):
+        """
+        Args:
+            filepath: Output pad
+            members: Members van de FeatureCollection; staat 'features' erin,
+                dan bepaalt die key de positie van de features
+            seq: GeoJSONSeq (newline-delimited) in plaats van een FeatureCollection
+        """
+        members = dict(members) if members is not None else {'type': 'FeatureCollection'}
+        keys = list(members)
+        split = keys.index('features') if 'features' in members else len(keys)
+        self.head = [(key, members[key]) for key in keys[:split]]
+        self.tail = [(key, members[key]) for key in keys[split + 1:]]
+        self.seq = seq
+        self.count = 0
+        self.path = Path(filepath)
+        self.temp_path = self.path.with_name(self.path.name + '.tmp')
+        self.file = open(self.temp_path, 'w', encoding='utf-8')
+        
+        if not seq:
+            self.file.write('{\n')
+            for key, value in self.head:
+                self.file.write(f'  {self._encode(key)}: {self._encode(value, 2)},\n')
+            self.file.write('  "features": [')
+    
+    @staticmethod
+    def _encode(value, level: int = 0) -> str:
+        text = json.dumps(value, indent=2, ensure_ascii=False, default=_geometry_default)
+        return text.replace('\n', '\n' + ' ' * level) if level else text
+    
+    def write(self, feature: dict) -> None:
+        """
+        Schrijf één feature (geometrie als dict of GeometryRef).
+        """
+        if self.seq:
+            self.file.write(json.dumps(feature, separators=(',', ':'), ensure_ascii=False,
+                                       default=_geometry_default))
+            self.file.write('\n')
+        else:
+            self.file.write(',\n    ' if self.count else '\n    ')
+            self.file.write(self._encode(feature, 4))
+        self.count += 1
+    
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        if not self.seq:
+            self.file.write('\n  ]' if self.count else ']')
+            for key, value in self.tail:
+                self.file.write(f',\n  {self._encode(key)}: {self._encode(value, 2)}')
+            self.file.write('\n}')
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+    
+    def abort(self) -> None:
+        """
+        Gooi het half geschreven bestand weg; het vorige bestand blijft staan.
+        """
+        if not self.file.closed:
+            self.file.close()
+        self.temp_path.unlink(missing_ok=True)
+    
+    def __enter__(self) -> 'GeoJSONWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
 
 
-def save_geojson(data: dict, filepath: str | Path) -> None:
+def save_geojson(data: dict, filepath: str | Path, seq: bool = False) -> None:
     """
     Sla GeoJSON data op.
     
     Args:
-        data: GeoJSON data
+        data: GeoJSON data (geometrieën als dict of GeometryRef)
         filepath: Output pad
+        seq: Als GeoJSONSeq (één feature per lijn)
     """
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with GeoJSONWriter(filepath, data, seq=seq) as writer:
+        for feature in data.get('features', []):
+            writer.write(feature)
 
 
 def load_json(filepath: str | Path) -> dict:
@@ -49,19 +173,37 @@ def load_json(filepath: str | Path) -> dict:
         return json.load(f)
 
 
-def save_json(data: dict, filepath: str | Path) -> None:
+def save_json(data: dict, filepath: str | Path, compact: bool = False) -> None:
     """
     Sla JSON data op.
     
     Args:
         data: JSON data
         filepath: Output pad
+        compact: Zonder indentatie en spaties (voor grote arrays)
     """
     with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False, allow_nan=False)
+        if compact:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False, allow_nan=False)
+        else:
+            json.dump(data, f, indent=2, ensure_ascii=False, allow_nan=False)
 
 
-def load_detail_csv(csv_path: str | Path) -> dict:
+def _nonzero_cells(bedragen: list[str]) -> tuple[list[int], list[int]]:
+    """
+    Kolomnummers en bedragen (in centen) van de cellen die niet leeg en niet 0 zijn.
+    """
+    indices = []
+    values = []
+    for i, bedrag_str in enumerate(bedragen):
+        bedrag = parse_cents(bedrag_str)
+        if bedrag is not None and bedrag != 0:
+            indices.append(i)
+            values.append(bedrag)
+    return indices, values
+
+
+def load_detail_csv(csv_path: str | Path) -> SparseMatrix:
     """
     Parse detail CSV bestand (gemeenten als rijen, rekeningen als kolommen).
     
@@ -69,56 +211,37 @@ def load_detail_csv(csv_path: str | Path) -> dict:
         csv_path: Pad naar CSV bestand
         
     Returns:
-        Dict met genormaliseerde gemeentenamen als keys
+        SparseMatrix met genormaliseerde gemeentenamen als rijen, de
+        rekeningen als kolommen en {'code', 'naam'} als kolom metadata
     """
-    municipality_data = {}
-    processed_municipalities = set()
-    
     with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.reader(f, delimiter=';')
         header = next(reader)
         rekening_codes = header[1:]  # Skip first column (municipality name)
+        column_meta = [
+            {'code': rekening.split()[0] if ' ' in rekening else rekening, 'naam': rekening}
+            for rekening in rekening_codes
+        ]
         
-        for row in reader:
-            if not row or not row[0]:
-                continue
-            
-            gemeente_naam = row[0]
-            normalized_name = normalize_municipality_name(gemeente_naam)
-            
-            # Skip duplicate municipality entries (prefer first occurrence)
-            if normalized_name in processed_municipalities:
-                continue
-            
-            processed_municipalities.add(normalized_name)
-            municipality_data[normalized_name] = {
-                'rekeningen': [],
-                'totaal': 0.0
-            }
-            
-            bedragen = row[1:]
-            
-            for i, bedrag_str in enumerate(bedragen):
-                if i >= len(rekening_codes):
-                    break
+        def rows():
+            processed_municipalities = set()
+            for row in reader:
+                if not row or not row[0]:
+                    continue
                 
-                rekening_code = rekening_codes[i]
-                bedrag = parse_value(bedrag_str)
+                normalized_name = normalize_municipality_name(row[0])
                 
-                if bedrag is not None and bedrag != 0:
-                    code = rekening_code.split()[0] if ' ' in rekening_code else rekening_code
-                    
-                    municipality_data[normalized_name]['rekeningen'].append({
-                        'code': code,
-                        'naam': rekening_code,
-                        'bedrag': bedrag
-                    })
-                    municipality_data[normalized_name]['totaal'] += bedrag
-    
-    return municipality_data
+                # Skip duplicate municipality entries (prefer first occurrence)
+                if normalized_name in processed_municipalities:
+                    continue
+                processed_municipalities.add(normalized_name)
+                
+                yield (normalized_name, *_nonzero_cells(row[1:len(rekening_codes) + 1]))
+        
+        return SparseMatrix.from_rows(rekening_codes, rows(), column_meta)
 
 
-def load_beleidsdomein_csv(csv_path: str | Path) -> dict:
+def load_beleidsdomein_csv(csv_path: str | Path) -> SparseMatrix:
     """
     Parse beleidsdomein CSV bestand.
     
@@ -126,58 +249,91 @@ def load_beleidsdomein_csv(csv_path: str | Path) -> dict:
         csv_path: Pad naar CSV bestand
         
     Returns:
-        Dict met genormaliseerde gemeentenamen als keys
+        SparseMatrix met genormaliseerde gemeentenamen als rijen, de
+        beleidsvelden als kolommen en {'code', 'naam', 'volledig'} als
+        kolom metadata
     """
-    municipality_data = {}
-    processed_municipalities = set()
-    
     with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.reader(f, delimiter=';')
         header = next(reader)
         beleidsveld_columns = header[2:]  # Skip Grondgebied and Bestuur
+        column_meta = []
+        for beleidsveld in beleidsveld_columns:
+            parts = beleidsveld.split(' ', 1)
+            column_meta.append({
+                'code': parts[0] if parts else beleidsveld,
+                'naam': parts[1] if len(parts) > 1 else beleidsveld,
+                'volledig': beleidsveld
+            })
         
-        for row in reader:
-            if not row or len(row) < 2:
-                continue
-            
-            gemeente_naam = row[0].strip()
-            bestuur = row[1].strip()
-            
-            if not gemeente_naam or not bestuur:
-                continue
-            
-            normalized_name = normalize_municipality_name(gemeente_naam)
-            
-            # Skip duplicate municipality entries (prefer first occurrence, often "Total")
-            if normalized_name in processed_municipalities:
-                continue
-            
-            processed_municipalities.add(normalized_name)
-            municipality_data[normalized_name] = {
-                'beleidsvelden': [],
-                'totaal': 0.0
-            }
-            
-            bedragen = row[2:]
-            
-            for i, bedrag_str in enumerate(bedragen):
-                if i >= len(beleidsveld_columns):
-                    break
+        def rows():
+            processed_municipalities = set()
+            for row in reader:
+                if not row or len(row) < 2:
+                    continue
+                
+                gemeente_naam = row[0].strip()
+                bestuur = row[1].strip()
                 
-                beleidsveld = beleidsveld_columns[i]
-                bedrag = parse_value(bedrag_str)
+                if not gemeente_naam or not bestuur:
+                    continue
                 
-                if bedrag is not None and bedrag != 0:
-                    parts = beleidsveld.split(' ', 1)
-                    code = parts[0] if parts else beleidsveld
-                    naam = parts[1] if len(parts) > 1 else beleidsveld
-                    
-                    municipality_data[normalized_name]['beleidsvelden'].append({
-                        'code': code,
-                        'naam': naam,
-                        'volledig': beleidsveld,
-                        'bedrag': bedrag
-                    })
-                    municipality_data[normalized_name]['totaal'] += bedrag
-    
-    return municipality_data
+                normalized_name = normalize_municipality_name(gemeente_naam)
+                
+                # Skip duplicate municipality entries (prefer first occurrence, often "Total")
+                if normalized_name in processed_municipalities:
+                    continue
+                processed_municipalities.add(normalized_name)
+                
+                yield (normalized_name, *_nonzero_cells(row[2:len(beleidsveld_columns) + 2]))
+        
+        return SparseMatrix.from_rows(beleidsveld_columns, rows(), column_meta)
+
+
+def discover_yearly_files(directory: str | Path, pattern: str) -> dict[int, Path]:
+    """
+    Zoek input bestanden met een boekjaar in de bestandsnaam.
+    
+    Args:
+        directory: Map om in te zoeken
+        pattern: Glob patroon, bv. 'detail-alle-*.csv'
+        
+    Returns:
+        Dict {jaar: pad}, gesorteerd op jaar
+        
+    Raises:
+        FileNotFoundError: Als geen enkel bestand met een boekjaar overeenkomt
+    """
+    files = {}
+    
+    for path in Path(directory).glob(pattern):
+        match = re.search(r'(?<!\d)(\d{4})(?!\d)', path.stem)
+        if match:
+            files[int(match.group(1))] = path
+    
+    # Zonder bestanden zou de verrijkte GeoJSON overschreven worden zonder data
+    if not files:
+        raise FileNotFoundError(f"Geen bestanden voor '{pattern}' in {directory}")
+    
+    return dict(sorted(files.items()))
+
+
+def load_yearly(loader: Callable[[Path], dict], paths_by_year: dict[int, Path],
+                max_workers: int | None = None) -> dict[int, dict]:
+    """
+    Laad één bestand per jaar, parallel over processen.
+    
+    Args:
+        loader: Loader functie op module niveau (bv. load_detail_csv)
+        paths_by_year: Dict {jaar: pad}
+        max_workers: Maximum aantal processen (standaard: aantal CPU's)
+        
+    Returns:
+        Dict {jaar: resultaat van loader}
+    """
+    if len(paths_by_year) <= 1:
+        return {year: loader(path) for year, path in paths_by_year.items()}
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {year: pool.submit(loader, path) for year, path in paths_by_year.items()}
+        return {year: future.result() for year, future in sorted(futures.items())}
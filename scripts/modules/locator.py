@@ -0,0 +1,81 @@
+"""
+Reverse lookup van een coördinaat naar de gemeente waarin ze ligt.
+
+De index wordt één keer opgebouwd: de bounding boxes in een uniform grid
+en de grenszijden van elke gemeente als NumPy arrays. Een lookup filtert
+eerst op de cel en de bounding box en doet pas daarna een exacte
+ray casting test op de kandidaten (meestal één of twee).
+"""
+
+import numpy as np
+
+from .adjacency import GridIndex, feature_boxes
+from .geometry import rings
+
+
+def ring_segments(geometry: dict) -> np.ndarray:
+    """
+    Alle zijden van alle ringen van een geometrie.
+
+    Args:
+        geometry: GeoJSON (Multi)Polygon
+
+    Returns:
+        (n, 4) array met x1, y1, x2, y2 per zijde
+    """
+    segments = [np.hstack([ring[:-1], ring[1:]]) for ring in rings(geometry)]
+    return np.concatenate(segments) if segments else np.empty((0, 4))
+
+
+def contains(segments: np.ndarray, x: float, y: float) -> bool:
+    """
+    Ray casting (even-odd) test voor een punt.
+
+    Omdat de binnenringen mee tellen, vallen punten in een gat buiten
+    de geometrie.
+
+    Args:
+        segments: Zijden zoals teruggegeven door ring_segments
+        x: Lengtegraad
+        y: Breedtegraad
+
+    Returns:
+        True als het punt binnen de geometrie ligt
+    """
+    x1, y1, x2, y2 = segments.T
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_at_y = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(crosses & (x < x_at_y)) % 2)
+
+
+class PointLocator:
+    """
+    Point-in-polygon index over de features van een GeoJSON.
+    """
+
+    def __init__(self, geojson: dict):
+        """
+        Args:
+            geojson: GeoJSON met (Multi)Polygon geometrieën
+        """
+        self.features = geojson['features']
+        self.grid = GridIndex(feature_boxes(geojson))
+        self.segments = [ring_segments(feature.get('geometry')) for feature in self.features]
+
+    def locate(self, lon: float, lat: float) -> dict | None:
+        """
+        Zoek het feature dat een punt bevat.
+
+        Args:
+            lon: Lengtegraad (CRS84)
+            lat: Breedtegraad (CRS84)
+
+        Returns:
+            Het feature, of None als het punt in geen enkele gemeente ligt
+        """
+        point = np.array([lon, lat, lon, lat])
+        for idx in sorted(self.grid.query(point)):
+            if contains(self.segments[idx], lon, lat):
+                return self.features[idx]
+        return None
@@ -0,0 +1,235 @@
+"""
+Koppeling van gemeentenamen tussen datasets met fuzzy fallback.
+
+Matching verloopt in drie stappen:
+1. Exact: lowercase naam zonder 'Gemeente en OCMW' prefix
+2. Token-genormaliseerd: zonder accenten, leestekens en met 'St.' -> 'Sint'
+3. Fuzzy: trigram blocking index + edit distance op de kandidaten
+
+Beslissingen van stap 2 en 3 worden bewaard in een alias bestand zodat
+volgende builds ze niet opnieuw moeten berekenen (en ze manueel
+gecorrigeerd kunnen worden).
+"""
+
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+from .utils import normalize_municipality_name
+
+
+# Prefixen die in sommige bronnen voor de gemeentenaam staan
+NAME_PREFIXES = ('gemeente en ocmw ', 'gemeente ', 'stad ', 'ocmw ')
+
+# Afkortingen die als volledig woord vervangen worden
+TOKEN_REPLACEMENTS = {
+    'st': 'sint',
+    'ste': 'sinte',
+    'olv': 'onze lieve vrouw',
+}
+
+
+def token_normalize(name: str) -> str:
+    """
+    Normaliseer een gemeentenaam tot een vergelijkbare token string.
+
+    Verwijdert accenten, prefixen, haakjes en leestekens en vervangt
+    afkortingen zoals 'St.' door 'sint'.
+
+    Args:
+        name: De originele gemeentenaam
+
+    Returns:
+        Tokens gescheiden door een spatie (bv. 'sint niklaas')
+    """
+    name = normalize_municipality_name(name)
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+
+    for prefix in NAME_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+
+    name = re.sub(r'\(.*?\)', ' ', name)
+    tokens = [t for t in re.split(r'[^a-z0-9]+', name) if t]
+    return ' '.join(TOKEN_REPLACEMENTS.get(t, t) for t in tokens)
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Bereken de trigrammen van een string (met padding aan begin en einde).
+
+    Args:
+        text: Token-genormaliseerde naam
+
+    Returns:
+        Set van trigrammen
+    """
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Bereken de Levenshtein afstand tussen twee strings.
+
+    Args:
+        a: Eerste string
+        b: Tweede string
+
+    Returns:
+        Minimaal aantal insert/delete/substitute operaties
+    """
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        previous = current
+
+    return previous[-1]
+
+
+class MunicipalityMatcher:
+    """
+    Koppelt gemeentenamen uit een bron aan een vaste set kandidaten.
+
+    De kandidaten (typisch de gemeenten uit de GeoJSON) worden één keer
+    geïndexeerd per trigram. Een fuzzy lookup vergelijkt daardoor enkel
+    met kandidaten die trigrammen delen, in plaats van met alle gemeenten.
+    """
+
+    def __init__(self, candidates: Iterable[str], alias_path: str | Path | None = None,
+                 min_similarity: float = 0.85, shortlist_size: int = 5):
+        """
+        Args:
+            candidates: Gemeentenamen waartegen gematcht wordt
+            alias_path: Optioneel pad naar JSON bestand met gekende aliassen
+            min_similarity: Minimale edit distance ratio voor een fuzzy match
+            shortlist_size: Aantal kandidaten uit de blocking index dat met
+                edit distance vergeleken wordt
+        """
+        self.min_similarity = min_similarity
+        self.shortlist_size = shortlist_size
+        self.alias_path = Path(alias_path) if alias_path else None
+
+        self._candidates = []
+        self._exact = set()
+        self._by_token = {}
+        self._tokens = []
+        self._gram_counts = []
+        self._index = defaultdict(list)
+
+        for name in candidates:
+            normalized = normalize_municipality_name(name)
+            if normalized in self._exact:
+                continue
+
+            idx = len(self._candidates)
+            token = token_normalize(name)
+            grams = trigrams(token)
+
+            self._candidates.append(normalized)
+            self._exact.add(normalized)
+            self._tokens.append(token)
+            self._gram_counts.append(len(grams))
+            # Dubbelzinnige token vormen worden niet automatisch gekoppeld
+            self._by_token[token] = None if token in self._by_token else normalized
+            for gram in grams:
+                self._index[gram].append(idx)
+
+        self.aliases = self._load_aliases()
+        self.unmatched = []
+        self._dirty = False
+
+    def _load_aliases(self) -> dict:
+        if self.alias_path is None or not self.alias_path.exists():
+            return {}
+
+        with open(self.alias_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self) -> None:
+        """
+        Schrijf nieuwe match beslissingen naar het alias bestand.
+        """
+        if self.alias_path is None or not self._dirty:
+            return
+
+        with open(self.alias_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(self.aliases.items())), f, indent=2, ensure_ascii=False)
+        self._dirty = False
+
+    def match(self, name: str) -> str | None:
+        """
+        Zoek de kandidaat die overeenkomt met een gemeentenaam.
+
+        Args:
+            name: Gemeentenaam uit de bron dataset
+
+        Returns:
+            Genormaliseerde kandidaatnaam, of None als er geen match is
+        """
+        normalized = normalize_municipality_name(name)
+        if normalized in self._exact:
+            return normalized
+
+        # Een alias met waarde null sluit een naam bewust uit
+        if normalized in self.aliases:
+            target = self.aliases[normalized]
+            return target if target in self._exact else None
+
+        target = self._by_token.get(token_normalize(name))
+        if target is None:
+            target = self._fuzzy_match(token_normalize(name))
+
+        if target is None:
+            self.unmatched.append(name)
+            return None
+
+        self.aliases[normalized] = target
+        self._dirty = True
+        return target
+
+    def _fuzzy_match(self, token: str) -> str | None:
+        if not token:
+            return None
+
+        grams = trigrams(token)
+        shared = defaultdict(int)
+        for gram in grams:
+            for idx in self._index.get(gram, ()):
+                shared[idx] += 1
+
+        # Dice coefficient op trigrammen als goedkope voorselectie
+        shortlist = sorted(
+            shared,
+            key=lambda i: 2 * shared[i] / (len(grams) + self._gram_counts[i]),
+            reverse=True
+        )[:self.shortlist_size]
+
+        best, best_ratio, runner_up = None, 0.0, 0.0
+        for idx in shortlist:
+            candidate = self._tokens[idx]
+            ratio = 1 - edit_distance(token, candidate) / max(len(token), len(candidate))
+            if ratio > best_ratio:
+                best, best_ratio, runner_up = idx, ratio, best_ratio
+            elif ratio > runner_up:
+                runner_up = ratio
+
+        # Geen match bij te lage gelijkenis of bij een ex aequo
+        if best is None or best_ratio < self.min_similarity or runner_up == best_ratio:
+            return None
+
+        return self._candidates[best]
@@ -0,0 +1,172 @@
+"""
+Build pipeline als stappen met afhankelijkheden en een resultaat-cache.
+
+Elke stap declareert van welke andere stappen en van welke input
+bestanden (glob patronen) ze afhangt. Na een run worden de resultaten en
+de stempels (mtime en grootte) van de input bestanden bijgehouden. Een
+volgende run voert enkel de stappen uit waarvan een input bestand
+gewijzigd is, plus alles wat daarvan afhangt; de rest komt uit de cache.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+
+class Step(NamedTuple):
+    """
+    Eén stap van de pipeline.
+
+    De functie krijgt de resultaten van deps als keyword argumenten, in de
+    volgorde en met de namen van deps.
+    """
+    name: str
+    run: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+    sources: tuple[str, ...] = ()
+
+
+def _stamp(paths: list[Path]) -> tuple:
+    stamps = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            stamps.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamps.append((str(path), None, None))
+    return tuple(stamps)
+
+
+class Pipeline:
+    """
+    Stappen in uitvoeringsvolgorde, met de resultaten van de laatste run.
+
+    Gebruik:
+        pipeline = Pipeline(base_dir)
+
+        @pipeline.step(sources=('data/cpi.json',))
+        def cpi():
+            return load_cpi(...)
+
+        @pipeline.step(deps=('cpi',))
+        def factors(cpi):
+            ...
+
+        pipeline.run()          # alles
+        pipeline.run()          # enkel wat gewijzigd is
+    """
+
+    def __init__(self, base_dir: str | Path):
+        self.base_dir = Path(base_dir)
+        self.steps: dict[str, Step] = {}
+        self.results: dict[str, Any] = {}
+        self.stamps: dict[str, tuple] = {}
+        self.durations: dict[str, float] = {}
+
+    def add(self, step: Step) -> Step:
+        """
+        Voeg een stap toe; de afhankelijkheden moeten al bestaan.
+
+        Raises:
+            ValueError: Bij een onbekende afhankelijkheid of een dubbele naam
+        """
+        if step.name in self.steps:
+            raise ValueError(f"Stap bestaat al: {step.name}")
+        missing = [dep for dep in step.deps if dep not in self.steps]
+        if missing:
+            raise ValueError(f"Stap {step.name} hangt af van onbekende stappen: {', '.join(missing)}")
+        self.steps[step.name] = step
+        return step
+
+    def step(self, deps: tuple[str, ...] = (), sources: tuple[str, ...] = ()):
+        """
+        Decorator die een functie als stap toevoegt (naam = functienaam).
+        """
+        def register(function: Callable[..., Any]) -> Callable[..., Any]:
+            self.add(Step(function.__name__, function, tuple(deps), tuple(sources)))
+            return function
+        return register
+
+    def source_files(self, name: str) -> list[Path]:
+        """
+        Input bestanden van een stap (de glob patronen opnieuw uitgewerkt).
+
+        Een patroon zonder wildcard telt ook als het bestand (nog) niet bestaat,
+        zodat het aanmaken ervan opgemerkt wordt.
+        """
+        paths = []
+        for pattern in self.steps[name].sources:
+            if any(char in pattern for char in '*?['):
+                paths.extend(sorted(self.base_dir.glob(pattern)))
+            else:
+                paths.append(self.base_dir / pattern)
+        return paths
+
+    def dependents(self, names: set[str]) -> set[str]:
+        """
+        De gegeven stappen en alle stappen die er (onrechtstreeks) van afhangen.
+        """
+        result = set(names)
+        for step in self.steps.values():
+            if any(dep in result for dep in step.deps):
+                result.add(step.name)
+        return result
+
+    def dirty(self) -> set[str]:
+        """
+        Stappen die opnieuw moeten: nog nooit uitgevoerd, of een input bestand
+        gewijzigd sinds de laatste run, plus alles wat daarvan afhangt.
+        """
+        changed = {
+            name for name in self.steps
+            if name not in self.results or self.stamps.get(name) != _stamp(self.source_files(name))
+        }
+        return self.dependents(changed)
+
+    def invalidate(self, names: set[str] | None = None) -> None:
+        """
+        Vergeet de resultaten van stappen (standaard alle), bv. na een codewijziging.
+        """
+        for name in (names if names is not None else list(self.steps)):
+            self.results.pop(name, None)
+            self.stamps.pop(name, None)
+
+    def run(self, targets: set[str] | None = None) -> list[str]:
+        """
+        Voer de stappen uit die opnieuw moeten.
+
+        Args:
+            targets: Enkel deze stappen (en wat ze nodig hebben) bijwerken;
+                None = de volledige pipeline
+
+        Returns:
+            Namen van de uitgevoerde stappen, in volgorde
+        """
+        dirty = self.dirty()
+        if targets is not None:
+            needed = set()
+            for name in reversed(list(self.steps)):
+                if name in targets or name in needed:
+                    needed.add(name)
+                    needed.update(self.steps[name].deps)
+            dirty &= needed
+
+        executed = []
+        try:
+            for name, step in self.steps.items():
+                if name not in dirty:
+                    continue
+                start = time.perf_counter()
+                self.results[name] = step.run(**{dep: self.results[dep] for dep in step.deps})
+                self.durations[name] = time.perf_counter() - start
+                executed.append(name)
+        except BaseException:
+            # Wat niet meer aan de beurt kwam moet de volgende keer zeker opnieuw
+            self.invalidate(dirty - set(executed))
+            raise
+        finally:
+            # Stempels pas achteraf: bestanden die de build zelf schrijft
+            # (bv. de alias cache van de matcher) maken de stap dan niet vuil
+            for name in executed:
+                self.stamps[name] = _stamp(self.source_files(name))
+        return executed
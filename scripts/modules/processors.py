@@ -2,93 +2,215 @@
 Processors om GeoJSON te verrijken met verschillende datasets.
 """
 
-from .utils import normalize_municipality_name
+from typing import Callable
 
+from .matcher import MunicipalityMatcher
+from .sparse import SparseMatrix
+from .utils import normalize_municipality_name, to_cents, cents_to_euro
 
-def enrich_with_detail_data(geojson: dict, detail_data: dict) -> tuple[dict, int]:
+
+DEFAULT_TOP_N = 10
+
+# Velden die per jaar in de 'detail' en 'beleidsdomein' properties staan
+DETAIL_FIELDS = ('totaal_details', 'aantal_rekeningen', 'verschil_met_totaal', 'top_rekeningen')
+BELEIDSDOMEIN_FIELDS = ('totaal_beleidsdomein', 'aantal_beleidsvelden', 'verschil_met_totaal', 'top_beleidsvelden')
+
+
+def link_to_features(data: dict, matcher: MunicipalityMatcher | None) -> dict:
     """
-    Voeg detail (rekeningen) data toe aan GeoJSON.
+    Herkoppel de keys van een dataset aan de gemeentenamen van de GeoJSON.
+    
+    Exacte matches krijgen voorrang op token- of fuzzy matches, zodat een
+    fuzzy match nooit een correct gespelde gemeente overschrijft.
     
     Args:
-        geojson: GeoJSON data
-        detail_data: Dict met detail data per gemeente
+        data: Dict met genormaliseerde gemeentenamen als keys
+        matcher: Matcher over de GeoJSON gemeenten, of None voor enkel exacte matching
         
     Returns:
-        Tuple van (verrijkte geojson, aantal matches)
+        Dict met de genormaliseerde GeoJSON gemeentenamen als keys
     """
-    matched = 0
+    if matcher is None:
+        return data
     
-    for feature in geojson['features']:
-        municipality = feature['properties']['municipality']
-        normalized_name = normalize_municipality_name(municipality)
-        totaal_2024 = feature['properties'].get('2024', 0)
+    linked = {}
+    fuzzy = []
+    
+    for name, entry in data.items():
+        target = matcher.match(name)
+        if target == name:
+            linked[target] = entry
+        elif target is not None:
+            fuzzy.append((target, entry))
+    
+    for target, entry in fuzzy:
+        linked.setdefault(target, entry)
+    
+    return linked
+
+
+def _year_columns(entries: list[dict | None], fields: tuple[str, ...]) -> dict | None:
+    """
+    Zet een lijst van per-jaar entries om naar jaar-geïndexeerde arrays.
+    
+    Args:
+        entries: Eén entry per jaar (None als er dat jaar geen data is)
+        fields: Velden die als array bewaard worden
         
-        if normalized_name in detail_data:
-            gemeente_detail = detail_data[normalized_name]
-            totaal_details = sum(r['bedrag'] for r in gemeente_detail.get('rekeningen', []))
-            
-            feature['properties']['detail_2024'] = {
-                'totaal_details': round(totaal_details, 2),
-                'aantal_rekeningen': len(gemeente_detail.get('rekeningen', [])),
-                'verschil_met_totaal': round(totaal_details - totaal_2024, 2),
-                'top_rekeningen': [
-                    {
-                        'code': r['code'],
-                        'naam': r['naam'],
-                        'bedrag': r['bedrag']
-                    }
-                    for r in sorted(gemeente_detail.get('rekeningen', []), 
-                                   key=lambda x: abs(x['bedrag']), 
-                                   reverse=True)[:10]
-                ]
-            }
-            matched += 1
-        else:
-            feature['properties']['detail_2024'] = None
+    Returns:
+        Dict {veld: [waarde per jaar]}, of None als geen enkel jaar data heeft
+    """
+    if all(entry is None for entry in entries):
+        return None
     
-    return geojson, matched
+    return {
+        field: [entry[field] if entry is not None else None for entry in entries]
+        for field in fields
+    }
+
+
+def _top_items(matrix: SparseMatrix, row: int, n: int) -> list[dict]:
+    """
+    De n grootste bedragen (absoluut) van een rij als dicts met de kolom metadata.
+    """
+    meta = matrix.column_meta or [{'naam': label} for label in matrix.columns]
+    return [{**meta[column], 'bedrag': cents_to_euro(bedrag)} for column, bedrag in matrix.top_n(row, n)]
 
 
-def enrich_with_beleidsdomein_data(geojson: dict, beleidsdomein_data: dict) -> tuple[dict, int]:
+def _year_enricher(data_by_year: dict[int, SparseMatrix], property_name: str,
+                   fields: tuple[str, ...], top_n: int,
+                   matcher: MunicipalityMatcher | None) -> tuple[Callable[[dict], dict], dict[int, int]]:
     """
-    Voeg beleidsdomein data toe aan GeoJSON.
+    Maak een functie die één feature verrijkt voor alle jaren.
+    
+    De namen worden hier één keer gekoppeld en de totalen en aantallen per
+    gemeente in één keer over de hele matrix berekend; daarna kan elk
+    feature apart verrijkt worden, bv. net voor het wegschrijven.
     
     Args:
-        geojson: GeoJSON data
-        beleidsdomein_data: Dict met beleidsdomein data per gemeente
+        data_by_year: Dict {jaar: gemeenten × rekeningen (of beleidsvelden) matrix}
+        property_name: Naam van de property die toegevoegd wordt
+        fields: Namen voor (totaal, aantal, verschil met totaal, top items)
+        top_n: Aantal items om per gemeente per jaar te behouden
+        matcher: Optionele matcher voor namen die niet exact overeenkomen
         
     Returns:
-        Tuple van (verrijkte geojson, aantal matches)
+        Tuple van (functie feature -> feature, aantal matches per jaar); de
+        tellingen lopen op naarmate features verrijkt worden
     """
-    matched = 0
+    total_field, count_field, difference_field, top_field = fields
+    years = sorted(data_by_year)
+    matrices = [data_by_year[year] for year in years]
+    linked_by_year = [link_to_features(matrix.row_index, matcher) for matrix in matrices]
+    totals_by_year = [matrix.row_totals().tolist() for matrix in matrices]
+    counts_by_year = [matrix.row_counts().tolist() for matrix in matrices]
+    matched = {year: 0 for year in years}
     
-    for feature in geojson['features']:
-        municipality = feature['properties']['municipality']
-        normalized_name = normalize_municipality_name(municipality)
-        totaal_2024 = feature['properties'].get('2024', 0)
+    def enrich(feature: dict) -> dict:
+        properties = feature['properties']
+        normalized_name = normalize_municipality_name(properties['municipality'])
+        entries = []
         
-        if normalized_name in beleidsdomein_data:
-            gemeente_beleidsdomein = beleidsdomein_data[normalized_name]
-            totaal_beleidsdomein = gemeente_beleidsdomein.get('totaal', 0)
+        for year, matrix, linked, totals, counts in zip(years, matrices, linked_by_year,
+                                                        totals_by_year, counts_by_year):
+            row = linked.get(normalized_name)
+            if row is None:
+                entries.append(None)
+                continue
             
-            feature['properties']['beleidsdomein_2024'] = {
-                'totaal_beleidsdomein': round(totaal_beleidsdomein, 2),
-                'aantal_beleidsvelden': len(gemeente_beleidsdomein.get('beleidsvelden', [])),
-                'verschil_met_totaal': round(totaal_beleidsdomein - totaal_2024, 2),
-                'top_beleidsvelden': [
-                    {
-                        'code': b['code'],
-                        'naam': b['naam'],
-                        'volledig': b['volledig'],
-                        'bedrag': b['bedrag']
-                    }
-                    for b in sorted(gemeente_beleidsdomein.get('beleidsvelden', []),
-                                   key=lambda x: abs(x['bedrag']),
-                                   reverse=True)[:10]
-                ]
-            }
-            matched += 1
-        else:
-            feature['properties']['beleidsdomein_2024'] = None
+            # Totaal uit de GeoJSON (euro) ook naar centen, zodat het verschil exact is
+            totaal_jaar = int(to_cents(properties.get(str(year)) or 0))
+            entries.append({
+                total_field: cents_to_euro(totals[row]),
+                count_field: counts[row],
+                difference_field: cents_to_euro(totals[row] - totaal_jaar),
+                top_field: _top_items(matrix, row, top_n)
+            })
+            matched[year] += 1
+        
+        columns = _year_columns(entries, fields)
+        properties[property_name] = {'jaren': years, **columns} if columns else None
+        return feature
+    
+    return enrich, matched
+
+
+def detail_enricher(detail_by_year: dict[int, SparseMatrix], matcher: MunicipalityMatcher | None = None,
+                    top_n: int = DEFAULT_TOP_N) -> tuple[Callable[[dict], dict], dict[int, int]]:
+    """
+    Per-feature variant van enrich_with_detail_data.
+    
+    Args:
+        detail_by_year: Dict {jaar: gemeenten × rekeningen matrix}
+        matcher: Optionele matcher voor namen die niet exact overeenkomen
+        top_n: Aantal rekeningen om per gemeente per jaar te behouden
+        
+    Returns:
+        Tuple van (functie feature -> feature, aantal matches per jaar)
+    """
+    return _year_enricher(detail_by_year, 'detail', DETAIL_FIELDS, top_n, matcher)
+
+
+def beleidsdomein_enricher(beleidsdomein_by_year: dict[int, SparseMatrix],
+                           matcher: MunicipalityMatcher | None = None,
+                           top_n: int = DEFAULT_TOP_N) -> tuple[Callable[[dict], dict], dict[int, int]]:
+    """
+    Per-feature variant van enrich_with_beleidsdomein_data.
     
+    Args:
+        beleidsdomein_by_year: Dict {jaar: gemeenten × beleidsvelden matrix}
+        matcher: Optionele matcher voor namen die niet exact overeenkomen
+        top_n: Aantal beleidsvelden om per gemeente per jaar te behouden
+        
+    Returns:
+        Tuple van (functie feature -> feature, aantal matches per jaar)
+    """
+    return _year_enricher(beleidsdomein_by_year, 'beleidsdomein', BELEIDSDOMEIN_FIELDS, top_n, matcher)
+
+
+def enrich_with_detail_data(geojson: dict, detail_by_year: dict[int, SparseMatrix],
+                            matcher: MunicipalityMatcher | None = None,
+                            top_n: int = DEFAULT_TOP_N) -> tuple[dict, dict[int, int]]:
+    """
+    Voeg detail (rekeningen) data voor alle jaren toe aan GeoJSON.
+    
+    Het resultaat staat in de 'detail' property als jaar-geïndexeerde arrays:
+    {'jaren': [2023, 2024], 'totaal_details': [..., ...], ...}.
+    
+    Args:
+        geojson: GeoJSON data
+        detail_by_year: Dict {jaar: gemeenten × rekeningen matrix}
+        matcher: Optionele matcher voor namen die niet exact overeenkomen
+        top_n: Aantal rekeningen om per gemeente per jaar te behouden
+        
+    Returns:
+        Tuple van (verrijkte geojson, aantal matches per jaar)
+    """
+    enrich, matched = detail_enricher(detail_by_year, matcher, top_n)
+    for feature in geojson['features']:
+        enrich(feature)
+    return geojson, matched
+
+
+def enrich_with_beleidsdomein_data(geojson: dict, beleidsdomein_by_year: dict[int, SparseMatrix],
+                                   matcher: MunicipalityMatcher | None = None,
+                                   top_n: int = DEFAULT_TOP_N) -> tuple[dict, dict[int, int]]:
+    """
+    Voeg beleidsdomein data voor alle jaren toe aan GeoJSON.
+    
+    Het resultaat staat in de 'beleidsdomein' property als jaar-geïndexeerde
+    arrays: {'jaren': [2023, 2024], 'totaal_beleidsdomein': [..., ...], ...}.
+    
+    Args:
+        geojson: GeoJSON data
+        beleidsdomein_by_year: Dict {jaar: gemeenten × beleidsvelden matrix}
+        matcher: Optionele matcher voor namen die niet exact overeenkomen
+        top_n: Aantal beleidsvelden om per gemeente per jaar te behouden
+        
+    Returns:
+        Tuple van (verrijkte geojson, aantal matches per jaar)
+    """
+    enrich, matched = beleidsdomein_enricher(beleidsdomein_by_year, matcher, top_n)
+    for feature in geojson['features']:
+        enrich(feature)
     return geojson, matched
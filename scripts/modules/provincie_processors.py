@@ -4,19 +4,28 @@ Processors voor provinciale investeringsdata.
 
 import pandas as pd
 from pathlib import Path
+from .utils import parse_cents, to_cents, cents_to_euro
 
 
 def load_provincie_data(filepath: str | Path) -> pd.DataFrame:
     """
     Laad cleaned provinciale data.
     
+    De bedragen per provincie worden rechtstreeks als int64 centen gelezen,
+    zodat alle sommen hieronder exact zijn.
+    
     Args:
         filepath: Pad naar cleaned CSV bestand
         
     Returns:
-        DataFrame met provinciale data
+        DataFrame met provinciale data (kolommen 'Provincie ...' in centen)
     """
-    return pd.read_csv(filepath)
+    columns = pd.read_csv(filepath, nrows=0).columns
+    amounts = [column for column in columns if column.startswith('Provincie ')]
+    df = pd.read_csv(filepath, converters={column: parse_cents for column in amounts})
+    for column in amounts:
+        df[column] = df[column].fillna(0).astype('int64')
+    return df
 
 
 def aggregate_provincie_totals(df: pd.DataFrame) -> dict:
@@ -53,10 +62,10 @@ def aggregate_provincie_totals(df: pd.DataFrame) -> dict:
                 (df['bv_domein'] == 'Total')
             ].copy()
             
-            # Bereken som over alle jaren
+            # Bereken som over alle jaren (exact, in centen)
             totaal = mjp_data[provincie].sum()
             
-            results[provincie_naam][mjp] = round(totaal, 2)
+            results[provincie_naam][mjp] = cents_to_euro(totaal)
     
     return results
 
@@ -100,7 +109,7 @@ def create_detailed_provincie_data(df: pd.DataFrame) -> dict:
                 totaal = domein_data[provincie].sum()
                 
                 if totaal > 0:  # Alleen opnemen als er investeringen zijn
-                    beleidsdomein_totals[str(domein)] = round(totaal, 2)
+                    beleidsdomein_totals[str(domein)] = cents_to_euro(totaal)
             
             # Sorteer op bedrag (hoogste eerst)
             beleidsdomein_totals = dict(
@@ -117,7 +126,7 @@ def create_detailed_provincie_data(df: pd.DataFrame) -> dict:
             totaal = total_data[provincie].sum()
             
             detailed_results[provincie_naam][mjp] = {
-                'totaal': round(totaal, 2),
+                'totaal': cents_to_euro(totaal),
                 'per_beleidsdomein': beleidsdomein_totals
             }
     
@@ -143,9 +152,11 @@ def calculate_provincie_statistics(totals: dict) -> dict:
         non_zero_values = [v for v in values if v > 0]
         
         if non_zero_values:
+            # De totalen zijn bedragen in euro met twee decimalen: exact optellen in centen
+            totaal = cents_to_euro(int(to_cents(values).sum()))
             stats[mjp] = {
-                'totaal_alle_provincies': round(sum(values), 2),
-                'gemiddelde': round(sum(values) / len(totals), 2),
+                'totaal_alle_provincies': totaal,
+                'gemiddelde': round(totaal / len(totals), 2),
                 'minimum': round(min(non_zero_values), 2),
                 'maximum': round(max(non_zero_values), 2),
                 'aantal_provincies': len(totals),
@@ -0,0 +1,130 @@
+"""
+Voorberekende rangschikkingen en percentielen per jaar en per metriek.
+
+Alle arrays volgen de volgorde van de features, zodat de frontend een
+rang kan opzoeken met de index van het feature in plaats van te sorteren.
+"""
+
+import numpy as np
+
+from .year_matrix import YearMatrix
+
+
+def dense_rank(values: np.ndarray, groups: np.ndarray | None = None) -> np.ndarray:
+    """
+    Bereken de dense rank per kolom (hoogste waarde = rang 1).
+
+    Gelijke waarden krijgen dezelfde rang, de volgende waarde de rang
+    erna. Met groups wordt er binnen elke groep apart gerangschikt.
+
+    Args:
+        values: Matrix gemeenten × jaren (NaN = geen waarde)
+        groups: Optionele groepscode per gemeente (bv. provincie index)
+
+    Returns:
+        int32 matrix met dezelfde vorm, 0 voor ontbrekende waarden
+    """
+    n, m = values.shape
+    if groups is None:
+        groups = np.zeros(n, dtype=np.int64)
+
+    # Eén rij per jaar, gemeenten op de laatste as (vereist door lexsort)
+    keys = -values.T
+    group_keys = np.broadcast_to(groups, (m, n))
+    order = np.lexsort((keys, group_keys))
+
+    sorted_keys = np.take_along_axis(keys, order, axis=1)
+    sorted_groups = np.take_along_axis(group_keys, order, axis=1)
+
+    new_group = np.ones((m, n), dtype=bool)
+    new_group[:, 1:] = sorted_groups[:, 1:] != sorted_groups[:, :-1]
+    new_value = new_group.copy()
+    new_value[:, 1:] |= sorted_keys[:, 1:] != sorted_keys[:, :-1]
+
+    counter = np.cumsum(new_value, axis=1)
+    offset = np.maximum.accumulate(np.where(new_group, counter - 1, 0), axis=1)
+
+    ranks = np.empty((m, n), dtype=np.int32)
+    np.put_along_axis(ranks, order, counter - offset, axis=1)
+    ranks[np.isnan(values.T)] = 0
+    return ranks.T
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """
+    Bereken per kolom het aandeel gemeenten met een lagere of gelijke waarde.
+
+    Args:
+        values: Matrix gemeenten × jaren (NaN = geen waarde)
+
+    Returns:
+        uint8 matrix met percentiel 0-100, 0 voor ontbrekende waarden
+    """
+    ordered = np.sort(values, axis=0)
+    valid = (~np.isnan(values)).sum(axis=0)
+    result = np.zeros(values.shape, dtype=np.uint8)
+
+    for col in range(values.shape[1]):
+        if valid[col] == 0:
+            continue
+        at_most = np.searchsorted(ordered[:valid[col], col], values[:, col], side='right')
+        result[:, col] = np.round(100 * at_most / valid[col])
+
+    result[np.isnan(values)] = 0
+    return result
+
+
+def compute_rankings(provinces: list[str], years: list[int], values: np.ndarray) -> dict:
+    """
+    Bereken rang in Vlaanderen, rang in de provincie en percentiel.
+
+    Args:
+        provinces: Provincie per gemeente (in feature volgorde)
+        years: Jaren (kolommen van values)
+        values: Matrix gemeenten × jaren
+
+    Returns:
+        Dict met per jaar een integer array in feature volgorde voor
+        'rang', 'provincie_rang' en 'percentiel', plus de aantallen
+    """
+    province_names = sorted(set(provinces))
+    province_index = np.array([province_names.index(p) for p in provinces])
+    valid = ~np.isnan(values)
+
+    province_counts = np.zeros((len(province_names), len(years)), dtype=np.int32)
+    np.add.at(province_counts, province_index, valid.astype(np.int32))
+
+    return {
+        'jaren': years,
+        'rang': dense_rank(values).T.tolist(),
+        'provincie_rang': dense_rank(values, province_index).T.tolist(),
+        'percentiel': percentile_rank(values).T.tolist(),
+        'aantal': valid.sum(axis=0).tolist(),
+        'aantal_provincie': province_counts.T.tolist()
+    }
+
+
+def build_rankings(matrix: YearMatrix, metrics: dict[str, tuple[list[int], np.ndarray]]) -> dict:
+    """
+    Bereken rangschikkingen voor het totaal per inwoner en extra metrieken.
+
+    Args:
+        matrix: Gemeenten × jaren matrix van de totalen per inwoner
+        metrics: Extra metrieken {naam: (jaren, matrix)}, bv. de detail totalen
+
+    Returns:
+        Dict met gemeenten, provincies en per metriek de rangschikkingen
+    """
+    province_names = sorted(set(matrix.provinces))
+    all_metrics = {'totaal': (matrix.years, matrix.values), **metrics}
+
+    return {
+        'gemeenten': matrix.names,
+        'provincies': province_names,
+        'provincie_index': [province_names.index(p) for p in matrix.provinces],
+        'metrieken': {
+            name: compute_rankings(matrix.provinces, years, values)
+            for name, (years, values) in all_metrics.items()
+            if years
+        }
+    }
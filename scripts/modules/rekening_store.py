@@ -0,0 +1,240 @@
+"""
+Kolomgewijze opslag van de PowerBI export per rekening.
+
+De export heeft per rij één rekening (met niveau_1 ... niveau_8 en de
+boekjaar/type kolommen) en per bestuur een kolom. De store bewaart:
+
+- meta.json: de besturen, een woordenboek van alle niveau labels en per
+  rekening de code, naam en niveaus als nummers in dat woordenboek;
+- per (type, boekjaar) drie binaire kolommen met enkel de niet-lege cellen:
+  rekening.i4, bestuur.i4 (int32) en bedrag.i8 (int64 centen), little-endian.
+
+De kolommen worden tijdens het lezen in blokken aangevuld, zodat het
+geheugengebruik begrensd blijft ongeacht het aantal jaren en besturen.
+"""
+
+import json
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from .sparse import SparseMatrix
+
+
+META_NAME = 'meta.json'
+
+# Aantal cellen per partitie dat in het geheugen blijft voor het weggeschreven wordt
+FLUSH_SIZE = 1 << 16
+
+COLUMNS = (('rekening', 'i', '<i4'), ('bestuur', 'i', '<i4'), ('bedrag', 'q', '<i8'))
+
+
+def _partition_name(report_type: str, year: int) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '-', report_type.lower()).strip('-') or 'onbekend'
+    return f'{slug}-{year}'
+
+
+class _Partition:
+    """
+    Buffers voor één (type, boekjaar); worden bij FLUSH_SIZE cellen aangevuld op schijf.
+    """
+
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.buffers = {name: array(code) for name, code, _ in COLUMNS}
+        self.files = {name: open(directory / f'{name}.{dtype[1:]}', 'wb') for name, _, dtype in COLUMNS}
+        self.count = 0
+
+    def add(self, rekening: int, besturen: list[int], bedragen: list[int]) -> None:
+        self.buffers['rekening'].extend([rekening] * len(besturen))
+        self.buffers['bestuur'].extend(besturen)
+        self.buffers['bedrag'].extend(bedragen)
+        self.count += len(besturen)
+        if len(self.buffers['bedrag']) >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        for name, buffer in self.buffers.items():
+            # array schrijft in de byte volgorde van het platform
+            if sys.byteorder != 'little':
+                buffer.byteswap()
+            buffer.tofile(self.files[name])
+            del buffer[:]
+
+    def close(self) -> None:
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+
+class RekeningStoreWriter:
+    """
+    Schrijft de store rij per rij.
+
+    Gebruik:
+        with RekeningStoreWriter(output_dir, besturen) as store:
+            rekening = store.rekening(code, naam, niveaus)
+            store.add('Jaarrekening', 2024, rekening, [0, 5], [1250, 300])
+    """
+
+    def __init__(self, output_dir: str | Path, besturen: Sequence[str]):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.besturen = list(besturen)
+        self.labels: list[str] = []
+        self.label_index: dict[str, int] = {}
+        self.codes: list[str] = []
+        self.names: list[str] = []
+        self.levels: list[list[int]] = []
+        self.code_index: dict[str, int] = {}
+        self.partitions: dict[tuple[str, int], _Partition] = {}
+        self.meta: dict | None = None
+
+    def __enter__(self) -> 'RekeningStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def rekening(self, code: str, naam: str, niveaus: Sequence[str]) -> int:
+        """
+        Nummer van een rekening; metadata wordt enkel de eerste keer bewaard.
+
+        Args:
+            code: Rekeningcode
+            naam: Volledige naam ('Alg. rekening')
+            niveaus: Niet-lege niveaus van boven naar onder
+        """
+        index = self.code_index.get(code)
+        if index is not None:
+            return index
+
+        level_ids = []
+        for label in niveaus:
+            if label not in self.label_index:
+                self.label_index[label] = len(self.labels)
+                self.labels.append(label)
+            level_ids.append(self.label_index[label])
+
+        index = len(self.codes)
+        self.code_index[code] = index
+        self.codes.append(code)
+        self.names.append(naam)
+        self.levels.append(level_ids)
+        return index
+
+    def add(self, report_type: str, year: int, rekening: int,
+            besturen: list[int], bedragen: list[int]) -> None:
+        """
+        Voeg de niet-lege cellen van één rij toe (bedragen in centen).
+        """
+        key = (report_type, year)
+        if key not in self.partitions:
+            self.partitions[key] = _Partition(self.output_dir / _partition_name(report_type, year))
+        self.partitions[key].add(rekening, besturen, bedragen)
+
+    def close(self) -> dict:
+        """
+        Schrijf de laatste blokken en meta.json.
+
+        Returns:
+            De metadata (ook bij een tweede oproep)
+        """
+        if self.meta is not None:
+            return self.meta
+        for partition in self.partitions.values():
+            partition.close()
+
+        meta = {
+            'besturen': self.besturen,
+            'niveau_labels': self.labels,
+            'rekeningen': {
+                'code': self.codes,
+                'naam': self.names,
+                'niveaus': self.levels
+            },
+            'partities': [
+                {
+                    'type': report_type,
+                    'boekjaar': year,
+                    'map': partition.directory.name,
+                    'cellen': partition.count
+                }
+                for (report_type, year), partition in sorted(self.partitions.items(), key=lambda item: item[0][::-1])
+            ]
+        }
+        with open(self.output_dir / META_NAME, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        self.meta = meta
+        return meta
+
+
+def load_rekening_metadata(store_dir: str | Path) -> dict:
+    """
+    Decodeer de rekeningen tabel naar {code: {'alg_rekening', 'niveaus'}}
+    (de vorm die AccountTree.from_rekeningen verwacht).
+    """
+    with open(Path(store_dir) / META_NAME, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    labels = meta['niveau_labels']
+    rekeningen = meta['rekeningen']
+    return {
+        code: {
+            'alg_rekening': naam,
+            'niveaus': {f'niveau_{depth}': labels[label] for depth, label in enumerate(levels, start=1)}
+        }
+        for code, naam, levels in zip(rekeningen['code'], rekeningen['naam'], rekeningen['niveaus'])
+    }
+
+
+def load_partition(store_dir: str | Path, year: int, report_type: str | None = None) -> SparseMatrix:
+    """
+    Lees één (type, boekjaar) als besturen × rekeningen matrix.
+
+    Args:
+        store_dir: Map van de store
+        year: Boekjaar
+        report_type: Type rapport (None = het enige type voor dat jaar)
+
+    Returns:
+        SparseMatrix met de besturen als rijen en {'code', 'naam'} als kolom metadata
+
+    Raises:
+        KeyError: Als de partitie niet bestaat of het type dubbelzinnig is
+    """
+    store_dir = Path(store_dir)
+    with open(store_dir / META_NAME, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    partitions = [
+        partition for partition in meta['partities']
+        if partition['boekjaar'] == year and report_type in (None, partition['type'])
+    ]
+    if len(partitions) != 1:
+        raise KeyError(f"Geen eenduidige partitie voor {report_type or '*'} {year}")
+
+    directory = store_dir / partitions[0]['map']
+    rekening, bestuur, bedrag = (
+        np.fromfile(directory / f'{name}.{dtype[1:]}', dtype=dtype) for name, _, dtype in COLUMNS
+    )
+
+    # De store staat per rekening; CSR wil per bestuur (stabiel, dus kolommen blijven oplopend)
+    order = np.argsort(bestuur, kind='stable')
+    indptr = np.zeros(len(meta['besturen']) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(bestuur, minlength=len(meta['besturen'])), out=indptr[1:])
+
+    rekeningen = meta['rekeningen']
+    return SparseMatrix(
+        indptr,
+        rekening[order].astype(np.int32),
+        bedrag[order].astype(np.int64),
+        list(meta['besturen']),
+        list(rekeningen['naam']),
+        [{'code': code, 'naam': naam} for code, naam in zip(rekeningen['code'], rekeningen['naam'])]
+    )
@@ -0,0 +1,206 @@
+"""
+Ijle gemeenten × rekeningen matrix in CSR vorm.
+
+De detail en beleidsdomein CSV's hebben per gemeente een kolom voor elke
+rekening (of elk beleidsveld), maar de meeste cellen zijn leeg. In plaats
+van per niet-lege cel een dict met code, naam en bedrag worden enkel de
+bedragen en hun kolomnummer bewaard, rij na rij (compressed sparse row).
+Namen en metadata van rijen en kolommen staan één keer in lijsten met een
+dict voor de omgekeerde lookup.
+
+De bedragen zijn int64 centen (utils.parse_cents): sommen per rij, kolom of
+groep zijn exacte integer sommen en worden pas bij de output naar euro
+omgezet.
+"""
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .utils import cents_to_euro
+
+
+def sum_by(ids: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Som van values per id (0 <= id < size), in het dtype van values.
+
+    Integers worden gesorteerd en met reduceat opgeteld (exact, zonder
+    omweg via float); floats gaan via bincount.
+    """
+    if values.dtype.kind == 'f':
+        return np.bincount(ids, weights=values, minlength=size)
+
+    result = np.zeros(size, dtype=values.dtype)
+    if ids.size:
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+        result[sorted_ids[starts]] = np.add.reduceat(values[order], starts)
+    return result
+
+
+class SparseMatrix:
+    """
+    CSR matrix met benoemde rijen (gemeenten) en kolommen (rekeningen).
+
+    De bedragen van rij i staan in data[indptr[i]:indptr[i + 1]], met hun
+    kolomnummers op dezelfde posities in indices, in de volgorde van de
+    kolommen in het bronbestand.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                 rows: list[str], columns: list[str], column_meta: list[dict] | None = None):
+        """
+        Args:
+            indptr: int64 array met len(rows) + 1 grenzen
+            indices: int32 kolomnummers per bedrag
+            data: int64 bedragen in centen (of float64)
+            rows: Rijnamen (bv. genormaliseerde gemeentenamen)
+            columns: Kolomlabels zoals in de header
+            column_meta: Optioneel per kolom een dict (bv. code en naam)
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.rows = rows
+        self.columns = columns
+        self.column_meta = column_meta
+        self.row_index = {name: i for i, name in enumerate(rows)}
+        self.column_index = {label: j for j, label in enumerate(columns)}
+
+    @classmethod
+    def from_rows(cls, columns: list[str], rows: Iterable[tuple[str, Sequence[int], Sequence[float]]],
+                  column_meta: list[dict] | None = None) -> 'SparseMatrix':
+        """
+        Bouw de matrix rij per rij.
+
+        Args:
+            columns: Kolomlabels
+            rows: Iterable van (rijnaam, kolomnummers, bedragen in centen)
+            column_meta: Optionele metadata per kolom
+
+        Returns:
+            SparseMatrix
+        """
+        names = []
+        indptr = [0]
+        indices = []
+        data = []
+        for name, row_indices, row_values in rows:
+            names.append(name)
+            indices.extend(row_indices)
+            data.extend(row_values)
+            indptr.append(len(data))
+
+        return cls(
+            np.array(indptr, dtype=np.int64),
+            np.array(indices, dtype=np.int32),
+            np.array(data, dtype=np.int64),
+            names,
+            columns,
+            column_meta
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.rows), len(self.columns)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.data.size)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+    def row(self, row: int | str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Kolomnummers en bedragen van één rij (views, geen kopie).
+        """
+        if isinstance(row, str):
+            row = self.row_index[row]
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def row_ids(self) -> np.ndarray:
+        """
+        Rijnummer van elk bedrag (de 'uitgepakte' indptr).
+        """
+        return np.repeat(np.arange(len(self.rows)), np.diff(self.indptr))
+
+    def row_counts(self) -> np.ndarray:
+        """
+        Aantal niet-lege cellen per rij.
+        """
+        return np.diff(self.indptr)
+
+    def row_totals(self) -> np.ndarray:
+        """
+        Som per rij (exact in centen).
+        """
+        return sum_by(self.row_ids(), self.data, len(self.rows))
+
+    def column_totals(self) -> np.ndarray:
+        """
+        Som per kolom over alle rijen.
+        """
+        return sum_by(self.indices.astype(np.int64), self.data, len(self.columns))
+
+    def top_n(self, row: int | str, n: int) -> list[tuple[int, float]]:
+        """
+        De n bedragen met de grootste absolute waarde in een rij.
+
+        Bij gelijke waarden komt de eerste kolom eerst (zoals heapq.nlargest).
+
+        Returns:
+            Lijst van (kolomnummer, bedrag), grootste eerst
+        """
+        indices, values = self.row(row)
+        if n <= 0:
+            return []
+        magnitudes = np.abs(values)
+
+        # Selectie in O(k) met argpartition; enkel de n gekozen bedragen worden gesorteerd
+        candidates = np.arange(len(values))
+        if n < len(values):
+            threshold = magnitudes[np.argpartition(-magnitudes, n - 1)[n - 1]]
+            above = np.flatnonzero(magnitudes > threshold)
+            # Gelijke waarden op de grens: de eerste posities, zoals heapq.nlargest
+            ties = np.flatnonzero(magnitudes == threshold)[:n - len(above)]
+            candidates = np.sort(np.concatenate([above, ties]))
+
+        order = candidates[np.argsort(-magnitudes[candidates], kind='stable')]
+        return list(zip(indices[order].tolist(), values[order].tolist()))
+
+    def group_sums(self, groups: Sequence[str | None]) -> tuple[list[str], np.ndarray]:
+        """
+        Tel de rijen per groep op, bv. gemeenten per provincie.
+
+        Args:
+            groups: Groep per rij (None = niet meetellen)
+
+        Returns:
+            Tuple van (groepen in volgorde van eerste voorkomen,
+            dichte groepen × kolommen matrix)
+        """
+        labels = list(dict.fromkeys(group for group in groups if group is not None))
+        label_index = {label: i for i, label in enumerate(labels)}
+        row_groups = np.array([label_index.get(group, -1) for group in groups], dtype=np.int64)
+
+        group_ids = row_groups[self.row_ids()]
+        keep = group_ids >= 0
+        flat = group_ids[keep] * len(self.columns) + self.indices[keep]
+        sums = sum_by(flat, self.data[keep], len(labels) * len(self.columns))
+        return labels, sums.reshape(len(labels), len(self.columns))
+
+    def row_dict(self, row: int | str) -> dict[str, float]:
+        """
+        {kolomlabel: bedrag in euro} voor één rij, bv. voor een query van de daemon.
+        """
+        indices, values = self.row(row)
+        if values.dtype.kind == 'i':
+            values = cents_to_euro(values)
+        return {self.columns[j]: value for j, value in zip(indices.tolist(), values.tolist())}
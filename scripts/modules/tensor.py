@@ -0,0 +1,123 @@
+"""
+Beleidsdomein data per gemeente als 3-D tensor op schijf.
+
+De kubus (modules/cube.py) bevat alle gemeenten × jaren × subdomeinen van
+'investeringsuitgave per beleidsdomein.csv'. Die cellen worden bewaard als
+één float32 .npy bestand (gemeente × jaar × subdomein, NaN = geen bedrag)
+met een kleine JSON manifest voor de assen. Met mmap_mode leest NumPy
+enkel de pagina's die een slice nodig heeft, dus een tijdreeks voor één
+gemeente kost geen parse van de CSV.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .cube import BeleidsdomeinCube
+from .utils import normalize_municipality_name
+
+
+TENSOR_NAME = 'beleidsdomein_tensor.npy'
+TENSOR_MANIFEST_NAME = 'beleidsdomein_tensor.json'
+
+TENSOR_DTYPE = '<f4'
+
+
+class BeleidsdomeinTensor:
+    """
+    Tensor met benoemde assen: gemeenten, jaren en leden (bv. subdomeinen).
+    """
+
+    def __init__(self, values: np.ndarray, manifest: dict):
+        """
+        Args:
+            values: Array gemeenten × jaren × leden (mag een memmap zijn)
+            manifest: Inhoud van de manifest (zie write_beleidsdomein_tensor)
+        """
+        self.values = values
+        self.manifest = manifest
+        self.level = manifest['niveau']
+        self.gemeenten = manifest['gemeenten']
+        self.jaren = manifest['jaren']
+        self.leden = manifest['leden']
+        # Unieke naam per lid: 'Cultuur > Overige' als het label onder meer dan één ouder voorkomt
+        self.namen = manifest['namen']
+        self.gemeente_index = {normalize_municipality_name(name): i for i, name in enumerate(self.gemeenten)}
+
+    def series(self, gemeente: str) -> dict[str, list[float | None]]:
+        """
+        Tijdreeks per lid voor één gemeente, enkel leden met minstens één bedrag.
+
+        De sleutels zijn de unieke namen van de leden (self.namen), zodat
+        subdomeinen met hetzelfde label elk hun eigen reeks houden.
+
+        Raises:
+            KeyError: Als de gemeente niet in de tensor staat
+        """
+        row = self.gemeente_index.get(normalize_municipality_name(gemeente))
+        if row is None:
+            raise KeyError(f"Onbekende gemeente: {gemeente}")
+
+        block = np.asarray(self.values[row])
+        result = {}
+        for column in np.flatnonzero(~np.isnan(block).all(axis=0)).tolist():
+            result[self.namen[column]] = [
+                None if np.isnan(value) else round(float(value), 2) for value in block[:, column]
+            ]
+        return result
+
+
+def write_beleidsdomein_tensor(cube: BeleidsdomeinCube, npy_path: str | Path,
+                               manifest_path: str | Path, level: str | None = None) -> dict:
+    """
+    Schrijf de gemeenten × jaren × leden tensor en zijn manifest.
+
+    Args:
+        cube: BeleidsdomeinCube
+        npy_path: Pad voor het .npy bestand
+        manifest_path: Pad voor de JSON manifest
+        level: Niveau van de derde as (standaard het onderste niveau van de kubus)
+
+    Returns:
+        De manifest
+    """
+    level = level or cube.levels[-1]
+    values = cube.tensor(level).astype(TENSOR_DTYPE, copy=False)
+    np.save(npy_path, values, allow_pickle=False)
+
+    depth = cube.levels.index(level)
+    above = cube.levels[depth - 1] if depth > 0 else None
+    manifest = {
+        'bestand': Path(npy_path).name,
+        'dtype': 'float32',
+        'vorm': list(values.shape),
+        'assen': ['gemeente', 'jaar', level],
+        'niveau': level,
+        'gemeenten': cube.regions['gemeente'],
+        'jaren': cube.years,
+        'leden': cube.members[level],
+        'namen': cube.names[level],
+        # Lid van het niveau erboven per lid, bv. het domein van elk subdomein
+        'ouders': [cube.members[above][parent] for parent in cube.parents[level]] if above else None
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_beleidsdomein_tensor(manifest_path: str | Path, mmap_mode: str | None = 'r') -> BeleidsdomeinTensor:
+    """
+    Open de tensor naast zijn manifest, standaard als read-only memmap.
+
+    Raises:
+        ValueError: Als de vorm van het .npy bestand niet overeenkomt met de manifest
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    values = np.load(manifest_path.parent / manifest['bestand'], mmap_mode=mmap_mode, allow_pickle=False)
+    if list(values.shape) != manifest['vorm']:
+        raise ValueError(f"Tensor heeft vorm {list(values.shape)}, manifest zegt {manifest['vorm']}")
+    return BeleidsdomeinTensor(values, manifest)
@@ -0,0 +1,440 @@
+"""
+Vector tile piramide (Mapbox Vector Tiles) van de gemeenten.
+
+Per zoomniveau worden de polygonen geprojecteerd (Web Mercator),
+vereenvoudigd met een tolerantie in tile pixels en per tile geknipt.
+De tiles worden als protobuf gecodeerd volgens de MVT 2.1 specificatie
+en samen in één MBTiles (SQLite) bestand geschreven.
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .geometry import polygons, signed_area, simplify
+
+
+EXTENT = 4096
+BUFFER = 64
+LAYER_NAME = 'gemeenten'
+
+# Maximale afwijking bij het vereenvoudigen, in tile eenheden (van EXTENT)
+SIMPLIFY_TOLERANCE = 4.0
+
+MIN_ZOOM = 6
+MAX_ZOOM = 12
+
+# Lengte van de versie (hash van alle tiles) in de metadata en de tile URL's
+VERSION_LENGTH = 12
+
+
+# --- Projectie ----------------------------------------------------------------
+
+def project(coords: np.ndarray, zoom: int) -> np.ndarray:
+    """
+    Projecteer lon/lat naar wereld tile eenheden (Web Mercator) op een zoomniveau.
+
+    Args:
+        coords: (n, 2) array met lon/lat
+        zoom: Zoomniveau
+
+    Returns:
+        (n, 2) array, tile (x, y) beslaat [x·EXTENT, (x+1)·EXTENT)
+    """
+    scale = EXTENT * 2 ** zoom
+    lon, lat = coords[:, 0], np.radians(coords[:, 1])
+    x = (lon + 180) / 360 * scale
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / math.pi) / 2 * scale
+    return np.column_stack([x, y])
+
+
+def tile_range(bbox: tuple[float, float, float, float], zoom: int) -> tuple[range, range]:
+    """
+    Tile kolommen en rijen die een lon/lat bounding box bedekken.
+    """
+    corners = project(np.array([[bbox[0], bbox[3]], [bbox[2], bbox[1]]]), zoom) / EXTENT
+    (x0, y0), (x1, y1) = np.floor(corners).astype(int)
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+# --- Knippen ------------------------------------------------------------------
+
+def clip_ring(ring: np.ndarray, low: float, high: float) -> np.ndarray:
+    """
+    Knip een gesloten ring op een vierkant (Sutherland-Hodgman).
+
+    Args:
+        ring: Gesloten (n, 2) ring in tile coördinaten
+        low: Ondergrens voor x en y
+        high: Bovengrens voor x en y
+
+    Returns:
+        Geknipte gesloten ring (leeg als de ring volledig buiten valt)
+    """
+    points = ring[:-1]
+    for axis, bound, keep_below in ((0, low, False), (0, high, True), (1, low, False), (1, high, True)):
+        if len(points) == 0:
+            break
+        inside = points[:, axis] <= bound if keep_below else points[:, axis] >= bound
+        if inside.all():
+            continue
+
+        output = []
+        previous, previous_inside = points[-1], inside[-1]
+        for point, point_inside in zip(points, inside):
+            if point_inside != previous_inside:
+                t = (bound - previous[axis]) / (point[axis] - previous[axis])
+                output.append(previous + t * (point - previous))
+            if point_inside:
+                output.append(point)
+            previous, previous_inside = point, point_inside
+        points = np.array(output).reshape(-1, 2)
+
+    if len(points) < 3:
+        return np.empty((0, 2))
+    return np.vstack([points, points[:1]])
+
+
+# --- Protobuf codering ----------------------------------------------------------
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 31)
+
+
+def _field(number: int, wire_type: int) -> bytes:
+    return _varint((number << 3) | wire_type)
+
+
+def _bytes_field(number: int, payload: bytes) -> bytes:
+    return _field(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number: int, values: list[int]) -> bytes:
+    return _bytes_field(number, b''.join(_varint(v) for v in values))
+
+
+def _command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+def encode_geometry(rings: list[np.ndarray]) -> list[int]:
+    """
+    Codeer ringen als MVT geometrie commando's (MoveTo, LineTo, ClosePath).
+
+    Args:
+        rings: Gesloten ringen met integer tile coördinaten, in MVT volgorde
+            (buitenring gevolgd door zijn binnenringen)
+
+    Returns:
+        Lijst met commando's en zigzag gecodeerde delta's
+    """
+    commands = []
+    cursor_x = cursor_y = 0
+    for ring in rings:
+        points = ring[:-1]
+        commands.append(_command(1, 1))
+        for i, (x, y) in enumerate(points):
+            if i == 1:
+                commands.append(_command(2, len(points) - 1))
+            commands.extend((_zigzag(int(x - cursor_x)), _zigzag(int(y - cursor_y))))
+            cursor_x, cursor_y = x, y
+        commands.append(_command(7, 1))
+    return commands
+
+
+def _encode_value(value) -> bytes:
+    if isinstance(value, str):
+        return _bytes_field(1, value.encode('utf-8'))
+    if isinstance(value, bool):
+        return _field(7, 0) + _varint(int(value))
+    return _field(3, 1) + np.float64(value).tobytes()
+
+
+def encode_tile(features: list[tuple[int, dict, list[np.ndarray]]]) -> bytes:
+    """
+    Codeer één laag met features als MVT protobuf.
+
+    Args:
+        features: Lijst van (id, properties, ringen)
+
+    Returns:
+        Protobuf bytes van de tile
+    """
+    keys, values = {}, {}
+    encoded_features = []
+    for feature_id, properties, rings in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value).__name__, value), len(values)))
+
+        encoded_features.append(_bytes_field(2, b''.join([
+            _field(1, 0) + _varint(feature_id),
+            _packed(2, tags),
+            _field(3, 0) + _varint(3),  # POLYGON
+            _packed(4, encode_geometry(rings))
+        ])))
+
+    layer = b''.join([
+        _field(15, 0) + _varint(2),
+        _bytes_field(1, LAYER_NAME.encode('utf-8')),
+        *encoded_features,
+        *(_bytes_field(3, key.encode('utf-8')) for key in keys),
+        *(_bytes_field(4, _encode_value(value)) for _, value in values),
+        _field(5, 0) + _varint(EXTENT)
+    ])
+    return _bytes_field(3, layer)
+
+
+# --- Tiles genereren ----------------------------------------------------------
+
+def tile_properties(properties: dict) -> dict:
+    """
+    Properties die in de tiles terechtkomen: naam, provincie en de jaren.
+
+    Geneste blokken (detail, beleidsdomein) blijven in de GeoJSON.
+    """
+    return {
+        key: value for key, value in properties.items()
+        if not isinstance(value, (dict, list))
+    }
+
+
+def _tile_rings(polygon: list[np.ndarray], x: int, y: int) -> list[np.ndarray]:
+    """
+    Knip, kwantiseer en oriënteer een (geprojecteerde) polygon voor één tile.
+    """
+    offset = np.array([x * EXTENT, y * EXTENT])
+    result = []
+    for i, ring in enumerate(polygon):
+        clipped = clip_ring(ring - offset, -BUFFER, EXTENT + BUFFER)
+        if len(clipped) == 0:
+            if i == 0:
+                return []
+            continue
+
+        quantized = np.round(clipped).astype(np.int64)
+        distinct = np.concatenate([[True], (np.diff(quantized, axis=0) != 0).any(axis=1)])
+        quantized = quantized[distinct]
+        if len(quantized) < 4:
+            if i == 0:
+                return []
+            continue
+
+        # MVT: buitenring positieve oppervlakte in tile coördinaten (y naar beneden)
+        area = signed_area(quantized.astype(float))
+        if area == 0:
+            if i == 0:
+                return []
+            continue
+        if (area > 0) != (i == 0):
+            quantized = quantized[::-1]
+        result.append(quantized)
+    return result
+
+
+_WORKER_FEATURES = None
+
+
+def _init_worker(features):
+    global _WORKER_FEATURES
+    _WORKER_FEATURES = features
+
+
+def _render_zoom(task: tuple[int, list[tuple[int, int]]]) -> list[tuple[int, int, int, bytes]]:
+    """
+    Genereer de tiles van één zoomniveau (uitgevoerd in een worker proces).
+    """
+    zoom, tiles = task
+    tolerance = SIMPLIFY_TOLERANCE
+
+    projected = []
+    for feature_id, properties, geometry_polygons, bbox in _WORKER_FEATURES:
+        parts = []
+        for polygon in geometry_polygons:
+            rings = [simplify(project(ring, zoom), tolerance) for ring in polygon]
+            if len(rings[0]) >= 4:
+                parts.append([ring for ring in rings if len(ring) >= 4])
+        projected.append((feature_id, properties, parts, project(
+            np.array([[bbox[0], bbox[3]], [bbox[2], bbox[1]]]), zoom
+        ).ravel()))
+
+    result = []
+    margin = BUFFER
+    for x, y in tiles:
+        low_x, low_y = x * EXTENT - margin, y * EXTENT - margin
+        high_x, high_y = (x + 1) * EXTENT + margin, (y + 1) * EXTENT + margin
+
+        tile_features = []
+        for feature_id, properties, parts, (min_x, min_y, max_x, max_y) in projected:
+            if max_x < low_x or min_x > high_x or max_y < low_y or min_y > high_y:
+                continue
+            rings = [ring for polygon in parts for ring in _tile_rings(polygon, x, y)]
+            if rings:
+                tile_features.append((feature_id, properties, rings))
+
+        if tile_features:
+            # mtime=0: dezelfde tiles geven dezelfde bytes, dus dezelfde versie
+            result.append((zoom, x, y, gzip.compress(encode_tile(tile_features), mtime=0)))
+    return result
+
+
+def field_types(features: list[dict]) -> dict[str, str]:
+    """
+    TileJSON veldtypes over alle features: 'Number', 'Boolean' of 'String'.
+
+    Een veld met verschillende types in verschillende features wordt 'String'.
+    """
+    types = {}
+    for properties in features:
+        for key, value in properties.items():
+            if value is None:
+                continue
+            kind = ('String' if isinstance(value, str)
+                    else 'Boolean' if isinstance(value, bool) else 'Number')
+            if types.setdefault(key, kind) != kind:
+                types[key] = 'String'
+    return types
+
+
+def generate_tiles(geojson: dict, output_path: str | Path, min_zoom: int = MIN_ZOOM,
+                   max_zoom: int = MAX_ZOOM, max_workers: int | None = None) -> int:
+    """
+    Genereer de tile piramide en schrijf ze naar een MBTiles bestand.
+
+    Elk zoomniveau wordt in een apart proces berekend. De database wordt
+    eerst als '.tmp' geschreven en pas daarna op zijn plaats gezet, zodat
+    serve.py tijdens een rebuild nooit een half geschreven bestand opent.
+    De metadata krijgt een 'version': een hash van alle tiles.
+
+    Args:
+        geojson: GeoJSON met (Multi)Polygon geometrieën
+        output_path: Pad naar het .mbtiles bestand (wordt overschreven)
+        min_zoom: Kleinste zoomniveau
+        max_zoom: Grootste zoomniveau
+        max_workers: Aantal processen (standaard het aantal CPU's)
+
+    Returns:
+        Aantal geschreven tiles
+    """
+    features = []
+    bounds = [180.0, 90.0, -180.0, -90.0]
+    for feature_id, feature in enumerate(geojson['features']):
+        geometry_polygons = polygons(feature.get('geometry'))
+        if not geometry_polygons:
+            continue
+        coords = np.concatenate([ring for polygon in geometry_polygons for ring in polygon])
+        bbox = (*coords.min(axis=0), *coords.max(axis=0))
+        bounds = [min(bounds[0], bbox[0]), min(bounds[1], bbox[1]),
+                  max(bounds[2], bbox[2]), max(bounds[3], bbox[3])]
+        features.append((feature_id, tile_properties(feature['properties']), geometry_polygons, bbox))
+
+    tasks = []
+    for zoom in range(min_zoom, max_zoom + 1):
+        tiles = set()
+        for *_, bbox in features:
+            columns, rows = tile_range(bbox, zoom)
+            tiles.update((x, y) for x in columns for y in rows)
+        tasks.append((zoom, sorted(tiles)))
+
+    output_path = Path(output_path)
+    temp_path = output_path.with_name(output_path.name + '.tmp')
+    temp_path.unlink(missing_ok=True)
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript('''
+            CREATE TABLE metadata (name TEXT, value TEXT);
+            CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+            CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+        ''')
+
+        count = 0
+        digest = hashlib.sha256()
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(features,)) as executor:
+            for rendered in executor.map(_render_zoom, tasks):
+                for zoom, x, y, data in rendered:
+                    digest.update(f'{zoom}/{x}/{y}:'.encode('ascii') + data)
+                # MBTiles gebruikt TMS rijen (y van onder naar boven)
+                connection.executemany(
+                    'INSERT INTO tiles VALUES (?, ?, ?, ?)',
+                    [(zoom, x, 2 ** zoom - 1 - y, data) for zoom, x, y, data in rendered]
+                )
+                count += len(rendered)
+
+        center = ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2, min_zoom)
+        connection.executemany('INSERT INTO metadata VALUES (?, ?)', [
+            ('name', LAYER_NAME),
+            ('format', 'pbf'),
+            ('version', digest.hexdigest()[:VERSION_LENGTH]),
+            ('minzoom', str(min_zoom)),
+            ('maxzoom', str(max_zoom)),
+            ('bounds', ','.join(f'{v:.6f}' for v in bounds)),
+            ('center', ','.join(str(v) for v in center)),
+            ('json', json.dumps({'vector_layers': [{
+                'id': LAYER_NAME,
+                'minzoom': min_zoom,
+                'maxzoom': max_zoom,
+                'fields': field_types([properties for _, properties, *_ in features])
+            }]}))
+        ])
+        connection.commit()
+    except BaseException:
+        connection.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+    connection.close()
+    os.replace(temp_path, output_path)
+    return count
+
+
+def read_metadata(mbtiles_path: str | Path) -> dict[str, str]:
+    """
+    Lees de metadata tabel van een MBTiles bestand (name, version, bounds, json, ...).
+    """
+    with closing(sqlite3.connect(f'file:{mbtiles_path}?mode=ro', uri=True)) as connection:
+        return dict(connection.execute('SELECT name, value FROM metadata'))
+
+
+def read_tile(mbtiles_path: str | Path, zoom: int, x: int, y: int) -> bytes | None:
+    """
+    Lees één (gzip gecomprimeerde) tile uit een MBTiles bestand.
+
+    Args:
+        mbtiles_path: Pad naar het .mbtiles bestand
+        zoom: Zoomniveau
+        x: Tile kolom
+        y: Tile rij (XYZ schema, y van boven naar beneden)
+
+    Returns:
+        Tile bytes, of None als de tile leeg is
+    """
+    # connect() als context manager sluit de verbinding niet, closing() wel
+    with closing(sqlite3.connect(f'file:{mbtiles_path}?mode=ro', uri=True)) as connection:
+        row = connection.execute(
+            'SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?',
+            (zoom, x, 2 ** zoom - 1 - y)
+        ).fetchone()
+    return row[0] if row else None
@@ -2,6 +2,10 @@
 Utility functies die gedeeld worden over meerdere scripts.
 """
 
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import numpy as np
+
 
 def normalize_municipality_name(name: str) -> str:
     """
@@ -39,3 +43,55 @@ def parse_value(value: str) -> float | None:
         return float(str(value).strip().replace(',', '.'))
     except (ValueError, TypeError):
         return None
+
+
+def parse_cents(value: str) -> int | None:
+    """
+    Converteer CSV waarde naar een geheel aantal centen, zonder float.
+
+    Bedragen met hoogstens twee decimalen (de PowerBI exports) worden
+    rechtstreeks uit de tekst gelezen; meer decimalen of een exponent
+    worden via Decimal half-up op de cent afgerond.
+
+    Args:
+        value: String waarde uit CSV (komma of punt als decimaal scheidingsteken)
+
+    Returns:
+        Centen als int, of None als parsing faalt (ook NaN en oneindig)
+    """
+    if not value or not str(value).strip():
+        return None
+    text = str(value).strip().replace(',', '.')
+    sign = -1 if text[0] == '-' else 1
+    whole, _, fraction = text[1:].partition('.') if text[0] in '+-' else text.partition('.')
+    if (whole + fraction).isdigit() and len(fraction) <= 2:
+        return sign * (int(whole or '0') * 100 + int(fraction.ljust(2, '0')))
+    try:
+        return int(Decimal(text).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP).scaleb(2))
+    except (InvalidOperation, ValueError, OverflowError):
+        return None
+
+
+def to_cents(values) -> np.ndarray:
+    """
+    Float bedragen (bv. een pandas kolom) naar int64 centen; NaN wordt 0.
+
+    Exact voor bedragen met hoogstens twee decimalen tot ongeveer 90 biljoen euro.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.round(np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0) * 100).astype(np.int64)
+
+
+def cents_to_euro(cents):
+    """
+    Centen naar euro voor de output (pas op het einde, na het optellen).
+
+    Args:
+        cents: int of int64 array
+
+    Returns:
+        float (of float64 array) met hoogstens twee decimalen
+    """
+    if isinstance(cents, np.ndarray):
+        return cents / 100
+    return int(cents) / 100
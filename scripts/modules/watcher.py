@@ -0,0 +1,205 @@
+"""
+Bestanden bewaken op wijzigingen: inotify op Linux, anders polling.
+
+inotify wordt rechtstreeks via ctypes aangesproken (geen extra
+dependency). Waar dat niet kan (macOS, Windows, of een limiet op het
+aantal watches) wordt teruggevallen op het periodiek vergelijken van
+mtimes. Een reeks wijzigingen kort na elkaar (een editor die opslaat, een
+build die tien bestanden schrijft) wordt gebundeld tot één melding.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+# Wachttijd zonder nieuwe wijzigingen voor een bundel gemeld wordt
+DEBOUNCE_SECONDS = 0.3
+
+POLL_INTERVAL_SECONDS = 1.0
+
+# inotify constanten (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Tijdelijke bestanden van editors en van de build zelf
+IGNORED_SUFFIXES = ('.tmp', '.swp', '.swx', '~', '-journal', '.pyc')
+IGNORED_DIRECTORIES = {'__pycache__', '.git'}
+
+
+def is_ignored(path: Path) -> bool:
+    return (
+        path.name.endswith(IGNORED_SUFFIXES)
+        or path.name.startswith('.#')
+        or any(part in IGNORED_DIRECTORIES for part in path.parts)
+    )
+
+
+class InotifyWatcher:
+    """
+    Recursieve inotify watch op een aantal mappen.
+    """
+
+    def __init__(self, directories: list[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 mislukt")
+        self.directories = {}
+        for directory in directories:
+            self.add_tree(Path(directory))
+
+    def add_tree(self, directory: Path) -> None:
+        for path in [directory, *(p for p in directory.rglob('*') if p.is_dir())]:
+            if is_ignored(path):
+                continue
+            wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch mislukt voor {path}")
+            self.directories[wd] = path
+
+    def read(self, timeout: float | None) -> set[Path]:
+        """
+        Wacht maximaal timeout seconden op events.
+
+        Returns:
+            Gewijzigde bestanden (leeg bij een timeout)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            directory = self.directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_DELETE_SELF:
+                del self.directories[wd]
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not is_ignored(path):
+                    # Nieuwe submap: mee bewaken, en wat er al in staat melden
+                    self.add_tree(path)
+                    changed.update(p for p in path.rglob('*') if p.is_file())
+                continue
+            if not is_ignored(path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Vergelijkt periodiek mtime en grootte van alle bestanden.
+    """
+
+    def __init__(self, directories: list[Path], interval: float = POLL_INTERVAL_SECONDS):
+        self.directories = [Path(directory) for directory in directories]
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for directory in self.directories:
+            for path in directory.rglob('*'):
+                if is_ignored(path):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if not path.is_dir():
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self, timeout: float | None) -> set[Path]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self.scan()
+        changed = {
+            path for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(directories: list[str | Path]) -> InotifyWatcher | PollingWatcher:
+    """
+    inotify als het kan, anders polling.
+    """
+    directories = [Path(directory) for directory in directories if Path(directory).is_dir()]
+    try:
+        return InotifyWatcher(directories)
+    except (OSError, AttributeError):
+        return PollingWatcher(directories)
+
+
+def watch(directories: list[str | Path], debounce: float = DEBOUNCE_SECONDS,
+          ignore: Callable[[Path], bool] | None = None) -> Iterator[set[Path]]:
+    """
+    Genereer bundels gewijzigde bestanden.
+
+    Na de eerste wijziging wordt gewacht tot er debounce seconden niets
+    meer gebeurd is; alles wat in die tijd wijzigde komt in één bundel.
+
+    Args:
+        directories: Mappen die recursief bewaakt worden
+        debounce: Stilte (seconden) die een bundel afsluit
+        ignore: Optionele filter voor paden die niet gemeld moeten worden
+
+    Yields:
+        Set van gewijzigde (of verwijderde) bestanden
+    """
+    watcher = create_watcher(directories)
+    try:
+        while True:
+            changed = watcher.read(None)
+            while True:
+                more = watcher.read(debounce)
+                if not more:
+                    break
+                changed |= more
+            if ignore is not None:
+                changed = {path for path in changed if not ignore(path)}
+            if changed:
+                yield changed
+    finally:
+        watcher.close()
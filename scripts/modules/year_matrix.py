@@ -0,0 +1,109 @@
+"""
+Gemeenten × jaren matrix uit de jaar properties van de GeoJSON.
+"""
+
+import re
+from typing import NamedTuple
+
+import numpy as np
+
+
+YEAR_PROPERTY = re.compile(r'^\d{4}$')
+
+
+class YearMatrix(NamedTuple):
+    """
+    Dichte matrix met één rij per feature en één kolom per jaar.
+
+    De rijen volgen de volgorde van de features in de GeoJSON. Ontbrekende
+    waarden zijn NaN.
+    """
+    names: list[str]
+    provinces: list[str]
+    years: list[int]
+    values: np.ndarray
+
+
+def build_year_matrix(geojson: dict) -> YearMatrix:
+    """
+    Bouw de gemeenten × jaren matrix uit de '2014'...'2024' properties.
+
+    Args:
+        geojson: GeoJSON data
+
+    Returns:
+        YearMatrix met float64 waarden (NaN voor ontbrekende jaren)
+    """
+    features = geojson['features']
+    years = sorted({
+        int(key)
+        for feature in features
+        for key in feature['properties']
+        if YEAR_PROPERTY.match(key)
+    })
+
+    values = np.full((len(features), len(years)), np.nan)
+    for row, feature in enumerate(features):
+        properties = feature['properties']
+        for col, year in enumerate(years):
+            value = properties.get(str(year))
+            if value is not None:
+                values[row, col] = value
+
+    return YearMatrix(
+        names=[feature['properties']['municipality'] for feature in features],
+        provinces=[feature['properties'].get('province') for feature in features],
+        years=years,
+        values=values
+    )
+
+
+def build_block_matrix(geojson: dict, property_name: str, field: str) -> tuple[list[int], np.ndarray]:
+    """
+    Bouw een gemeenten × jaren matrix uit een jaar-geïndexeerde property.
+
+    Bijvoorbeeld build_block_matrix(geojson, 'detail', 'totaal_details').
+
+    Args:
+        geojson: Verrijkte GeoJSON data
+        property_name: Property met {'jaren': [...], field: [...]}
+        field: Veld met één waarde per jaar
+
+    Returns:
+        Tuple van (jaren, float64 matrix met NaN voor ontbrekende waarden)
+    """
+    features = geojson['features']
+    years = sorted({
+        year
+        for feature in features
+        for year in (feature['properties'].get(property_name) or {}).get('jaren', [])
+    })
+    columns = {year: col for col, year in enumerate(years)}
+
+    values = np.full((len(features), len(years)), np.nan)
+    for row, feature in enumerate(features):
+        block = feature['properties'].get(property_name)
+        if not block:
+            continue
+        for year, value in zip(block['jaren'], block[field]):
+            if value is not None:
+                values[row, columns[year]] = value
+
+    return years, values
+
+
+def to_json_list(values: np.ndarray, decimals: int = 2) -> list:
+    """
+    Zet een numpy array om naar (geneste) lijsten voor JSON output.
+
+    Args:
+        values: 1D of 2D array
+        decimals: Aantal decimalen na afronding
+
+    Returns:
+        Lijst met floats, NaN wordt None
+    """
+    rounded = np.round(values, decimals)
+    if rounded.ndim > 1:
+        return [to_json_list(row, decimals) for row in rounded]
+    return [None if np.isnan(v) else float(v) for v in rounded]
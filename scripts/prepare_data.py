@@ -1,121 +1,121 @@
 #!/usr/bin/env python3
 """
-Converteer PowerBI CSV export naar gegroepeerde JSON structuur.
+Converteer PowerBI CSV export naar een kolomgewijze store per rekening.
 
 Input:  data/opgesplitst.csv
-Output: data/opgesplitst_grouped.json
+Output: data/opgesplitst_grouped/ (meta.json + binaire kolommen per type en boekjaar)
 
 De output bevat:
-- Metadata per rekening code (1x hiërarchie info)
-- Gemeenten als key-value pairs per rekening
+- Metadata per rekening code (1x hiërarchie info, niveaus als woordenboek)
+- Per type en boekjaar enkel de niet-lege cellen: rekening, bestuur, bedrag (centen)
 - Geen repetitie van namen of metadata
+
+De CSV wordt rij per rij gelezen en de kolommen worden in blokken
+weggeschreven, zodat een export met alle jaren en alle besturen
+(gemeenten, OCMW's, provincies) niet in het geheugen moet passen.
+
+build.py gebruikt de niveaus uit deze output voor de rekeningenboom
+(modules/hierarchy.py) in het detail paneel.
 """
 
 import csv
-import json
+import shutil
+import sys
 from pathlib import Path
 
+# Add modules to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modules.rekening_store import RekeningStoreWriter
+from modules.utils import parse_cents, parse_value
 
-def parse_value(value: str) -> float | None:
-    """Converteer CSV waarde naar float (komma -> punt voor decimalen)."""
-    if not value or value.strip() == '':
-        return None
-    try:
-        return float(value.strip().replace(',', '.'))
-    except ValueError:
-        return None
 
+# Kolommen voor 'Alg. rekening': Type, Boekjaar, niveau_1 ... niveau_8
+TYPE_COLUMN = 0
+YEAR_COLUMN = 1
+LEVEL_COLUMNS = slice(2, 10)
 
-def convert_csv_to_grouped_json():
+
+def convert_csv_to_grouped_json(input_file: Path | None = None, output_dir: Path | None = None) -> dict:
     """
-    Converteer CSV naar gegroepeerde JSON:
-    - Groepeer per rekening code
-    - Metadata 1x per rekening
-    - Gemeenten als object met waarden
+    Converteer de CSV naar de rekening store:
+    - Metadata 1x per rekening (enkel berekend bij de eerste rij van een code)
+    - Bedragen als ijle kolommen per type en boekjaar
+    - Blokken worden weggeschreven tijdens het lezen
+
+    Args:
+        input_file: PowerBI export (standaard data/opgesplitst.csv)
+        output_dir: Map voor de store (standaard data/opgesplitst_grouped/)
+
+    Returns:
+        De metadata van de store (zoals in meta.json)
     """
     # Paden
     data_dir = Path(__file__).parent.parent / 'data'
-    input_file = data_dir / 'opgesplitst.csv'
-    output_file = data_dir / 'opgesplitst_grouped.json'
-    
+    input_file = input_file or data_dir / 'opgesplitst.csv'
+    output_dir = output_dir or data_dir / 'opgesplitst_grouped'
+
     print("Conversie starten...")
-    
-    with open(input_file, 'r', encoding='utf-8') as f:
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+
+    rows = 0
+    with open(input_file, 'r', encoding='utf-8', newline='') as f:
         reader = csv.reader(f, delimiter=';')
         headers = next(reader)
-        
+
         # Vind indices
         alg_rek_idx = headers.index('Alg. rekening')
         total_idx = headers.index('Total')
-        gemeente_headers = headers[alg_rek_idx + 1:total_idx]
-        
-        # Grouped structure
-        grouped = {}
-        
-        for row in reader:
-            # Skip records zonder rekening of met "Total" (dat zijn aggregaties)
-            alg_rekening = row[alg_rek_idx] if alg_rek_idx < len(row) else None
-            if not alg_rekening or alg_rekening == 'Total':
-                continue
-            
-            # Extract rekening code (eerste deel voor spatie)
-            rek_code = alg_rekening.split(' ')[0] if ' ' in alg_rekening else alg_rekening
-            
-            # Verzamel niveau info
-            niveaus = {}
-            for i in range(1, 9):
-                niveau_value = row[i + 1]  # +1 want Type en Boekjaar zijn 0,1
-                if niveau_value:
-                    niveaus[f'niveau_{i}'] = niveau_value
-            
-            # Build path
-            niveau_values = [v for k, v in sorted(niveaus.items())]
-            path = ' > '.join(niveau_values + [alg_rekening]) if niveau_values else alg_rekening
-            
-            # Eerste keer deze rekening tegenkomen: sla metadata op
-            if rek_code not in grouped:
-                grouped[rek_code] = {
-                    'alg_rekening': alg_rekening,
-                    'categorie': niveau_values[-1] if niveau_values else None,
-                    'niveaus': niveaus,
-                    'niveau_diepte': len(niveaus),
-                    'path': path,
-                    'gemeenten': {}
-                }
-            
-            # Voeg gemeente waarden toe
-            for i, gemeente_naam in enumerate(gemeente_headers):
-                value = parse_value(row[alg_rek_idx + 1 + i])
-                if value is not None and value != 0:  # Skip nulls en nullen
-                    grouped[rek_code]['gemeenten'][gemeente_naam] = value
-    
-    # Build output structure
-    output = {
-        'boekjaar': 2024,
-        'type_rapport': 'Jaarrekening',
-        'rekeningen': grouped,
-        'metadata': {
-            'rekening_count': len(grouped),
-            'gemeente_count': len(gemeente_headers),
-            'beschrijving': 'Investeringsuitgaven per rekening, gegroepeerd met metadata'
-        }
-    }
-    
-    # Schrijf JSON
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-    
+        bestuur_headers = headers[alg_rek_idx + 1:total_idx]
+
+        with RekeningStoreWriter(output_dir, bestuur_headers) as store:
+            for row in reader:
+                # Skip records zonder rekening of met "Total" (dat zijn aggregaties)
+                alg_rekening = row[alg_rek_idx] if alg_rek_idx < len(row) else None
+                if not alg_rekening or alg_rekening == 'Total':
+                    continue
+
+                # Extract rekening code (eerste deel voor spatie)
+                rek_code = alg_rekening.split(' ')[0] if ' ' in alg_rekening else alg_rekening
+
+                rekening = store.code_index.get(rek_code)
+                if rekening is None:
+                    niveaus = [value for value in row[LEVEL_COLUMNS] if value]
+                    rekening = store.rekening(rek_code, alg_rekening, niveaus)
+
+                besturen = []
+                bedragen = []
+                for i, cell in enumerate(row[alg_rek_idx + 1:total_idx]):
+                    if not cell:
+                        continue
+                    value = parse_cents(cell)
+                    if value is not None and value != 0:  # Skip nulls en nullen
+                        besturen.append(i)
+                        bedragen.append(value)
+
+                year = parse_value(row[YEAR_COLUMN])
+                store.add(row[TYPE_COLUMN] or 'Jaarrekening', int(year) if year else 0, rekening, besturen, bedragen)
+                rows += 1
+
+        meta = store.close()
+
     # Stats
-    total_gemeenten_entries = sum(len(r['gemeenten']) for r in grouped.values())
-    
+    cells = sum(partition['cellen'] for partition in meta['partities'])
+    size = sum(path.stat().st_size for path in output_dir.rglob('*') if path.is_file())
+
     print(f"✓ Conversie compleet!")
     print(f"  Input:  {input_file.name}")
-    print(f"  Output: {output_file.name}")
+    print(f"  Output: {output_dir.name}/")
     print(f"  ")
-    print(f"  Rekeningen: {len(grouped)}")
-    print(f"  Gemeenten:  {len(gemeente_headers)}")
-    print(f"  Data punten: {total_gemeenten_entries}")
-    print(f"  File size: {output_file.stat().st_size / 1024:.1f} KB")
+    print(f"  Rijen:       {rows}")
+    print(f"  Rekeningen:  {len(meta['rekeningen']['code'])}")
+    print(f"  Besturen:    {len(bestuur_headers)}")
+    print(f"  Partities:   {', '.join(p['map'] for p in meta['partities'])}")
+    print(f"  Data punten: {cells}")
+    print(f"  Grootte:     {size / 1024:.1f} KB")
+    return meta
 
 
 if __name__ == '__main__':
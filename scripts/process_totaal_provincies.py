@@ -3,8 +3,14 @@ Verwerk totaal provincies CSV en genereer correcte totalen voor de grafiek.
 """
 import pandas as pd
 import json
+import sys
 from pathlib import Path
 
+# Add modules to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modules.utils import to_cents, cents_to_euro
+
 def process_totaal_provincies():
     """Lees het CSV en bereken totalen per meerjarenplan."""
     
@@ -62,46 +68,14 @@ def process_totaal_provincies():
         else:
             provincie_naam = provincie
         
-        # Bereken totalen per meerjarenplan
+        # Bereken totalen per meerjarenplan, exact in centen
         # Let op: kolom indices zijn verschoven door de Provincie kolom
-        totaal_2014_2019 = 0
-        totaal_2020_2025 = 0
-        totaal_2026_2031 = 0
-        
-        # 2014-2019: kolommen 1-6 (na Provincie kolom)
-        for i in range(1, 7):
-            if i < len(row):
-                val = row.iloc[i]
-                if pd.notna(val) and val != '':
-                    try:
-                        totaal_2014_2019 += float(val)
-                    except:
-                        pass
-        
-        # 2020-2025: kolommen 7-12
-        for i in range(7, 13):
-            if i < len(row):
-                val = row.iloc[i]
-                if pd.notna(val) and val != '':
-                    try:
-                        totaal_2020_2025 += float(val)
-                    except:
-                        pass
-        
-        # 2026-2031: kolommen 15-20
-        for i in range(15, 21):
-            if i < len(row):
-                val = row.iloc[i]
-                if pd.notna(val) and val != '':
-                    try:
-                        totaal_2026_2031 += float(val)
-                    except:
-                        pass
+        bedragen = to_cents(pd.to_numeric(row, errors='coerce'))
         
         results[provincie_naam] = {
-            '2014-2019': round(totaal_2014_2019, 2),
-            '2020-2025': round(totaal_2020_2025, 2),
-            '2026-2031': round(totaal_2026_2031, 2)
+            '2014-2019': cents_to_euro(bedragen[1:7].sum()),     # kolommen 1-6 (na Provincie kolom)
+            '2020-2025': cents_to_euro(bedragen[7:13].sum()),    # kolommen 7-12
+            '2026-2031': cents_to_euro(bedragen[15:21].sum())    # kolommen 15-20
         }
     
     print("\nResultaten:")